@@ -1,16 +1,41 @@
 import sys
 import os
 import numpy as np
+import PIL
 from PIL import Image
 import imageio
 import time
 import struct
+import io
+import platform
+import json
+import hashlib
+import argparse
+import copy
+import threading
+import queue
+import zipfile
+import ctypes
+import mmap
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, 
                             QPushButton, QLabel, QCheckBox, QFileDialog, 
                             QComboBox, QProgressBar, QMessageBox, QFrame,
-                            QGroupBox, QSizePolicy, QSpacerItem, QTabWidget)
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QFont, QIcon, QPixmap
+                            QGroupBox, QSizePolicy, QSpacerItem, QTabWidget,
+                            QListWidget, QListWidgetItem, QListView)
+from PyQt5.QtCore import Qt, QTimer, QAbstractListModel, QModelIndex, QSize
+from PyQt5.QtGui import QFont, QIcon, QImage, QPixmap
+
+# Optional numba-accelerated encoder backend
+try:
+    import numba
+    # The TBB threading layer hangs the interpreter at exit once a parallel
+    # kernel ran on a worker thread, like the conversion pipeline stages
+    numba.config.THREADING_LAYER_PRIORITY = ['omp', 'workqueue', 'tbb']
+except ImportError:
+    numba = None
 
 # For Windows dark title bar
 try:
@@ -20,8 +45,4091 @@ try:
 except ImportError:
     pass
 
+
+def format_duration(seconds):
+    """ Formats a number of seconds as m:ss or h:mm:ss """
+    if seconds is None:
+        return '--:--'
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+class ConversionProgress:
+    """
+    Pixel-weighted progress tracking for a conversion run.
+
+    Every item (a texture set or a mipmap level) is registered with its pixel
+    count, and each stage reports the pixels, bytes and seconds it processed.
+    Progress, throughput and ETA are derived from the measured per-stage rates,
+    so a batch mixing 1K and 8K sets advances in proportion to the real work.
+    When the stages run concurrently (pipelined) the ETA follows the slowest stage.
+    """
+
+    STAGES = ('decode', 'transform', 'encode', 'write')
+
+    def __init__(self, stages=STAGES, callback=None):
+        self.stages = tuple(stages)
+        self.callback = callback
+        self.total_pixels = 0
+        self.total_items = 0
+        self.items_done = 0
+        self.items_failed = 0
+        self.items_up_to_date = 0
+        self.pixels = {stage: 0 for stage in self.stages}
+        self.bytes = {stage: 0 for stage in self.stages}
+        self.seconds = {stage: 0.0 for stage in self.stages}
+        self.item_pixels = {}
+        self.item_stages = {}
+        self.pipelined = False
+        self.queue_depths = {}
+        self.lock = threading.RLock()
+        self.start_time = time.perf_counter()
+
+    def add_work(self, pixels, item=None):
+        """ Registers an item whose pixels still have to pass through every stage """
+        self.total_pixels += pixels
+        self.total_items += 1
+        if item is not None:
+            self.item_pixels[item] = pixels
+            self.item_stages[item] = set()
+
+    def record(self, stage, pixels, nbytes=0, seconds=0.0, item=None):
+        """ Records the work done by one stage and notifies the callback """
+        with self.lock:
+            self.pixels[stage] += pixels
+            self.bytes[stage] += nbytes
+            self.seconds[stage] += seconds
+            if item in self.item_stages:
+                self.item_stages[item].add(stage)
+        if self.callback:
+            self.callback(self)
+
+    def finish_item(self, item=None):
+        """ Marks an item as completed """
+        with self.lock:
+            self.items_done += 1
+            self.item_stages.pop(item, None)
+            self.item_pixels.pop(item, None)
+        if self.callback:
+            self.callback(self)
+
+    def up_to_date_item(self, item):
+        """ Removes an item that needed no work from the totals """
+        with self.lock:
+            self.total_pixels -= self.item_pixels.pop(item, 0)
+            self.item_stages.pop(item, None)
+            self.items_done += 1
+            self.items_up_to_date += 1
+        if self.callback:
+            self.callback(self)
+
+    def skip_item(self, item):
+        """ Counts the remaining stages of a failed item as done so the ETA stays honest """
+        with self.lock:
+            pixels = self.item_pixels.pop(item, 0)
+            for stage in self.stages:
+                if stage not in self.item_stages.get(item, ()):
+                    self.pixels[stage] += pixels
+            self.item_stages.pop(item, None)
+            self.items_failed += 1
+        if self.callback:
+            self.callback(self)
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def stage_cost(self, stage):
+        """ Measured seconds per pixel for a stage, or None before it has run """
+        if self.pixels[stage] and self.seconds[stage]:
+            return self.seconds[stage] / self.pixels[stage]
+        return None
+
+    def _costs(self):
+        costs = {stage: self.stage_cost(stage) for stage in self.stages}
+        known = [cost for cost in costs.values() if cost is not None]
+        fallback = sum(known) / len(known) if known else None
+        return {stage: (cost if cost is not None else fallback) for stage, cost in costs.items()}
+
+    def fraction(self):
+        """ Completed fraction of the run, weighted by the measured cost of each stage """
+        if not self.total_pixels:
+            return 0.0
+        costs = self._costs()
+        if any(cost is None for cost in costs.values()):
+            done = sum(min(self.pixels[stage], self.total_pixels) for stage in self.stages)
+            return done / (self.total_pixels * len(self.stages))
+        done = sum(min(self.pixels[stage], self.total_pixels) * costs[stage] for stage in self.stages)
+        total = sum(self.total_pixels * costs[stage] for stage in self.stages)
+        return min(1.0, done / total) if total else 0.0
+
+    def eta_seconds(self):
+        """ Estimated seconds left based on the measured per-stage rates """
+        costs = self._costs()
+        if any(cost is None for cost in costs.values()):
+            return None
+        remaining = [max(0, self.total_pixels - self.pixels[stage]) * costs[stage] for stage in self.stages]
+        # Overlapping stages finish when the slowest (bottleneck) stage does
+        return max(remaining) if self.pipelined else sum(remaining)
+
+    def bottleneck(self):
+        """ Stage with the highest measured cost per pixel, or None before every stage has run """
+        costs = {stage: self.stage_cost(stage) for stage in self.stages}
+        if any(cost is None for cost in costs.values()):
+            return None
+        return max(costs, key=costs.get)
+
+    def throughput_mps(self):
+        """ Megapixels per second that made it through the final stage """
+        elapsed = self.elapsed()
+        if elapsed <= 0:
+            return 0.0
+        return self.pixels[self.stages[-1]] / elapsed / 1e6
+
+    def snapshot(self):
+        """ Returns the current state as a JSON-serialisable dict for logging """
+        with self.lock:
+            stages = {}
+            for stage in self.stages:
+                seconds = self.seconds[stage]
+                stages[stage] = {
+                    'pixels': self.pixels[stage],
+                    'bytes': self.bytes[stage],
+                    'seconds': round(seconds, 4),
+                    'mp_per_s': round(self.pixels[stage] / seconds / 1e6, 3) if seconds else None,
+                    'mb_per_s': round(self.bytes[stage] / seconds / 1e6, 3) if seconds else None,
+                }
+            eta = self.eta_seconds()
+            return {
+                'items_done': self.items_done,
+                'items_failed': self.items_failed,
+                'items_up_to_date': self.items_up_to_date,
+                'total_items': self.total_items,
+                'total_pixels': self.total_pixels,
+                'fraction': round(self.fraction(), 4),
+                'elapsed': round(self.elapsed(), 3),
+                'throughput_mps': round(self.throughput_mps(), 3),
+                'eta_seconds': round(eta, 1) if eta is not None else None,
+                'bottleneck': self.bottleneck(),
+                'queue_depths': dict(self.queue_depths),
+                'stages': stages,
+            }
+
+    def format_status(self, eta_label='ETA'):
+        """ Short human readable status, e.g. '12.3 MP/s - ETA 0:42' """
+        return f"{self.throughput_mps():.1f} MP/s - {eta_label} {format_duration(self.eta_seconds())}"
+
+    def format_queues(self, stage_names=None):
+        """ Sets waiting in front of each stage, e.g. 'decode 3 | transform 1 | encode 1 | write 0' """
+        stage_names = stage_names or {}
+        return ' | '.join(f"{stage_names.get(stage, stage)} {depth}" for stage, depth in self.queue_depths.items())
+
+
+def get_settings_dir():
+    """ Per-user folder for SkinTool settings and caches """
+    if sys.platform == 'win32':
+        base = os.environ.get('APPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+    path = os.path.join(base, 'SkinTool')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def library_versions():
+    """ Versions of the libraries that affect conversion speed """
+    versions = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pillow': PIL.__version__,
+        'imageio': imageio.__version__,
+    }
+    if numba is not None:
+        versions['numba'] = numba.__version__
+    return versions
+
+
+def machine_fingerprint():
+    """ Identifies the hardware and library versions that cached benchmarks were measured on """
+    return {
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'versions': library_versions(),
+    }
+
+
+# ===== DDS ENCODING =====
+
+# Format name -> (FourCC, bytes per 4x4 block); BGRA8 is uncompressed 32-bit.
+# BC4 stores the red channel only, BC5 red and green (masks, normal maps)
+DDS_FORMATS = {
+    'BC1': (b'DXT1', 8),
+    'BC3': (b'DXT5', 16),
+    'BC4': (b'ATI1', 8),
+    'BC5': (b'ATI2', 16),
+    'BGRA8': (None, None),
+}
+FORMAT_CHANNELS = {'BC4': 1, 'BC5': 2}
+
+
+def dds_level_size(width, height, fmt):
+    """ Size in bytes of one mip level """
+    fourcc, block_bytes = DDS_FORMATS[fmt]
+    if fourcc is None:
+        return width * height * 4
+    return max(1, (width + 3) // 4) * max(1, (height + 3) // 4) * block_bytes
+
+
+def dds_header(width, height, fmt, mip_count=1):
+    """ Returns the 'DDS ' magic and the 124-byte header for a texture """
+    fourcc, block_bytes = DDS_FORMATS[fmt]
+    caps = 0x1000  # DDSCAPS_TEXTURE
+    if fourcc is None:
+        flags = 0x100F  # CAPS | HEIGHT | WIDTH | PITCH | PIXELFORMAT
+        pitch_or_linear_size = width * 4
+        ddspf = struct.pack("<I I I I I I I I",
+                            32, 0x41, 0, 32,
+                            0x00FF0000, 0x0000FF00,
+                            0x000000FF, 0xFF000000)
+    else:
+        flags = 0x81007  # CAPS | HEIGHT | WIDTH | PIXELFORMAT | LINEARSIZE
+        pitch_or_linear_size = dds_level_size(width, height, fmt)
+        ddspf = struct.pack("<I I 4s I I I I I", 32, 0x4, fourcc, 0, 0, 0, 0, 0)
+    if mip_count > 1:
+        flags |= 0x20000  # MIPMAPCOUNT
+        caps |= 0x400008  # MIPMAP | COMPLEX
+
+    header = struct.pack("<I I I I I I I 11I 32s I I I I I",
+                         124, flags,
+                         height, width, pitch_or_linear_size, 0, mip_count,
+                         *([0] * 11),
+                         ddspf,
+                         caps, 0, 0, 0, 0)
+    return b'DDS ' + header
+
+
+def image_to_blocks(rgba):
+    """ Splits an image into (N, 16, C) 4x4 blocks in row-major block order, padding the edges """
+    height, width = rgba.shape[:2]
+    pad_h, pad_w = (-height) % 4, (-width) % 4
+    if pad_h or pad_w:
+        rgba = np.pad(rgba, ((0, pad_h), (0, pad_w), (0, 0)), mode='edge')
+    height, width, channels = rgba.shape
+    return rgba.reshape(height // 4, 4, width // 4, 4, channels).swapaxes(1, 2).reshape(-1, 16, channels)
+
+
+def pack_rgb565(rgb):
+    rgb = np.clip(np.rint(rgb * np.array([31.0, 63.0, 31.0], dtype=np.float32) / 255.0), 0, [31, 63, 31])
+    rgb = rgb.astype(np.uint16)
+    return (rgb[..., 0] << 11) | (rgb[..., 1] << 5) | rgb[..., 2]
+
+
+def unpack_rgb565(color):
+    color = color.astype(np.uint16)
+    r = (color >> 11) & 31
+    g = (color >> 5) & 63
+    b = color & 31
+    return np.stack([(r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)], axis=-1).astype(np.float32)
+
+
+def encode_color_blocks(blocks):
+    """
+    Encodes (N, 16, 3+) blocks into BC1 color blocks, returned as (N, 8) uint8.
+
+    Endpoints are the extremes of each block along its principal axis, found
+    with a few power iterations on the per-block covariance matrix.
+    """
+    rgb = blocks[:, :, :3].astype(np.float32)
+    mean = rgb.mean(axis=1, keepdims=True)
+    centered = rgb - mean
+    cov = np.einsum('nki,nkj->nij', centered, centered)
+    axis = rgb.max(axis=1) - rgb.min(axis=1)
+    for _ in range(4):
+        axis = np.einsum('nij,nj->ni', cov, axis)
+        norm = np.abs(axis).max(axis=1, keepdims=True)
+        axis = np.where(norm > 0, axis / np.maximum(norm, 1e-12), 1.0)
+    axis /= np.linalg.norm(axis, axis=1, keepdims=True)
+
+    proj = np.einsum('nki,ni->nk', centered, axis)
+    high = mean[:, 0] + axis * proj.max(axis=1, keepdims=True)
+    low = mean[:, 0] + axis * proj.min(axis=1, keepdims=True)
+    c0 = pack_rgb565(np.clip(high, 0, 255))
+    c1 = pack_rgb565(np.clip(low, 0, 255))
+
+    # Four-color mode needs c0 > c1
+    swap = c0 < c1
+    c0, c1 = np.where(swap, c1, c0), np.where(swap, c0, c1)
+
+    p0 = unpack_rgb565(c0)
+    p1 = unpack_rgb565(c1)
+    direction = p0 - p1
+    length = np.einsum('ni,ni->n', direction, direction)
+    t = np.einsum('nki,ni->nk', rgb - p1[:, None, :], direction) / np.maximum(length, 1e-12)[:, None]
+    q = np.clip(np.rint(t * 3), 0, 3).astype(np.uint32)
+    indices = np.array([1, 3, 2, 0], dtype=np.uint32)[q]
+    indices[c0 == c1] = 0
+
+    bits = (indices << (2 * np.arange(16, dtype=np.uint32))).sum(axis=1, dtype=np.uint32)
+    out = np.empty((len(blocks), 8), dtype=np.uint8)
+    out[:, 0:2] = c0.astype('<u2').view(np.uint8).reshape(-1, 2)
+    out[:, 2:4] = c1.astype('<u2').view(np.uint8).reshape(-1, 2)
+    out[:, 4:8] = bits.astype('<u4').view(np.uint8).reshape(-1, 4)
+    return out
+
+
+def encode_alpha_blocks(values):
+    """ Encodes (N, 16) single-channel blocks into BC4-style alpha blocks, returned as (N, 8) uint8 """
+    values = values.astype(np.float32)
+    a0 = values.max(axis=1)
+    a1 = values.min(axis=1)
+    span = a0 - a1
+    t = (values - a1[:, None]) / np.maximum(span, 1e-12)[:, None]
+    q = np.clip(np.rint(t * 7), 0, 7).astype(np.uint64)
+    indices = np.array([1, 7, 6, 5, 4, 3, 2, 0], dtype=np.uint64)[q]
+    indices[span == 0] = 0
+
+    bits = (indices << (3 * np.arange(16, dtype=np.uint64))).sum(axis=1, dtype=np.uint64)
+    out = np.empty((len(values), 8), dtype=np.uint8)
+    out[:, 0] = a0.astype(np.uint8)
+    out[:, 1] = a1.astype(np.uint8)
+    out[:, 2:8] = bits.astype('<u8').view(np.uint8).reshape(-1, 8)[:, :6]
+    return out
+
+
+def solid_color_tables():
+    """
+    For every 8-bit value, the (high, low) 5-bit and 6-bit endpoints whose
+    2/3 interpolation reproduces it most closely. Used to encode constant
+    blocks without a fit, with less error than a plain 565 quantization.
+    """
+    if SOLID_COLOR_TABLES:
+        return SOLID_COLOR_TABLES
+    values = np.arange(256, dtype=np.float32)
+    for bits in (5, 6):
+        levels = np.arange(1 << bits)
+        expanded = ((levels << (8 - bits)) | (levels >> (2 * bits - 8))).astype(np.float32)
+        interpolated = (2 * expanded[:, None] + expanded[None, :]) / 3.0
+        error = np.abs(interpolated[None] - values[:, None, None])
+        # Prefer close endpoints so decoder rounding differences stay small
+        error += np.abs(expanded[:, None] - expanded[None, :])[None] * 0.01
+        best = error.reshape(256, -1).argmin(axis=1)
+        SOLID_COLOR_TABLES[bits] = (best // len(levels), best % len(levels))
+    return SOLID_COLOR_TABLES
+
+
+SOLID_COLOR_TABLES = {}
+
+
+def pack_color_block(c0, c1, bits):
+    out = np.empty((len(c0), 8), dtype=np.uint8)
+    out[:, 0:2] = c0.astype('<u2').view(np.uint8).reshape(-1, 2)
+    out[:, 2:4] = c1.astype('<u2').view(np.uint8).reshape(-1, 2)
+    out[:, 4:8] = bits.astype('<u4').view(np.uint8).reshape(-1, 4)
+    return out
+
+
+def encode_solid_color_blocks(rgb):
+    """ Encodes constant blocks from their (N, 3) color using the precomputed endpoint tables """
+    tables = solid_color_tables()
+    rgb = rgb.astype(np.intp)
+    r_hi, r_lo = tables[5][0][rgb[:, 0]], tables[5][1][rgb[:, 0]]
+    g_hi, g_lo = tables[6][0][rgb[:, 1]], tables[6][1][rgb[:, 1]]
+    b_hi, b_lo = tables[5][0][rgb[:, 2]], tables[5][1][rgb[:, 2]]
+    c0 = ((r_hi << 11) | (g_hi << 5) | b_hi).astype(np.uint16)
+    c1 = ((r_lo << 11) | (g_lo << 5) | b_lo).astype(np.uint16)
+    # Every pixel uses the 2/3 color; keep four-color mode (c0 > c1) by swapping to index 3
+    bits = np.full(len(rgb), 0xAAAAAAAA, dtype=np.uint32)
+    swap = c0 < c1
+    c0, c1 = np.where(swap, c1, c0), np.where(swap, c0, c1)
+    bits[swap] = 0xFFFFFFFF
+    bits[c0 == c1] = 0
+    return pack_color_block(c0, c1, bits)
+
+
+def encode_two_color_blocks(blocks, second_index):
+    """ Encodes blocks that contain exactly two colors, using the colors themselves as endpoints """
+    rows = np.arange(len(blocks))
+    first = blocks[:, 0, :3]
+    second = blocks[rows, second_index, :3]
+    c0 = pack_rgb565(first.astype(np.float32))
+    c1 = pack_rgb565(second.astype(np.float32))
+    is_second = (blocks[:, :, :3] == second[:, None, :]).all(axis=2).astype(np.uint32)
+    swap = c0 < c1
+    c0, c1 = np.where(swap, c1, c0), np.where(swap, c0, c1)
+    indices = np.where(swap[:, None], 1 - is_second, is_second)
+    indices[c0 == c1] = 0
+    bits = (indices << (2 * np.arange(16, dtype=np.uint32))).sum(axis=1, dtype=np.uint32)
+    return pack_color_block(c0, c1, bits)
+
+
+def encode_color_blocks_fast(blocks):
+    """
+    BC1 color encoding with fast paths: constant and two-color blocks are
+    encoded directly, only the remaining blocks go through the full fit.
+    Returns the (N, 8) encoded blocks and the number of fast-path blocks.
+    """
+    rgb = blocks[:, :, :3]
+    is_first = (rgb == rgb[:, :1]).all(axis=2)
+    solid = is_first.all(axis=1)
+    second_index = np.argmin(is_first, axis=1)
+    second = rgb[np.arange(len(blocks)), second_index]
+    two_color = ~solid & (is_first | (rgb == second[:, None, :]).all(axis=2)).all(axis=1)
+    rest = ~(solid | two_color)
+
+    out = np.empty((len(blocks), 8), dtype=np.uint8)
+    if solid.any():
+        out[solid] = encode_solid_color_blocks(rgb[solid, 0])
+    if two_color.any():
+        out[two_color] = encode_two_color_blocks(blocks[two_color], second_index[two_color])
+    if rest.any():
+        out[rest] = encode_color_blocks(blocks[rest])
+    return out, int(solid.sum()), int(two_color.sum())
+
+
+def encode_alpha_blocks_fast(values):
+    """ BC4-style alpha encoding that skips the fit for constant blocks """
+    solid = (values == values[:, :1]).all(axis=1)
+    out = np.zeros((len(values), 8), dtype=np.uint8)
+    out[solid, 0] = values[solid, 0]
+    out[solid, 1] = values[solid, 0]
+    if not solid.all():
+        out[~solid] = encode_alpha_blocks(values[~solid])
+    return out
+
+
+HASH_MULTIPLIERS = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+                             0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x94D049BB133111EB, 0xBF58476D1CE4E5B9],
+                            dtype=np.uint64)
+
+
+def hash_blocks(blocks):
+    """ 64-bit hash of every (16, C) block, computed without leaving NumPy """
+    words = np.ascontiguousarray(blocks).reshape(len(blocks), -1).view('<u8')
+    with np.errstate(over='ignore'):
+        hashes = (words * HASH_MULTIPLIERS[:words.shape[1]]).sum(axis=1, dtype=np.uint64)
+        hashes ^= hashes >> np.uint64(29)
+    return hashes
+
+
+class BlockCache:
+    """
+    Small cache of encoded blocks for patterns that repeat within and across
+    textures (decals, camo tiles, flat regions). Entries are kept in sorted
+    arrays so lookups stay vectorized; the oldest entries are dropped first.
+    """
+
+    def __init__(self, capacity=65536):
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.formats = {}
+
+    def lookup(self, fmt, hashes, blocks):
+        """ Returns (found mask, encoded rows for the found entries) """
+        with self.lock:
+            entry = self.formats.get(fmt)
+        if entry is None or not len(hashes):
+            return np.zeros(len(hashes), dtype=bool), None
+        keys, cached_blocks, encoded, _ = entry
+        position = np.minimum(np.searchsorted(keys, hashes), len(keys) - 1)
+        found = keys[position] == hashes
+        # Guard against hash collisions
+        found[found] = (cached_blocks[position[found]] == blocks[found]).all(axis=(1, 2))
+        return found, encoded[position[found]]
+
+    def store(self, fmt, hashes, blocks, encoded):
+        if not len(hashes):
+            return
+        with self.lock:
+            entry = self.formats.get(fmt)
+            age = np.zeros(len(hashes), dtype=np.int64)
+            if entry is not None:
+                old_keys, old_blocks, old_encoded, old_age = entry
+                hashes = np.concatenate([old_keys, hashes])
+                blocks = np.concatenate([old_blocks, blocks])
+                encoded = np.concatenate([old_encoded, encoded])
+                age = np.concatenate([old_age + 1, age])
+            # Keep the newest entries, one per hash
+            order = np.argsort(age, kind='stable')[:self.capacity]
+            hashes, blocks, encoded, age = hashes[order], blocks[order], encoded[order], age[order]
+            keys, first = np.unique(hashes, return_index=True)
+            self.formats[fmt] = (keys, blocks[first], encoded[first], age[first])
+
+    def clear(self):
+        with self.lock:
+            self.formats = {}
+
+
+class DDSEncoder:
+    """ Base class of the DDS encoder backends """
+
+    name = None
+    formats = ()
+    thread_safe = True  # Can encode several strips concurrently
+
+    def available(self):
+        return True
+
+    def supports(self, fmt):
+        return fmt in self.formats and self.available()
+
+    def encode_level(self, rgba, fmt):
+        """ Encodes one RGBA level and returns its raw payload without the header """
+        raise NotImplementedError
+
+    def startup_cost(self, fmt):
+        """ Seconds a new process spends before its first encode (e.g. loading a JIT kernel) """
+        return 0.0
+
+    def encode(self, rgba, fmt):
+        """ Encodes an RGBA array into a single-level DDS file """
+        height, width = rgba.shape[:2]
+        return dds_header(width, height, fmt) + self.encode_level(rgba, fmt)
+
+
+class NumpyEncoder(DDSEncoder):
+    """
+    Built-in vectorized BC1/BC3/BC4/BC5 encoder and uncompressed BGRA writer.
+
+    Identical blocks are encoded once, repeated patterns are served from a
+    BlockCache, and constant or two-color blocks skip the full fit, so the
+    encode time follows the amount of detail rather than the pixel count.
+    """
+
+    name = 'numpy'
+    formats = ('BC1', 'BC3', 'BC4', 'BC5', 'BGRA8')
+    chunk_blocks = 16384
+
+    def __init__(self):
+        self.block_cache = BlockCache()
+        self.last_stats = {}
+
+    def encode_level(self, rgba, fmt):
+        rgba = np.ascontiguousarray(rgba, dtype=np.uint8)
+        if fmt == 'BGRA8':
+            return rgba[:, :, [2, 1, 0, 3]].tobytes()
+
+        blocks = image_to_blocks(rgba)
+        if fmt == 'BC1':
+            # Alpha is not stored in BC1, so it must not split otherwise identical blocks
+            blocks = np.ascontiguousarray(blocks[:, :, :3])
+        elif fmt in FORMAT_CHANNELS:
+            blocks = np.ascontiguousarray(blocks[:, :, :FORMAT_CHANNELS[fmt]])
+
+        # Encode every distinct block once
+        hashes = hash_blocks(blocks)
+        unique_hashes, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+        unique_blocks = blocks[first]
+        collisions = ~(unique_blocks[inverse] == blocks).all(axis=(1, 2))
+
+        block_bytes = DDS_FORMATS[fmt][1]
+        encoded = np.empty((len(unique_blocks), block_bytes), dtype=np.uint8)
+        cached, cached_rows = self.block_cache.lookup(fmt, unique_hashes, unique_blocks)
+        if cached.any():
+            encoded[cached] = cached_rows
+        stats = {'blocks': len(blocks), 'unique': len(unique_blocks), 'cached': int(cached.sum()),
+                 'solid': 0, 'two_color': 0}
+
+        missing = np.flatnonzero(~cached)
+        # Encode in chunks to bound the float temporaries
+        for start in range(0, len(missing), self.chunk_blocks):
+            rows = missing[start:start + self.chunk_blocks]
+            encoded[rows] = self.encode_blocks(unique_blocks[rows], fmt, stats)
+
+        # Remember patterns that repeat, they are likely to come back
+        counts = np.bincount(inverse.ravel(), minlength=len(unique_blocks))
+        repeated = np.flatnonzero(~cached & (counts > 1))
+        self.block_cache.store(fmt, unique_hashes[repeated], unique_blocks[repeated], encoded[repeated])
+
+        out = encoded[inverse.ravel()]
+        if collisions.any():
+            out[collisions] = self.encode_blocks(blocks[collisions], fmt, stats)
+        self.last_stats = stats
+        return out.tobytes()
+
+    def encode_blocks(self, blocks, fmt, stats):
+        if fmt in FORMAT_CHANNELS:
+            # One BC4 block per channel
+            return np.hstack([encode_alpha_blocks_fast(blocks[:, :, channel])
+                              for channel in range(FORMAT_CHANNELS[fmt])])
+        color, solid, two_color = encode_color_blocks_fast(blocks)
+        stats['solid'] += solid
+        stats['two_color'] += two_color
+        if fmt == 'BC1':
+            return color
+        return np.hstack([encode_alpha_blocks_fast(blocks[:, :, 3]), color])
+
+
+class ImageioEncoder(DDSEncoder):
+    """ imageio's DDS writer (the historical default) """
+
+    name = 'imageio'
+    formats = ('BC3',)
+    is_available = None
+
+    def available(self):
+        # Recent imageio versions ignore compress=True and write an uncompressed payload
+        if self.is_available is None:
+            try:
+                self.is_available = validate_dds(self.encode(np.zeros((4, 4, 4), dtype=np.uint8), 'BC3'), 4, 4, 'BC3')
+            except Exception:
+                self.is_available = False
+        return self.is_available
+
+    def encode(self, rgba, fmt):
+        return imageio.imwrite('<bytes>', rgba, format='DDS', compress=True, dxgi_format='BC3_UNORM')
+
+    def encode_level(self, rgba, fmt):
+        return self.encode(rgba, fmt)[128:]
+
+
+class PillowEncoder(DDSEncoder):
+    """ Pillow's DDS plugin, which can write DXT1/DXT5 since Pillow 11 """
+
+    name = 'pillow'
+    formats = ('BC1', 'BC3')
+    pixel_formats = {'BC1': 'DXT1', 'BC3': 'DXT5'}
+    is_available = None
+
+    def available(self):
+        # Older Pillow versions can only write uncompressed DDS
+        if self.is_available is None:
+            try:
+                self.encode(np.zeros((4, 4, 4), dtype=np.uint8), 'BC3')
+                self.is_available = True
+            except Exception:
+                self.is_available = False
+        return self.is_available
+
+    def encode(self, rgba, fmt):
+        buffer = io.BytesIO()
+        Image.fromarray(np.ascontiguousarray(rgba, dtype=np.uint8), 'RGBA').save(
+            buffer, 'DDS', pixel_format=self.pixel_formats[fmt])
+        return buffer.getvalue()
+
+    def encode_level(self, rgba, fmt):
+        return self.encode(rgba, fmt)[128:]
+
+
+class NumbaEncoder(DDSEncoder):
+    """ Optional numba-compiled BC1/BC3 encoder, used when numba is installed """
+
+    name = 'numba'
+    formats = ('BC1', 'BC3')
+    thread_safe = False  # Already parallel inside the kernel
+    kernel = None
+    startup = {}
+    # The workqueue threading layer does not allow concurrent kernel launches
+    lock = threading.Lock()
+
+    def available(self):
+        return numba is not None
+
+    def encode_level(self, rgba, fmt):
+        if NumbaEncoder.kernel is None:
+            NumbaEncoder.kernel = build_numba_kernel()
+        return self.run_kernel(NumbaEncoder.kernel, rgba, fmt)
+
+    def run_kernel(self, kernel, rgba, fmt):
+        blocks = np.ascontiguousarray(image_to_blocks(np.ascontiguousarray(rgba, dtype=np.uint8)))
+        block_bytes = DDS_FORMATS[fmt][1]
+        out = np.empty((len(blocks), block_bytes), dtype=np.uint8)
+        with NumbaEncoder.lock:
+            kernel(blocks, out, fmt == 'BC3', np.array([1, 3, 2, 0], dtype=np.int64),
+                   np.array([1, 7, 6, 5, 4, 3, 2, 0], dtype=np.int64))
+        return out.tobytes()
+
+    def startup_cost(self, fmt):
+        if fmt not in self.startup:
+            self.startup[fmt] = self.measure_startup(fmt)
+        return self.startup[fmt]
+
+    def measure_startup(self, fmt):
+        # Measured in a new process, where the kernel is loaded from numba's disk cache (or
+        # compiled again) and the threading layer starts; here both are already done
+        script = (f"import sys, time; sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r}); "
+                  f"import numpy, skintool; start = time.perf_counter(); "
+                  f"skintool.NumbaEncoder().encode_level(numpy.zeros((4, 4, 4), numpy.uint8), {fmt!r}); "
+                  f"print(time.perf_counter() - start)")
+        if not getattr(sys, 'frozen', False):
+            try:
+                result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=300)
+                return float(result.stdout.strip().splitlines()[-1])
+            except (OSError, ValueError, IndexError, subprocess.SubprocessError) as e:
+                print(f"Error measuring the numba startup cost: {str(e)}")
+        start = time.perf_counter()
+        self.run_kernel(build_numba_kernel(), np.zeros((4, 4, 4), dtype=np.uint8), fmt)
+        return time.perf_counter() - start
+
+
+def build_numba_kernel():
+    """
+    Compiles the per-block numba encoder (same algorithm as the NumPy backend).
+    The machine code is cached on disk, so later processes skip the compilation;
+    frozen builds have no source file to key the cache on.
+    """
+
+    @numba.njit(parallel=True, cache=not getattr(sys, 'frozen', False))
+    def encode_blocks(blocks, out, with_alpha, lut4, lut8):
+        for n in numba.prange(blocks.shape[0]):
+            offset = 0
+            if with_alpha:
+                a0 = 0
+                a1 = 255
+                for k in range(16):
+                    a0 = max(a0, int(blocks[n, k, 3]))
+                    a1 = min(a1, int(blocks[n, k, 3]))
+                out[n, 0] = a0
+                out[n, 1] = a1
+                alpha_bits = 0
+                if a0 > a1:
+                    for k in range(16):
+                        q = int(np.rint((int(blocks[n, k, 3]) - a1) * 7.0 / (a0 - a1)))
+                        alpha_bits |= lut8[q] << (3 * k)
+                for i in range(6):
+                    out[n, 2 + i] = (alpha_bits >> (8 * i)) & 0xFF
+                offset = 8
+
+            # Principal axis of the block colors
+            mean = np.zeros(3)
+            low = np.full(3, 255.0)
+            high = np.zeros(3)
+            for k in range(16):
+                for c in range(3):
+                    v = float(blocks[n, k, c])
+                    mean[c] += v / 16.0
+                    low[c] = min(low[c], v)
+                    high[c] = max(high[c], v)
+            cov = np.zeros((3, 3))
+            for k in range(16):
+                for i in range(3):
+                    for j in range(3):
+                        cov[i, j] += (blocks[n, k, i] - mean[i]) * (blocks[n, k, j] - mean[j])
+            axis = high - low
+            step = np.zeros(3)
+            for _ in range(4):
+                for i in range(3):
+                    step[i] = cov[i, 0] * axis[0] + cov[i, 1] * axis[1] + cov[i, 2] * axis[2]
+                norm = max(abs(step[0]), abs(step[1]), abs(step[2]))
+                for i in range(3):
+                    axis[i] = step[i] / norm if norm > 0 else 1.0
+            length = np.sqrt(axis[0] * axis[0] + axis[1] * axis[1] + axis[2] * axis[2])
+            for i in range(3):
+                axis[i] /= length
+
+            pmin = 1e30
+            pmax = -1e30
+            for k in range(16):
+                p = 0.0
+                for c in range(3):
+                    p += (blocks[n, k, c] - mean[c]) * axis[c]
+                pmin = min(pmin, p)
+                pmax = max(pmax, p)
+
+            # Quantize the endpoints to RGB565
+            c0 = 0
+            c1 = 0
+            for e in range(2):
+                t = pmax if e == 0 else pmin
+                r = int(np.rint(min(max(mean[0] + axis[0] * t, 0.0), 255.0) * 31 / 255))
+                g = int(np.rint(min(max(mean[1] + axis[1] * t, 0.0), 255.0) * 63 / 255))
+                b = int(np.rint(min(max(mean[2] + axis[2] * t, 0.0), 255.0) * 31 / 255))
+                if e == 0:
+                    c0 = (r << 11) | (g << 5) | b
+                else:
+                    c1 = (r << 11) | (g << 5) | b
+            if c0 < c1:
+                c0, c1 = c1, c0
+
+            p0 = np.zeros(3)
+            p1 = np.zeros(3)
+            for e in range(2):
+                color = c0 if e == 0 else c1
+                target = p0 if e == 0 else p1
+                r = (color >> 11) & 31
+                g = (color >> 5) & 63
+                b = color & 31
+                target[0] = (r << 3) | (r >> 2)
+                target[1] = (g << 2) | (g >> 4)
+                target[2] = (b << 3) | (b >> 2)
+            direction = p0 - p1
+            length = direction[0] * direction[0] + direction[1] * direction[1] + direction[2] * direction[2]
+            color_bits = 0
+            if c0 != c1:
+                for k in range(16):
+                    t = 0.0
+                    for c in range(3):
+                        t += (blocks[n, k, c] - p1[c]) * direction[c]
+                    q = int(np.rint(min(max(t / length * 3, 0.0), 3.0)))
+                    color_bits |= lut4[q] << (2 * k)
+            out[n, offset + 0] = c0 & 0xFF
+            out[n, offset + 1] = c0 >> 8
+            out[n, offset + 2] = c1 & 0xFF
+            out[n, offset + 3] = c1 >> 8
+            for i in range(4):
+                out[n, offset + 4 + i] = (color_bits >> (8 * i)) & 0xFF
+
+    return encode_blocks
+
+
+ENCODERS = {encoder.name: encoder for encoder in (NumpyEncoder(), ImageioEncoder(), PillowEncoder(), NumbaEncoder())}
+
+
+def size_class(width, height):
+    """ Buckets textures so the autotuner can pick a backend per size """
+    pixels = width * height
+    if pixels <= 512 * 512:
+        return 'small'
+    if pixels <= 2048 * 2048:
+        return 'medium'
+    return 'large'
+
+
+def validate_dds(data, width, height, fmt):
+    """ Checks that encoded bytes are a single-level DDS of the requested format """
+    if len(data) != 128 + dds_level_size(width, height, fmt) or data[:4] != b'DDS ':
+        return False
+    fourcc = DDS_FORMATS[fmt][0]
+    return fourcc is None or data[84:88] == fourcc
+
+
+def benchmark_image(size):
+    """ Deterministic test texture with gradients, flat areas and noise """
+    y, x = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    noise = np.random.default_rng(size).integers(0, 48, (size, size, 4))
+    image = np.stack([x * 255, y * 255, (x * y) * 255, np.full_like(x, 255)], axis=-1)
+    image[: size // 2, : size // 2] = (90, 110, 70, 255)
+    return np.clip(image + noise * (image[..., :1] > 0), 0, 255).astype(np.uint8)
+
+
+class EncoderSelector:
+    """
+    Picks the encoder backend for each format and size class.
+
+    With backend 'auto' every available backend is benchmarked once per
+    format and size class on this machine; the fastest one whose output
+    validates and whose quality is within QUALITY_TOLERANCE dB of the best
+    backend is cached in the settings folder. Any other backend name pins it.
+    A backend's time includes what a new process pays before its first encode,
+    so a JIT kernel is not picked for sizes where loading it costs more than
+    it saves.
+    """
+
+    BENCH_SIZES = {'small': 256, 'medium': 1024, 'large': 2048}
+    QUALITY_TOLERANCE = 1.0  # dB of mean PSNR a faster backend may lose
+    CACHE_VERSION = 3
+
+    def __init__(self, backend='auto', cache_path=None):
+        self.backend = backend
+        self.cache_path = cache_path
+        self.cache = None
+        self.validated = set()
+
+    def get_cache_path(self):
+        return self.cache_path or os.path.join(get_settings_dir(), 'encoder_autotune.json')
+
+    def load_cache(self):
+        if self.cache is not None:
+            return self.cache
+        fingerprint = machine_fingerprint()
+        try:
+            with open(self.get_cache_path(), 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get('fingerprint') != fingerprint or cache.get('version') != self.CACHE_VERSION:
+                raise ValueError('hardware, library versions or selection rules changed')
+        except (OSError, ValueError):
+            cache = {'version': self.CACHE_VERSION, 'fingerprint': fingerprint, 'choices': {}, 'timings': {},
+                     'quality': {}}
+        self.cache = cache
+        return cache
+
+    def save_cache(self):
+        try:
+            with open(self.get_cache_path(), 'w', encoding='utf-8') as f:
+                json.dump(self.cache, f, indent=2)
+        except OSError as e:
+            print(f"Error saving encoder autotune results: {str(e)}")
+
+    def choose(self, fmt, width, height):
+        """ Returns the encoder to use for a texture """
+        if self.backend != 'auto':
+            encoder = ENCODERS.get(self.backend)
+            if encoder is None or not encoder.supports(fmt):
+                raise Exception(f"Encoder backend '{self.backend}' cannot write {fmt}")
+            if (self.backend, fmt) not in self.validated:
+                # Pinned backends are checked like autotuned ones, so a broken one fails instead of writing bad files
+                if not validate_dds(encoder.encode(benchmark_image(64), fmt), 64, 64, fmt):
+                    raise Exception(f"Encoder backend '{self.backend}' writes invalid {fmt} data")
+                self.validated.add((self.backend, fmt))
+            return encoder
+
+        cache = self.load_cache()
+        key = f"{fmt}/{size_class(width, height)}"
+        if key not in cache['choices']:
+            self.autotune(fmt, size_class(width, height))
+        return ENCODERS[cache['choices'][key]]
+
+    def autotune(self, fmt, size_name):
+        """ Benchmarks the available backends for one format and size class """
+        cache = self.load_cache()
+        size = self.BENCH_SIZES[size_name]
+        image = benchmark_image(size)
+        timings, quality = {}, {}
+        for name, encoder in ENCODERS.items():
+            if not encoder.supports(fmt):
+                continue
+            try:
+                # Warm-up run (JIT compilation, lazy imports) and validation
+                if not validate_dds(encoder.encode(image[:64, :64], fmt), 64, 64, fmt):
+                    continue
+                start = time.perf_counter()
+                data = encoder.encode(image, fmt)
+                elapsed = time.perf_counter() - start
+                if validate_dds(data, size, size, fmt):
+                    timings[name] = round(elapsed + encoder.startup_cost(fmt), 5)
+                    quality[name] = mean_psnr(round_trip_metrics(data, image))
+            except Exception as e:
+                print(f"Encoder backend {name} failed during autotune: {str(e)}")
+
+        if not timings:
+            raise Exception(f"No encoder backend can write {fmt}")
+        # A faster backend is only picked if it is not visibly worse
+        best_quality = max(quality.values())
+        eligible = [name for name in timings if quality[name] >= best_quality - self.QUALITY_TOLERANCE]
+        key = f"{fmt}/{size_name}"
+        cache['choices'][key] = min(eligible, key=timings.get)
+        cache['timings'][key] = timings
+        cache['quality'][key] = quality
+        self.save_cache()
+        return cache['choices'][key]
+
+    def autotune_all(self, formats=('BC3',)):
+        """ Re-runs the benchmark for every size class, discarding cached results """
+        self.cache = {'version': self.CACHE_VERSION, 'fingerprint': machine_fingerprint(), 'choices': {},
+                      'timings': {}, 'quality': {}}
+        for fmt in formats:
+            for size_name in self.BENCH_SIZES:
+                self.autotune(fmt, size_name)
+        return self.cache
+
+
+# ===== DDS DECODING =====
+
+# DX10 DXGI formats that can be decoded
+DXGI_FORMATS = {71: 'BC1', 72: 'BC1', 77: 'BC3', 78: 'BC3', 79: 'BC4', 80: 'BC4', 82: 'BC5', 83: 'BC5'}
+
+
+def parse_dds_header(data):
+    """ Returns width, height, mip count, format and payload offset of a DDS file """
+    if data[:4] != b'DDS ':
+        raise Exception('Not a DDS file')
+    height, width = struct.unpack_from('<II', data, 12)
+    mip_count = max(1, struct.unpack_from('<I', data, 28)[0])
+    pf_flags, fourcc, bit_count, r_mask, g_mask, b_mask, a_mask = struct.unpack_from('<I4sIIIII', data, 80)
+    offset = 128
+    if pf_flags & 0x4:
+        if fourcc == b'DX10':
+            dxgi_format = struct.unpack_from('<I', data, 128)[0]
+            fmt = DXGI_FORMATS.get(dxgi_format)
+            offset += 20
+        else:
+            fmt = {code: name for name, (code, _) in DDS_FORMATS.items() if code}.get(fourcc)
+        # Other writers name BC4/BC5 after the DX10 formats
+        fmt = fmt or {b'BC4U': 'BC4', b'BC5U': 'BC5'}.get(fourcc)
+    elif bit_count == 32 and (r_mask, g_mask, b_mask, a_mask) == (0x00FF0000, 0x0000FF00, 0x000000FF, 0xFF000000):
+        fmt = 'BGRA8'
+    else:
+        fmt = None
+    if fmt is None:
+        raise Exception(f"Unsupported DDS pixel format: {fourcc!r}")
+    return {'width': width, 'height': height, 'mip_count': mip_count, 'format': fmt, 'offset': offset}
+
+
+def decode_color_blocks(data, four_color_only=False):
+    """ Decodes (N, 8) BC1 color blocks into (N, 16, 4) RGBA pixels """
+    c0 = data[:, 0].astype(np.uint16) | (data[:, 1].astype(np.uint16) << 8)
+    c1 = data[:, 2].astype(np.uint16) | (data[:, 3].astype(np.uint16) << 8)
+    bits = np.ascontiguousarray(data[:, 4:8]).view('<u4')[:, 0]
+    p0 = unpack_rgb565(c0).astype(np.int32)
+    p1 = unpack_rgb565(c1).astype(np.int32)
+
+    palette = np.empty((len(data), 4, 4), dtype=np.int32)
+    palette[:, :, 3] = 255
+    palette[:, 0, :3] = p0
+    palette[:, 1, :3] = p1
+    four_color = (c0 > c1) | four_color_only
+    palette[:, 2, :3] = np.where(four_color[:, None], (2 * p0 + p1 + 1) // 3, (p0 + p1) // 2)
+    palette[:, 3, :3] = np.where(four_color[:, None], (p0 + 2 * p1 + 1) // 3, 0)
+    palette[:, 3, 3] = np.where(four_color, 255, 0)
+
+    indices = (bits[:, None] >> (2 * np.arange(16, dtype=np.uint32))) & 3
+    return palette[np.arange(len(data))[:, None], indices].astype(np.uint8)
+
+
+def decode_alpha_blocks(data):
+    """ Decodes (N, 8) BC4-style alpha blocks into (N, 16) values """
+    a0 = data[:, 0].astype(np.int32)
+    a1 = data[:, 1].astype(np.int32)
+    bits = np.zeros(len(data), dtype=np.uint64)
+    for i in range(6):
+        bits |= data[:, 2 + i].astype(np.uint64) << np.uint64(8 * i)
+
+    steps = np.arange(1, 7)
+    eight = a0 > a1
+    palette = np.empty((len(data), 8), dtype=np.int32)
+    palette[:, 0] = a0
+    palette[:, 1] = a1
+    interpolated8 = ((7 - steps)[None] * a0[:, None] + steps[None] * a1[:, None] + 3) // 7
+    interpolated6 = ((5 - steps[:4])[None] * a0[:, None] + steps[None, :4] * a1[:, None] + 2) // 5
+    palette[:, 2:8] = interpolated8
+    palette[~eight, 2:6] = interpolated6[~eight]
+    palette[~eight, 6] = 0
+    palette[~eight, 7] = 255
+
+    indices = ((bits[:, None] >> (3 * np.arange(16, dtype=np.uint64))) & np.uint64(7)).astype(np.intp)
+    return palette[np.arange(len(data))[:, None], indices].astype(np.uint8)
+
+
+def decode_blocks(payload, fmt, rows=None):
+    """ Decodes the blocks of one BC level (optionally only the given block rows) into (N, 16, 4) """
+    block_bytes = DDS_FORMATS[fmt][1]
+    data = np.frombuffer(payload, dtype=np.uint8)
+    data = data[:len(data) - len(data) % block_bytes].reshape(-1, block_bytes)
+    if rows is not None:
+        data = data[rows]
+    if fmt == 'BC1':
+        return decode_color_blocks(data)
+    if fmt in FORMAT_CHANNELS:
+        # Missing channels read as 0 and alpha as opaque, like a GPU sampler
+        pixels = np.zeros((len(data), 16, 4), dtype=np.uint8)
+        pixels[:, :, 3] = 255
+        for channel in range(FORMAT_CHANNELS[fmt]):
+            pixels[:, :, channel] = decode_alpha_blocks(data[:, 8 * channel:8 * channel + 8])
+        return pixels
+    pixels = decode_color_blocks(data[:, 8:16], four_color_only=True)
+    pixels[:, :, 3] = decode_alpha_blocks(data[:, 0:8])
+    return pixels
+
+
+def blocks_to_image(blocks, width, height):
+    """ Reassembles (N, 16, C) blocks into an image, cropping the edge padding """
+    blocks_x, blocks_y = (width + 3) // 4, (height + 3) // 4
+    channels = blocks.shape[2]
+    image = blocks.reshape(blocks_y, blocks_x, 4, 4, channels).swapaxes(1, 2)
+    return image.reshape(blocks_y * 4, blocks_x * 4, channels)[:height, :width]
+
+
+def decode_dds(data):
+    """ Decodes the top level of a DDS file (bytes or path) into an RGBA array """
+    if isinstance(data, str):
+        with open(data, 'rb') as f:
+            data = f.read()
+    info = parse_dds_header(data)
+    width, height, fmt = info['width'], info['height'], info['format']
+    payload = data[info['offset']:info['offset'] + dds_level_size(width, height, fmt)]
+    if fmt == 'BGRA8':
+        return np.frombuffer(payload, dtype=np.uint8).reshape(height, width, 4)[:, :, [2, 1, 0, 3]]
+    return blocks_to_image(decode_blocks(payload, fmt), width, height)
+
+
+def channel_metrics(decoded, reference, channel_names):
+    """ Per-channel PSNR (None when lossless) and max absolute error """
+    metrics = {}
+    difference = decoded.astype(np.int32) - reference.astype(np.int32)
+    for index, name in enumerate(channel_names):
+        channel = difference[..., index]
+        mse = float(np.mean(channel.astype(np.float64) ** 2))
+        metrics[name] = {
+            'psnr': round(float(10 * np.log10(255.0 ** 2 / mse)), 2) if mse else None,
+            'max_error': int(np.abs(channel).max()),
+        }
+    return metrics
+
+
+def round_trip_metrics(dds_data, reference, channel_names=('R', 'G', 'B', 'A'), sample=1.0):
+    """
+    Decodes an encoded DDS and compares it with the array it was encoded from.
+
+    With sample < 1 only that fraction of the 4x4 blocks (a fixed, evenly
+    spread subset) is decoded, which keeps the check cheap in watch mode.
+    """
+    info = parse_dds_header(dds_data)
+    width, height, fmt = info['width'], info['height'], info['format']
+    payload = dds_data[info['offset']:info['offset'] + dds_level_size(width, height, fmt)]
+    reference = np.asarray(reference)
+    if reference.ndim == 2:
+        reference = reference[:, :, None]
+
+    if fmt == 'BGRA8':
+        decoded = decode_dds(dds_data)
+        return channel_metrics(decoded[..., :reference.shape[2]], reference, channel_names)
+
+    reference_blocks = image_to_blocks(reference)
+    rows = None
+    if sample < 1.0:
+        step = max(1, int(round(1.0 / max(sample, 1e-6))))
+        rows = np.arange(0, len(reference_blocks), step)
+        reference_blocks = reference_blocks[rows]
+    decoded = decode_blocks(payload, fmt, rows)
+    return channel_metrics(decoded[..., :reference.shape[2]], reference_blocks, channel_names)
+
+
+def mean_psnr(channels, lossless=100.0):
+    """ Mean PSNR over the channels of round_trip_metrics, counting lossless channels as lossless dB """
+    values = [lossless if values['psnr'] is None else values['psnr'] for values in channels.values()]
+    return round(sum(values) / len(values), 2)
+
+
+def format_metrics(metrics):
+    """ One line per output, e.g. '_n: roughness 41.2 dB (max 6), ...' """
+    lines = []
+    for output, channels in metrics.items():
+        parts = []
+        for name, values in channels.items():
+            psnr = 'lossless' if values['psnr'] is None else f"{values['psnr']:.1f} dB"
+            parts.append(f"{name} {psnr} (max {values['max_error']})")
+        lines.append(f"{output}: " + ', '.join(parts))
+    return '\n'.join(lines)
+
+
+def encode_tiled(encoder, rgba, fmt, workers=1, tile_height=None, initializer=None):
+    """
+    Encodes an image in horizontal strips on a thread pool and joins the payloads in order.
+    initializer runs on every pool thread before it encodes (see Throttle.enter_thread).
+    """
+    height = rgba.shape[0]
+    if workers <= 1 or not tile_height or height <= tile_height or not encoder.thread_safe:
+        return encoder.encode_level(rgba, fmt)
+    # Strips must hold whole block rows so the payloads can simply be concatenated
+    tile_height = max(4, tile_height - tile_height % 4)
+    strips = [rgba[top:top + tile_height] for top in range(0, height, tile_height)]
+    with ThreadPoolExecutor(max_workers=workers, initializer=initializer) as pool:
+        return b''.join(pool.map(lambda strip: encoder.encode_level(strip, fmt), strips))
+
+
+class PerformanceTuner:
+    """
+    Finds the worker count and tile height that suit this machine.
+
+    A short synthetic conversion is timed at several worker counts and tile
+    heights; the fastest configuration is stored in the per-user settings
+    folder and measured again when the hardware or library versions change.
+    """
+
+    TILE_HEIGHTS = (64, 128, 256, 512)
+    BENCH_SIZE = 1024
+
+    def __init__(self, settings_path=None):
+        self.settings_path = settings_path
+        self.settings = None
+
+    def get_settings_path(self):
+        return self.settings_path or os.path.join(get_settings_dir(), 'performance.json')
+
+    def worker_candidates(self):
+        cpu_count = os.cpu_count() or 1
+        candidates = []
+        workers = 1
+        while workers < cpu_count:
+            candidates.append(workers)
+            workers *= 2
+        candidates.append(cpu_count)
+        return candidates
+
+    def load(self):
+        """ Returns the stored settings, or None when missing or measured on other hardware """
+        try:
+            with open(self.get_settings_path(), 'r', encoding='utf-8') as f:
+                settings = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if settings.get('fingerprint') != machine_fingerprint():
+            return None
+        return settings
+
+    def get(self, encoder_selector=None):
+        """ Returns (workers, tile_height), autotuning on first use """
+        if self.settings is None:
+            self.settings = self.load() or self.autotune(encoder_selector)
+        return self.settings['workers'], self.settings['tile_height']
+
+    def autotune(self, encoder_selector=None, fmt='BC3'):
+        """ Times a synthetic conversion for every worker count and tile height """
+        encoder_selector = encoder_selector or EncoderSelector()
+        image = benchmark_image(self.BENCH_SIZE)
+        encoder = encoder_selector.choose(fmt, self.BENCH_SIZE, self.BENCH_SIZE)
+        # Warm-up so lazy initialisation is not billed to the first candidate
+        encode_tiled(encoder, image[:64], fmt)
+
+        timings = {}
+        for workers in self.worker_candidates():
+            for tile_height in self.TILE_HEIGHTS:
+                start = time.perf_counter()
+                encode_tiled(encoder, image, fmt, workers, tile_height)
+                timings[f"{workers}x{tile_height}"] = round(time.perf_counter() - start, 5)
+                if workers == 1:
+                    # Tile height does not matter without parallelism
+                    break
+
+        best = min(timings, key=timings.get)
+        workers, tile_height = (int(value) for value in best.split('x'))
+        self.settings = {
+            'fingerprint': machine_fingerprint(),
+            'encoder': encoder.name,
+            'workers': workers,
+            'tile_height': tile_height,
+            'timings': timings,
+        }
+        try:
+            with open(self.get_settings_path(), 'w', encoding='utf-8') as f:
+                json.dump(self.settings, f, indent=2)
+        except OSError as e:
+            print(f"Error saving performance settings: {str(e)}")
+        return self.settings
+
+
+# ===== LOW-IMPACT MODE =====
+
+# ioprio_set system call numbers, Python has no wrapper for it
+IOPRIO_SET_SYSCALLS = {'x86_64': 251, 'amd64': 251, 'i386': 289, 'i686': 289, 'aarch64': 30, 'arm64': 30}
+IOPRIO_CLASS_IDLE = 3
+
+
+def set_idle_io_priority(thread_id=0):
+    """ Moves a Linux thread (0 = the calling one) to the idle I/O class, like ionice -c3 """
+    number = IOPRIO_SET_SYSCALLS.get(platform.machine().lower())
+    if platform.system() != 'Linux' or number is None:
+        return False
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        # IOPRIO_WHO_PROCESS applies to a single thread on Linux
+        return libc.syscall(number, 1, thread_id, IOPRIO_CLASS_IDLE << 13) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+class Throttle:
+    """
+    Low-impact mode for background conversions, so the game keeps its frame rate.
+
+    Threads that enter it run at the lowest CPU and I/O priority (nice 19 and
+    the idle I/O class on Linux, background mode on Windows), encoding uses at
+    most `cores` threads, and new sets wait while the load average per core
+    is above pause_load. Threads that never enter it, such as the GUI thread
+    running an interactive conversion, keep their normal priority. The numba
+    encoder is not used in this mode (see SkinConverter.choose_encoder).
+    """
+
+    def __init__(self, cores=None, pause_load=None, check_interval=2.0):
+        self.cores = max(1, cores or (os.cpu_count() or 2) // 2)
+        self.pause_load = pause_load
+        self.check_interval = check_interval
+        self.paused_seconds = 0.0
+
+    def enter_thread(self):
+        """ Lowers the CPU and I/O priority of the calling thread (threads it starts inherit it on Linux) """
+        if platform.system() == 'Windows':
+            # THREAD_MODE_BACKGROUND_BEGIN also lowers I/O and memory priority
+            windll.kernel32.SetThreadPriority(windll.kernel32.GetCurrentThread(), 0x00010000)
+        else:
+            try:
+                # The nice value is per thread on Linux
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+            except (AttributeError, OSError) as e:
+                print(f"Error lowering thread priority: {str(e)}")
+            set_idle_io_priority()
+
+    def enter_process(self):
+        """ Lowers the priority of the whole process, for command line workers """
+        if platform.system() == 'Windows':
+            # PROCESS_MODE_BACKGROUND_BEGIN
+            windll.kernel32.SetPriorityClass(windll.kernel32.GetCurrentProcess(), 0x00100000)
+        self.enter_thread()
+
+    def limit_workers(self, workers):
+        return max(1, min(workers or 1, self.cores))
+
+    def load_per_core(self):
+        """ 1-minute load average divided by the core count, 0.0 where it is not available """
+        try:
+            return os.getloadavg()[0] / (os.cpu_count() or 1)
+        except (AttributeError, OSError):
+            return 0.0
+
+    def wait(self, cancelled=None):
+        """ Blocks while the system is busier than pause_load """
+        if not self.pause_load:
+            return
+        start = time.monotonic()
+        while self.load_per_core() > self.pause_load:
+            if cancelled is not None and cancelled.is_set():
+                break
+            time.sleep(self.check_interval)
+        self.paused_seconds += time.monotonic() - start
+
+
+# ===== HIGH BIT DEPTH INPUT =====
+
+# Pillow modes holding more than 8 bits per sample (16-bit grayscale PNGs decode as I;16)
+HIGH_BIT_MODES = ('I;16', 'I;16L', 'I;16B', 'I')
+
+# 4x4 ordered dither thresholds
+BAYER_4X4 = np.array([[0, 8, 2, 10],
+                      [12, 4, 14, 6],
+                      [3, 11, 1, 9],
+                      [15, 7, 13, 5]])
+
+
+def reduction_lut(depth, threshold=0.5):
+    """ Maps every code of the given bit depth to 8 bits, rounding at threshold """
+    maximum = (1 << depth) - 1
+    codes = np.arange(maximum + 1, dtype=np.float32) * np.float32(255.0 / maximum)
+    return np.clip(codes + threshold, 0, 255).astype(np.uint8)
+
+
+def roughness_lut(level, depth=8, threshold=0.0):
+    """ Maps every roughness code of the given bit depth to the 8-bit smoothness curve """
+    maximum = (1 << depth) - 1
+    smoothness = (maximum - np.arange(maximum + 1)).astype(np.float32) / np.float32(maximum)
+    return np.clip(np.power(smoothness, 1 / level) * 255.0 + threshold, 0, 255).astype(np.uint8)
+
+
+def apply_lut(array, make_lut, dither=False, threshold=0.5):
+    """
+    Looks every sample up in a LUT built by make_lut(threshold).
+
+    With dither, each of the 16 positions of the 4x4 Bayer pattern gets its own
+    LUT, so the output is written directly as uint8 without float temporaries.
+    """
+    if not dither:
+        return make_lut(threshold)[array]
+    out = np.empty(array.shape, dtype=np.uint8)
+    for y in range(4):
+        for x in range(4):
+            out[y::4, x::4] = make_lut((BAYER_4X4[y, x] + 0.5) / 16)[array[y::4, x::4]]
+    return out
+
+
+def sample_depth(array):
+    return 16 if array.dtype == np.uint16 else 8
+
+
+def to_uint8(array, dither=False):
+    """ Reduces a map to 8 bits per sample; 8-bit maps are returned unchanged """
+    if array.dtype == np.uint8:
+        return array
+    return apply_lut(array, lambda threshold: reduction_lut(16, threshold), dither)
+
+
+# ===== RESAMPLING =====
+
+def resample_axis(array, size, axis, upscale='bilinear'):
+    """
+    Resamples one axis of an integer image to size samples.
+
+    Shrinking averages the source samples covered by each output sample (box
+    filter); growing uses nearest or 8-bit fixed point bilinear interpolation.
+    The array is returned as is when the size already matches.
+    """
+    length = array.shape[axis]
+    if size == length:
+        return array
+    shape = [1] * array.ndim
+    shape[axis] = size
+
+    if size < length:
+        # Accumulate the n-th sample of every box at once; boxes are 1 sample
+        # shorter at non-integer ratios, so their missing samples are masked out
+        edges = (np.arange(size) * length) // size
+        counts = np.diff(np.append(edges, length))
+        sums = None
+        for offset in range(counts.max()):
+            if length % size == 0:
+                index = [slice(None)] * array.ndim
+                index[axis] = slice(offset, None, length // size)
+                part = array[tuple(index)]
+            else:
+                part = np.take(array, np.minimum(edges + offset, length - 1), axis=axis)
+                if offset >= counts.min():
+                    part = part * (offset < counts).reshape(shape)
+            sums = part.astype(np.uint32) if sums is None else sums + part
+        counts = counts.reshape(shape).astype(np.uint32)
+        return ((sums + counts // 2) // counts).astype(array.dtype)
+
+    if upscale == 'nearest':
+        return np.take(array, (np.arange(size) * length) // size, axis=axis)
+    positions = np.clip((np.arange(size) + 0.5) * length / size - 0.5, 0, length - 1)
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.minimum(lower + 1, length - 1)
+    weight = np.rint((positions - lower) * 256).astype(np.uint32).reshape(shape)
+    blended = (np.take(array, lower, axis=axis).astype(np.uint32) * (256 - weight) +
+               np.take(array, upper, axis=axis).astype(np.uint32) * weight + 128) >> 8
+    return blended.astype(array.dtype)
+
+
+def resize_map(array, width, height, upscale='bilinear'):
+    """ Brings a decoded map to width x height; maps that already match are not copied """
+    return resample_axis(resample_axis(array, height, 0, upscale), width, 1, upscale)
+
+
+def parse_resolution(text):
+    """ Parses 'largest', 'smallest', '2048' or '2048x1024' into a resample target """
+    text = str(text).strip().lower()
+    if text in ('largest', 'smallest'):
+        return text
+    try:
+        width, _, height = text.partition('x')
+        size = (int(width), int(height or width))
+    except ValueError:
+        raise ValueError(f"Invalid resolution: {text}")
+    if min(size) < 1:
+        raise ValueError(f"Invalid resolution: {text}")
+    return size
+
+
+def pyramid_level(levels, size, upscale='bilinear'):
+    """
+    Returns a map at size (width, height) from a pyramid {size: array} of the
+    same map. Missing sizes are derived from the smallest level at least as
+    large (the largest level when enlarging) and added to the pyramid.
+    """
+    if size not in levels:
+        larger = [level for level in levels if level[0] >= size[0] and level[1] >= size[1]]
+        if larger:
+            source = min(larger, key=lambda level: level[0] * level[1])
+        else:
+            source = max(levels, key=lambda level: level[0] * level[1])
+        levels[size] = resize_map(levels[source], size[0], size[1], upscale)
+    return levels[size]
+
+
+VARIANT_MANIFEST = 'variants.json'
+VARIANT_FORMATS = ('BC3', 'BGRA8')
+
+
+def parse_variants(entries):
+    """
+    Validates variant profiles, e.g.
+        [{"name": "air", "alpha_fill": "white", "output": "air"},
+         {"name": "ground_2k", "alpha_fill": "black", "resolution": "2048", "output": "ground", "suffix": "_2k"}]
+    Settings a profile leaves out are taken from the converter. output is a
+    subfolder of the output folder, suffix is added to the base name.
+    """
+    variants, targets = [], {}
+    for index, entry in enumerate(entries):
+        variant = {
+            'name': str(entry.get('name') or entry.get('suffix', '').strip('_') or entry.get('output')
+                        or f"variant{index + 1}"),
+            'output': str(entry.get('output') or '').replace('\\', '/').strip('/'),
+            'suffix': str(entry.get('suffix', '')),
+        }
+        if 'alpha_fill' in entry:
+            if entry['alpha_fill'] not in ('white', 'black'):
+                raise ValueError(f"Variant {variant['name']}: alpha_fill must be white or black")
+            variant['alpha_fill'] = entry['alpha_fill']
+        if 'resolution' in entry:
+            resolution = entry['resolution']
+            if isinstance(resolution, (list, tuple)):
+                # Already parsed, e.g. profiles passed on to queue workers
+                resolution = 'x'.join(str(value) for value in resolution)
+            variant['resolution'] = parse_resolution(resolution)
+        if 'format' in entry:
+            if entry['format'] not in VARIANT_FORMATS:
+                raise ValueError(f"Variant {variant['name']}: format must be one of {', '.join(VARIANT_FORMATS)}")
+            variant['format'] = entry['format']
+        target = (variant['output'], variant['suffix'])
+        if target in targets:
+            raise ValueError(f"Variants {targets[target]} and {variant['name']} write the same files")
+        targets[target] = variant['name']
+        variants.append(variant)
+    return variants
+
+
+def load_variants(path):
+    """ Reads variant profiles from a JSON file """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return parse_variants(json.load(f))
+    except (OSError, ValueError) as e:
+        raise Exception(f"Error reading {os.path.basename(path)}: {str(e)}")
+
+
+def find_variants(folder):
+    """ Variant profiles of the variants.json in a source folder, or [] without one """
+    path = os.path.join(folder, VARIANT_MANIFEST) if folder and os.path.isdir(folder) else None
+    return load_variants(path) if path and os.path.exists(path) else []
+
+
+# ===== DECODED PLANE CACHE =====
+
+class PlaneCache:
+    """
+    Disk cache of decoded source maps stored as .npy files.
+
+    Entries are keyed by path, size and modification time, so an edited map is
+    decoded again, and by a variant naming the channels that were kept. Hits
+    are memory-mapped instead of read. The least recently used entries are
+    deleted once the cache grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=2 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get_cache_dir(self):
+        return self.cache_dir or os.path.join(get_settings_dir(), 'plane_cache')
+
+    def entry_path(self, path, variant='', signature=None):
+        if signature is None:
+            stat = os.stat(path)
+            signature = (stat.st_size, stat.st_mtime_ns)
+        key = f"{os.path.abspath(path)}|{signature[0]}|{signature[1]}"
+        if variant:
+            key += f"|{variant}"
+        return os.path.join(self.get_cache_dir(), hashlib.sha1(key.encode('utf-8')).hexdigest() + '.npy')
+
+    def get(self, path, variant='', signature=None, writable=False):
+        """ Returns the cached plane of a source file as a read-only (or writable) memmap, or None """
+        entry = self.entry_path(path, variant, signature)
+        try:
+            array = np.load(entry, mmap_mode='r+' if writable else 'r')
+            # The modification time of an entry is its last use
+            os.utime(entry)
+        except (OSError, ValueError):
+            return None
+        return array
+
+    def put(self, path, array, variant='', signature=None):
+        """ Stores a decoded plane, evicting old entries if the cache is full """
+        entry = self.entry_path(path, variant, signature)
+        temp_path = f"{entry}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(entry), exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(array))
+            os.replace(temp_path, entry)
+        except OSError as e:
+            print(f"Error writing plane cache: {str(e)}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self.evict()
+
+    def rename(self, path, variant, signature, new_signature):
+        """ Moves an entry to the new signature of its file, e.g. after the entry was updated in place """
+        try:
+            os.replace(self.entry_path(path, variant, signature), self.entry_path(path, variant, new_signature))
+            return True
+        except OSError:
+            return False
+
+    def load(self, path, decode, variant='', signature=None):
+        """
+        Returns the decoded plane of a file, calling decode(path) on a cache miss.
+
+        signature replaces the (size, mtime) of path for sources that are not plain files.
+        """
+        array = self.get(path, variant, signature)
+        with self.lock:
+            if array is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if array is not None:
+            return array
+        array = decode(path)
+        if self.max_bytes > 0 and array.nbytes <= self.max_bytes:
+            self.put(path, array, variant, signature)
+        return array
+
+    def entries(self):
+        """ Returns (last use, size, path) of every entry, oldest first """
+        cache_dir = self.get_cache_dir()
+        entries = []
+        try:
+            for name in os.listdir(cache_dir):
+                if name.endswith('.npy'):
+                    try:
+                        stat = os.stat(os.path.join(cache_dir, name))
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, os.path.join(cache_dir, name)))
+        except OSError:
+            return []
+        return sorted(entries)
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(entry)
+                total -= size
+            except OSError:
+                # Still mapped by another conversion (Windows) or already removed
+                pass
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def clear(self):
+        for _, _, entry in self.entries():
+            try:
+                os.remove(entry)
+            except OSError:
+                pass
+
+
+# ===== OUTPUT DEPENDENCY GRAPH =====
+
+class FileLock:
+    """
+    Lock shared between processes, held by creating a file with O_EXCL.
+
+    A lock file older than stale_after seconds was left by a crashed process and is broken.
+    """
+
+    def __init__(self, path, stale_after=30.0, timeout=60.0):
+        self.path = path
+        self.stale_after = stale_after
+        self.timeout = timeout
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.path) > self.stale_after:
+                        os.remove(self.path)
+                        continue
+                except OSError:
+                    continue
+            if time.monotonic() > deadline:
+                raise Exception(f"Error locking {self.path}: timed out")
+            time.sleep(0.05)
+
+    def __exit__(self, *exc_info):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class OutputManifest:
+    """
+    Fingerprints of the outputs last written to a folder.
+
+    Stored as a JSON file next to the DDS files, so every entry point (GUI,
+    command line, daemon) sees the same state.
+    """
+
+    FILE_NAME = '.skintool_manifest.json'
+    VERSION = 1
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.path = os.path.join(folder, self.FILE_NAME)
+        self.outputs = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.VERSION:
+                self.outputs = data.get('outputs', {})
+        except (OSError, ValueError):
+            pass
+
+    def key(self, output_path):
+        """ Outputs are listed by their path relative to the folder, e.g. 'ground/tank_c.dds' for variants """
+        return os.path.relpath(output_path, self.folder).replace(os.sep, '/')
+
+    def is_current(self, output_path, fingerprint):
+        """ True when the output exists unchanged and was built from the same fingerprint """
+        entry = self.outputs.get(self.key(output_path))
+        if not entry or entry.get('fingerprint') != fingerprint:
+            return False
+        try:
+            return os.path.getsize(output_path) == entry.get('size')
+        except OSError:
+            return False
+
+    def record(self, output_path, fingerprint):
+        self.outputs[self.key(output_path)] = {
+            'fingerprint': fingerprint,
+            'size': os.path.getsize(output_path),
+        }
+
+    def save(self):
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.VERSION, 'outputs': self.outputs}, f, indent=2, sort_keys=True)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Error saving output manifest: {str(e)}")
+
+
+class BatchJournal:
+    """
+    Append-only journal of a conversion batch: the planned sets, then a started
+    and a completed line per set with the hashes of the outputs it wrote.
+
+    Each line is flushed to disk as it is written, so after a crash the journal
+    tells which sets finished. A batch started again with the same settings
+    resumes: completed sets whose outputs still match their hashes and whose
+    sources did not change are skipped, interrupted ones are converted again.
+    Completed sets are recognised even when auto delete already removed their
+    source PNGs.
+    """
+
+    FILE_NAME = '.skintool_journal.jsonl'
+
+    def __init__(self, folder):
+        self.path = os.path.join(folder, self.FILE_NAME)
+        self.lock = threading.Lock()
+        self.done = set()
+        self.lost = {}
+        self.resumed = False
+
+    def read(self):
+        """ Returns the journal lines; a line torn by a crash ends the journal """
+        events = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        break
+        except OSError:
+            pass
+        return events
+
+    def begin(self, base_names, settings):
+        """
+        Starts a batch, or resumes the previous one if it was interrupted with the
+        same settings. Returns the sets to run: those of the interrupted batch
+        followed by any new ones.
+        """
+        settings = json.loads(json.dumps(settings))
+        events = self.read()
+        if events and events[0].get('event') == 'planned' and events[0].get('settings') == settings \
+                and not any(event.get('event') == 'finished' for event in events):
+            completed = {event['set']: event.get('outputs', {}) for event in events
+                         if event.get('event') == 'completed'}
+            folder = os.path.dirname(self.path)
+            for base_name, outputs in completed.items():
+                changed = [name for name, entry in outputs.items()
+                           if not self.output_matches(os.path.join(folder, name), entry)]
+                if not changed:
+                    self.done.add(base_name)
+                else:
+                    self.lost[base_name] = changed
+            planned = events[0]['sets']
+            base_names = planned + [base_name for base_name in base_names if base_name not in planned]
+            self.resumed = True
+            self.append('resumed', sets=base_names)
+        else:
+            base_names = list(base_names)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write('')
+            self.append('planned', sets=base_names, settings=settings)
+        return base_names
+
+    def output_matches(self, path, entry):
+        try:
+            if os.path.getsize(path) != entry['size']:
+                return False
+            with open(path, 'rb') as f:
+                return hashlib.sha1(f.read()).hexdigest() == entry['sha1']
+        except OSError:
+            return False
+
+    def is_done(self, base_name, sources_exist):
+        """
+        True when the set completed in the interrupted batch and its outputs are intact.
+
+        Raises when its outputs changed but the sources are gone, so it cannot be rebuilt.
+        """
+        if base_name in self.done:
+            return True
+        if base_name in self.lost and not sources_exist:
+            raise Exception(f"Error resuming batch: source maps were deleted and "
+                            f"{', '.join(self.lost[base_name])} changed since the set was converted")
+        return False
+
+    def append(self, event, **fields):
+        line = json.dumps(dict(fields, event=event, time=time.time()))
+        with self.lock:
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError as e:
+                print(f"Error writing batch journal: {str(e)}")
+
+    def started(self, base_name):
+        self.append('started', set=base_name)
+
+    def completed(self, base_name, outputs):
+        """ outputs maps each written file name to {'sha1', 'size'} """
+        self.append('completed', set=base_name, outputs=outputs)
+
+    def failed(self, base_name, error):
+        self.append('failed', set=base_name, error=error)
+
+    def finish(self):
+        self.append('finished')
+
+
+def is_archive(path):
+    return bool(path) and str(path).lower().endswith('.zip') and os.path.isfile(path)
+
+
+class ArchiveSource:
+    """
+    PNG members of a zip archive used as a source folder.
+
+    Members are indexed by file name, so sets inside subfolders of the archive
+    are found too, and are streamed into the decoder without being extracted.
+    A PNG name found in several folders of the archive is an error, since the
+    maps of different sets would be mixed up.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.signature = self.file_signature()
+        self.zip = zipfile.ZipFile(path)
+        self.members = {}
+        for info in self.zip.infolist():
+            name = info.filename.rsplit('/', 1)[-1]
+            if not name or info.is_dir():
+                continue
+            if name in self.members and name.lower().endswith('.png'):
+                self.zip.close()
+                raise Exception(f"Error reading archive {path}: {name} is both in "
+                                f"{self.members[name].filename} and {info.filename}; "
+                                f"texture sets in different folders of an archive need different names")
+            self.members.setdefault(name, info)
+
+    def file_signature(self):
+        stat = os.stat(self.path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def is_current(self):
+        """ False once the archive file was replaced or modified """
+        try:
+            return self.file_signature() == self.signature
+        except OSError:
+            return False
+
+    def open(self, name):
+        return self.zip.open(self.members[name])
+
+    def close(self):
+        self.zip.close()
+
+
+class SkinConverter:
+    """
+    Converts Substance Painter texture sets (PNG) into War Thunder DDS files.
+
+    The engine holds no Qt state so the GUI and the command line share it.
+    """
+
+    MAP_TYPES = ('BaseColor', 'Metallic', 'Normal', 'Roughness')
+    # Channels of each map the packing layout uses; 'L' is a single plane
+    MAP_CHANNELS = {'BaseColor': ('R', 'G', 'B'), 'Metallic': ('L',), 'Normal': ('R', 'G'), 'Roughness': ('L',)}
+    COLOR_CHANNELS = ('R', 'G', 'B', 'A')
+    NMR_CHANNELS = ('roughness', 'normal_g', 'metallic', 'normal_r')
+    # Output graph: the source maps and settings each DDS file depends on
+    OUTPUTS = {
+        '_c.dds': (('BaseColor',), ('alpha_fill', 'resolution', 'dds_format', 'encoder')),
+        '_n.dds': (('Normal', 'Metallic', 'Roughness'),
+                   ('roughness_level', 'dither', 'resolution', 'dds_format', 'encoder')),
+    }
+    # Maps of mismatched resolutions are resampled to the largest, smallest or a fixed (width, height)
+    RESOLUTION_TARGETS = ('largest', 'smallest')
+    # Block patching falls back to a full encode above this changed fraction
+    PATCH_MAX_FRACTION = 0.5
+    PATCH_COLUMNS = 1024  # Blocks per row of the image the changed blocks are encoded in
+
+    def __init__(self, folder=None, output_folder=None, alpha_fill='white', auto_delete=False, encoder='auto',
+                 plane_cache=None):
+        self.folder = folder
+        # Sets read from a zip archive are written next to it by default
+        self.output_folder = output_folder or (os.path.dirname(os.path.abspath(folder)) if is_archive(folder) else folder)
+        self.alpha_fill = alpha_fill
+        self.auto_delete = auto_delete
+        self.roughness_level = 0.65
+        self.dds_format = 'BC3'  # DXT5
+        self.encoder_selector = EncoderSelector(encoder)
+        self.tuner = PerformanceTuner()
+        self.workers = None  # None uses the autotuned worker count
+        self.throttle = None  # Throttle of low-impact background runs
+        # Decoded maps are reused when only settings change; pass False to disable
+        self.plane_cache = PlaneCache() if plane_cache is None else plane_cache
+        self.dither = False  # Ordered dithering when reducing 16-bit maps to 8 bits
+        self.resample_target = 'largest'  # 'largest', 'smallest' or a fixed (width, height)
+        self.upscale_filter = 'bilinear'  # 'bilinear' or 'nearest'
+        self.incremental = True  # Only rebuild outputs whose inputs or settings changed
+        self.patch_blocks = False  # Re-encode only the changed 4x4 blocks and patch the DDS files in place
+        self.verify = False  # Decode the outputs again and measure the encoding error
+        self.verify_sample = 1.0  # Fraction of 4x4 blocks checked when verifying
+        self.last_metrics = {}
+        self.last_journal = None
+        self.output_archive = None  # Zip file the DDS files are written into instead of output_folder
+        self.archive = None
+        self.archive_writer = None
+        self.archive_lock = threading.Lock()
+        # Variant profiles (see parse_variants) built from one decode of each set instead of the single output
+        self.variants = []
+        self.variant_name = None
+        self.variant_folder = ''  # Subfolder of the output folder a variant writes into
+        self.name_suffix = ''  # Added to the base name in the output file names of a variant
+
+    @classmethod
+    def from_params(cls, params):
+        """ Builds a converter from the JSON parameters of a daemon or shared queue job """
+        converter = cls(params['folder'], params.get('output'),
+                        alpha_fill=params.get('alpha_fill', 'white'),
+                        auto_delete=bool(params.get('delete_pngs', False)),
+                        encoder=params.get('encoder', 'auto'))
+        converter.dither = bool(params.get('dither', False))
+        converter.incremental = not params.get('force', False)
+        converter.patch_blocks = bool(params.get('patch_blocks', False))
+        converter.resample_target = parse_resolution(params.get('resolution', 'largest'))
+        converter.upscale_filter = params.get('upscale', 'bilinear')
+        converter.output_archive = params.get('output_zip')
+        converter.variants = parse_variants(params.get('variants', []))
+        verify = params.get('verify', False)
+        if verify:
+            converter.verify = True
+            converter.verify_sample = 1.0 if verify is True else float(verify)
+        return converter
+
+    def set_files(self, base_name):
+        """ Returns the (base color, metallic, normal, roughness) file names of a set """
+        return tuple(f"{base_name}_{map_type}.png" for map_type in self.MAP_TYPES)
+
+    def find_texture_sets(self):
+        """ Returns the base names of all complete texture sets in the source folder """
+        png_files = [f for f in self.source_names() if f.endswith('.png')]
+        base_names = set(f.rsplit('_', 1)[0] for f in png_files)
+        return sorted(base_name for base_name in base_names if self.is_complete_set(base_name))
+
+    def is_complete_set(self, base_name):
+        return all(self.source_exists(f) for f in self.set_files(base_name))
+
+    def source(self):
+        """ The zip archive the sets are read from, or None when folder is a directory """
+        if not is_archive(self.folder):
+            return None
+        with self.archive_lock:
+            if self.archive is None or self.archive.path != self.folder or not self.archive.is_current():
+                if self.archive is not None:
+                    self.archive.close()
+                self.archive = ArchiveSource(self.folder)
+            return self.archive
+
+    def source_names(self):
+        archive = self.source()
+        return list(archive.members) if archive else os.listdir(self.folder)
+
+    def source_exists(self, file_name):
+        archive = self.source()
+        return file_name in archive.members if archive else os.path.exists(os.path.join(self.folder, file_name))
+
+    def source_stat(self, file_name):
+        """ (size, version) of a source map: the mtime of a file, the CRC of an archive member """
+        archive = self.source()
+        if archive:
+            info = archive.members[file_name]
+            return info.file_size, info.CRC
+        stat = os.stat(os.path.join(self.folder, file_name))
+        return stat.st_size, stat.st_mtime_ns
+
+    def open_source(self, file_name):
+        archive = self.source()
+        return archive.open(file_name) if archive else open(os.path.join(self.folder, file_name), 'rb')
+
+    def map_sizes(self, base_name):
+        """ Reads the (width, height) of every map of a set from the file headers """
+        sizes = []
+        for file_name in self.set_files(base_name):
+            with self.open_source(file_name) as f, Image.open(f) as img:
+                sizes.append(img.size)
+        return sizes
+
+    def target_size(self, base_name):
+        """ Resolution all maps of a set are brought to before packing """
+        if self.resample_target not in self.RESOLUTION_TARGETS:
+            return tuple(self.resample_target)
+        return self.pick_size(self.map_sizes(base_name))
+
+    def pick_size(self, sizes):
+        """ Picks the output (width, height) among map sizes according to resample_target """
+        if self.resample_target not in self.RESOLUTION_TARGETS:
+            return tuple(self.resample_target)
+        pick = max if self.resample_target == 'largest' else min
+        return pick(sizes, key=lambda size: size[0] * size[1])
+
+    def set_pixels(self, base_name):
+        """
+        Reads the output resolution of a set from the map headers without decoding them.
+
+        Unreadable headers count as 0 pixels; the error is reported when the set is converted.
+        """
+        try:
+            width, height = self.target_size(base_name)
+        except Exception:
+            return 0
+        return width * height
+
+    def setting_value(self, name):
+        if name == 'encoder':
+            return self.encoder_selector.backend
+        if name == 'resolution':
+            return [self.resample_target, self.upscale_filter]
+        return getattr(self, name)
+
+    def output_fingerprint(self, base_name, suffix, size=None):
+        """
+        Hash of the source files (path, size, mtime) and settings an output depends on,
+        and of the resolved output size, which every map of the set can change.
+        """
+        if size is None:
+            size = self.target_size(base_name)
+        map_types, settings = self.OUTPUTS[suffix]
+        files = dict(zip(self.MAP_TYPES, self.set_files(base_name)))
+        inputs = []
+        for map_type in map_types:
+            inputs.append([files[map_type], *self.source_stat(files[map_type])])
+        key = json.dumps({'inputs': inputs, 'settings': {name: self.setting_value(name) for name in settings},
+                          'size': list(size)}, sort_keys=True)
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def batch_settings(self):
+        """ Folder and settings a batch journal can only be resumed with """
+        names = sorted(set(name for _, settings in self.OUTPUTS.values() for name in settings))
+        return {
+            'folder': os.path.abspath(self.folder),
+            'incremental': self.incremental,
+            'settings': {name: self.setting_value(name) for name in names},
+            'variants': self.variants,
+        }
+
+    def stale_outputs(self, base_name, manifest):
+        """ Returns {suffix: fingerprint} for the outputs of a set that need rebuilding """
+        stale = {}
+        size = self.target_size(base_name)
+        for suffix in self.OUTPUTS:
+            fingerprint = self.output_fingerprint(base_name, suffix, size)
+            output_path = self.output_path(base_name, suffix)
+            if not self.incremental or not manifest.is_current(output_path, fingerprint):
+                stale[suffix] = fingerprint
+        return stale
+
+    def sources_changed(self, base_name):
+        """ True when the sources or settings of a set no longer match the fingerprints of its outputs """
+        manifest = OutputManifest(self.output_folder)
+        converters = self.variant_converters() if self.variants else [self]
+        return any(not manifest.is_current(converter.output_path(base_name, suffix),
+                                           converter.output_fingerprint(base_name, suffix))
+                   for converter in converters for suffix in converter.OUTPUTS)
+
+    def prepare_set(self, base_name):
+        """ Starts a conversion job for a set, listing the outputs that need rebuilding """
+        # Fingerprints are taken before building so edits made meanwhile trigger another rebuild
+        manifest = OutputManifest(self.output_folder)
+        if self.variants:
+            return self.prepare_variants(base_name, manifest)
+        return self.new_job(base_name, self.set_files(base_name), self.stale_outputs(base_name, manifest))
+
+    def variant_converters(self):
+        """ One converter per variant profile, sharing the encoders, caches and output folder """
+        converters = []
+        for profile in self.variants:
+            converter = copy.copy(self)
+            converter.variants = []
+            converter.last_metrics = {}
+            converter.auto_delete = False  # The sources are deleted once every variant is written
+            converter.variant_name = profile['name']
+            converter.variant_folder = profile['output']
+            converter.name_suffix = profile['suffix']
+            converter.alpha_fill = profile.get('alpha_fill', self.alpha_fill)
+            converter.resample_target = profile.get('resolution', self.resample_target)
+            converter.dds_format = profile.get('format', self.dds_format)
+            converters.append(converter)
+        return converters
+
+    def prepare_variants(self, base_name, manifest):
+        """
+        Job that builds every variant of a set from a single decode. Its outputs
+        are the names of the variant outputs that need rebuilding.
+        """
+        variants = [(converter, converter.new_job(base_name, converter.set_files(base_name),
+                                                  converter.stale_outputs(base_name, manifest)))
+                    for converter in self.variant_converters()]
+        job = self.new_job(base_name, self.set_files(base_name), {})
+        job['variants'] = variants
+        job['outputs'] = tuple(converter.output_name(base_name, suffix)
+                               for converter, variant_job in variants for suffix in variant_job['outputs'])
+        return job
+
+    def new_job(self, base_name, files, fingerprints):
+        """ Job passed through the conversion stages; fingerprints maps each output to build to its fingerprint """
+        width, height = self.target_size(base_name)
+        return {
+            'base_name': base_name,
+            'files': dict(zip(self.MAP_TYPES, files)),
+            'outputs': tuple(fingerprints),
+            'fingerprints': fingerprints,
+            'width': width,
+            'height': height,
+        }
+
+    def convert_set(self, base_name, progress=None, cancelled=None):
+        """
+        Converts one texture set, deleting its PNGs afterwards if requested.
+
+        Only outputs whose source maps or settings changed since they were last
+        written are rebuilt. Returns the suffixes of the rebuilt outputs. Setting
+        the cancelled event stops the set before its next stage, so nothing is
+        written once it is set before the write stage.
+        """
+        try:
+            if self.throttle is not None:
+                self.throttle.wait()
+            job = self.prepare_set(base_name)
+            if job['outputs']:
+                for stage in ConversionProgress.STAGES:
+                    if cancelled is not None and cancelled.is_set():
+                        raise Exception(f"Error converting {base_name}: cancelled")
+                    self.run_stage(stage, job, progress)
+            self.finish_set(job)
+        except Exception:
+            if progress:
+                progress.skip_item(base_name)
+            raise
+        if progress:
+            if job['outputs']:
+                progress.finish_item(base_name)
+            else:
+                progress.up_to_date_item(base_name)
+        return list(job['outputs'])
+
+    def convert_all(self, base_names=None, progress=None):
+        """
+        Converts every complete texture set (or the given base names) through the
+        staged pipeline, so reading, encoding and writing of consecutive sets overlap.
+
+        The batch is journaled in the output folder, so a batch that was interrupted
+        resumes where it stopped the next time it is run.
+
+        Returns a list of (base_name, error) tuples, error being None on success.
+        """
+        if base_names is None:
+            base_names = self.find_texture_sets()
+        self.last_metrics = {}
+        if self.output_archive:
+            return self.convert_to_archive(base_names, progress)
+        journal = BatchJournal(self.output_folder)
+        base_names = journal.begin(base_names, self.batch_settings())
+        self.last_journal = journal
+        if progress is not None:
+            for base_name in base_names:
+                progress.add_work(self.set_pixels(base_name), item=base_name)
+
+        pipeline = ConversionPipeline(self, progress, journal=journal)
+        return [(base_name, error) for base_name, _, error in pipeline.run(base_names)]
+
+    def convert_to_archive(self, base_names, progress=None):
+        """
+        Converts sets into a new zip archive at output_archive, replacing it once complete.
+
+        The archive is written from scratch, so every set is rebuilt and nothing is journaled.
+        """
+        if progress is not None:
+            for base_name in base_names:
+                progress.add_work(self.set_pixels(base_name), item=base_name)
+        temp_path = f"{self.output_archive}.{os.getpid()}.tmp"
+        incremental = self.incremental
+        self.incremental = False
+        # DDS blocks are already compressed, deflate only gains a little on the headers and flat areas
+        self.archive_writer = zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1)
+        try:
+            results = [(base_name, error) for base_name, _, error in ConversionPipeline(self, progress).run(base_names)]
+        finally:
+            self.archive_writer.close()
+            self.archive_writer = None
+            self.incremental = incremental
+        os.replace(temp_path, self.output_archive)
+        return results
+
+    def finish_set(self, job):
+        """ Runs once a set is written or found up to date """
+        if self.auto_delete:
+            self.delete_png_files(job['base_name'])
+
+    def load_map(self, file_name, channels=None):
+        """ Decodes one source map into a NumPy array, reusing the plane cache when enabled """
+        path = os.path.join(self.folder, file_name)
+
+        def decode(path):
+            # Archive members are streamed straight into the decoder
+            with self.open_source(file_name) as f:
+                return self.decode_map(f, channels)
+
+        if self.plane_cache:
+            return self.plane_cache.load(path, decode, ''.join(channels or ()), self.source_stat(file_name))
+        return decode(path)
+
+    def decode_map(self, path, channels=None):
+        """
+        Decodes an image file (path or file object), keeping 16-bit grayscale maps as uint16.
+
+        channels limits the result to the bands the packing layout uses: ('L',)
+        gives one 2D plane, ('R', 'G') an H x W x 2 array. Bands are split
+        inside PIL, so unused channels are never copied into NumPy.
+        """
+        with Image.open(path) as img:
+            if img.mode in HIGH_BIT_MODES:
+                array = np.array(img)
+                if array.dtype != np.uint16:
+                    array = np.clip(array, 0, 65535).astype(np.uint16)
+                if channels and len(channels) > 1:
+                    array = np.repeat(array[:, :, None], len(channels), axis=2)
+                return array
+            if channels is None:
+                return np.array(img)
+            if channels == ('L',):
+                if img.mode == 'L':
+                    return np.array(img)
+                # Grayscale maps saved as RGB(A) have equal bands: the first one is enough
+                if img.mode in ('RGB', 'RGBA', 'LA'):
+                    return np.array(img.getchannel(0))
+                return np.array(img.convert('L'))
+            if img.mode not in ('RGB', 'RGBA'):
+                img = img.convert('RGB')
+            if channels == tuple(img.mode):
+                return np.array(img)
+            array = np.empty((img.height, img.width, len(channels)), dtype=np.uint8)
+            for index, band in enumerate(channels):
+                array[:, :, index] = np.asarray(img.getchannel(band))
+            return array
+
+    def apply_roughness_curve(self, r_np, level=0.65, dither=False):
+        """ Inverts roughness into smoothness and applies the gamma curve through a LUT """
+        r_np = np.asarray(r_np)
+        if r_np.dtype != np.uint16:
+            r_np = r_np.astype(np.uint8, copy=False)
+        depth = sample_depth(r_np)
+        # Truncating like the former float curve keeps 8-bit results unchanged
+        return apply_lut(r_np, lambda threshold: roughness_lut(level, depth, threshold),
+                         dither and depth > 8, threshold=0.0)
+
+    def process_roughness(self, roughness_image_path, level=0.65):
+        try:
+            return self.apply_roughness_curve(self.load_map(roughness_image_path, self.MAP_CHANNELS['Roughness']), level)
+        except Exception as e:
+            raise Exception(f"Error processing roughness map: {str(e)}")
+
+    def generate_dds(self, base_name, base_color_file, metallic_file, normal_file, roughness_file, progress=None,
+                     outputs=None):
+        """ Builds the given outputs of a set (both _c.dds and _n.dds by default), decoding only the maps they use """
+        if outputs is None:
+            outputs = tuple(self.OUTPUTS)
+        job = self.new_job(base_name, (base_color_file, metallic_file, normal_file, roughness_file),
+                           {suffix: None for suffix in outputs})
+        for stage in ConversionProgress.STAGES:
+            self.run_stage(stage, job, progress)
+
+    def run_stage(self, stage, job, progress=None):
+        """ Runs one stage (decode, transform, encode or write) of a conversion job """
+        try:
+            if 'variants' in job:
+                self.run_variant_stage(stage, job, progress)
+            else:
+                getattr(self, f"{stage}_set")(job, progress)
+        except Exception as e:
+            raise Exception(f"Error generating DDS files: {str(e)}")
+
+    def run_variant_stage(self, stage, job, progress=None):
+        """
+        Runs one stage for every variant of a set. The maps are decoded once;
+        each variant is transformed from a pyramid of them, largest first, so
+        smaller resolutions are derived from the larger ones already in memory.
+        """
+        start = time.perf_counter()
+        variants = [(converter, variant_job) for converter, variant_job in job['variants'] if variant_job['outputs']]
+        nbytes = 0
+        if stage == 'decode':
+            needed = [map_type for map_type in self.MAP_TYPES
+                      if any(map_type in self.OUTPUTS[suffix][0]
+                             for _, variant_job in variants for suffix in variant_job['outputs'])]
+            job['maps'] = {map_type: self.load_map(job['files'][map_type], self.MAP_CHANNELS[map_type])
+                           for map_type in needed}
+            nbytes = sum(self.source_stat(job['files'][map_type])[0] for map_type in needed)
+        elif stage == 'transform':
+            pyramids = {map_type: {(array.shape[1], array.shape[0]): array}
+                        for map_type, array in job.pop('maps').items()}
+            for converter, variant_job in sorted(variants, key=lambda item: -item[1]['width'] * item[1]['height']):
+                size = (variant_job['width'], variant_job['height'])
+                needed = set(map_type for suffix in variant_job['outputs'] for map_type in self.OUTPUTS[suffix][0])
+                variant_job['maps'] = {map_type: pyramid_level(levels, size, self.upscale_filter)
+                                       for map_type, levels in pyramids.items() if map_type in needed}
+                converter.transform_set(variant_job)
+                nbytes += sum(array.nbytes for array in variant_job['arrays'].values())
+        else:
+            if stage == 'write':
+                job['hashes'] = {}
+            for converter, variant_job in variants:
+                if stage == 'encode':
+                    converter.encode_set(variant_job)
+                    nbytes += sum(len(data) for data in variant_job['data'].values())
+                    if converter.verify:
+                        self.last_metrics[f"{job['base_name']} ({converter.variant_name})"] = \
+                            converter.last_metrics.pop(job['base_name'])
+                else:
+                    nbytes += sum(len(data) for data in variant_job['data'].values())
+                    converter.write_set(variant_job)
+                    job['hashes'].update(variant_job['hashes'])
+        if progress:
+            progress.record(stage, job['width'] * job['height'], nbytes, time.perf_counter() - start,
+                            item=job['base_name'])
+
+    def decode_set(self, job, progress=None):
+        start = time.perf_counter()
+        needed = [map_type for map_type in self.MAP_TYPES
+                  if any(map_type in self.OUTPUTS[suffix][0] for suffix in job['outputs'])]
+        job['maps'] = {map_type: self.load_map(job['files'][map_type], self.MAP_CHANNELS[map_type])
+                       for map_type in needed}
+        if progress:
+            read_bytes = sum(self.source_stat(job['files'][map_type])[0] for map_type in needed)
+            progress.record('decode', job['width'] * job['height'], read_bytes, time.perf_counter() - start,
+                            item=job['base_name'])
+
+    def map_array(self, map_type, data, size=None):
+        """
+        Views an in-memory map as an array holding the channels the packing layout uses.
+
+        Accepts NumPy arrays or any buffer-protocol object (bytes, memoryview,
+        array.array...). Flat buffers need size=(width, height). uint8 and uint16
+        data are used as is: extra channels are dropped through slicing, so
+        contiguous input is never copied. Float data is read as 0..1.
+        """
+        array = data if isinstance(data, np.ndarray) else np.asarray(memoryview(data))
+        if array.ndim == 1:
+            if size is None:
+                raise ValueError(f"{map_type}: flat buffers need size=(width, height)")
+            if array.dtype.itemsize == 1 and array.dtype != np.uint8:
+                array = array.view(np.uint8)
+            width, height = size
+            array = array.reshape(height, width, -1)
+        if array.ndim == 3 and array.shape[2] == 1:
+            array = array[:, :, 0]
+        if array.dtype.kind == 'f':
+            array = np.round(np.clip(array, 0.0, 1.0) * 65535).astype(np.uint16)
+        elif array.dtype not in (np.uint8, np.uint16):
+            raise ValueError(f"{map_type}: unsupported data type {array.dtype}")
+
+        channels = self.MAP_CHANNELS[map_type]
+        if channels == ('L',):
+            # Grayscale maps stored with several channels keep the first one
+            return array if array.ndim == 2 else array[:, :, 0]
+        if array.ndim == 2:
+            array = np.repeat(array[:, :, None], len(channels), axis=2)
+        if array.shape[2] < len(channels):
+            raise ValueError(f"{map_type}: expected {len(channels)} channels, got {array.shape[2]}")
+        return array[:, :, :len(channels)]
+
+    def convert_arrays(self, base_color=None, metallic=None, normal=None, roughness=None, outputs=None,
+                       size=None, output_name=None, progress=None):
+        """
+        Converts maps held in memory, without writing or decoding PNGs.
+
+        Only the maps the requested outputs use are needed (BaseColor for _c.dds,
+        Normal, Metallic and Roughness for _n.dds). Maps of different sizes are
+        resampled like files. Returns {suffix: DDS bytes}; with output_name the
+        files are also written to the output folder as <output_name><suffix>.
+        """
+        if outputs is None:
+            outputs = tuple(self.OUTPUTS)
+        data = dict(zip(self.MAP_TYPES, (base_color, metallic, normal, roughness)))
+        needed = [map_type for map_type in self.MAP_TYPES
+                  if any(map_type in self.OUTPUTS[suffix][0] for suffix in outputs)]
+        missing = [map_type for map_type in needed if data[map_type] is None]
+        if missing:
+            raise ValueError(f"Missing maps for {', '.join(outputs)}: {', '.join(missing)}")
+        maps = {map_type: self.map_array(map_type, data[map_type], size) for map_type in needed}
+        width, height = self.pick_size([(array.shape[1], array.shape[0]) for array in maps.values()])
+        job = {
+            'base_name': output_name or 'arrays',
+            'outputs': tuple(outputs),
+            'fingerprints': {suffix: None for suffix in outputs},
+            'width': width,
+            'height': height,
+            'maps': maps,
+        }
+        for stage in ConversionProgress.STAGES[1:-1]:
+            self.run_stage(stage, job, progress)
+        result = dict(job['data'])
+        if output_name:
+            self.run_stage('write', job, progress)
+        return result
+
+    def transform_set(self, job, progress=None):
+        start = time.perf_counter()
+        maps = {map_type: resize_map(array, job['width'], job['height'], self.upscale_filter)
+                for map_type, array in job.pop('maps').items()}
+        arrays = {}
+        if '_c.dds' in job['outputs']:
+            # High-bit-depth maps are reduced before packing so every channel is uint8
+            arrays['_c.dds'] = self.pack_basecolor(to_uint8(maps['BaseColor'], self.dither))
+        if '_n.dds' in job['outputs']:
+            try:
+                roughness = self.apply_roughness_curve(maps['Roughness'], self.roughness_level, self.dither)
+            except Exception as e:
+                raise Exception(f"Error processing roughness map: {str(e)}")
+            arrays['_n.dds'] = self.pack_normal_metallic_roughness(
+                roughness, to_uint8(maps['Normal'], self.dither), to_uint8(maps['Metallic'], self.dither))
+        job['arrays'] = arrays
+        if progress:
+            progress.record('transform', job['width'] * job['height'], sum(array.nbytes for array in arrays.values()),
+                            time.perf_counter() - start, item=job['base_name'])
+
+    def encode_set(self, job, progress=None):
+        start = time.perf_counter()
+        arrays = job.pop('arrays')
+        data, patches = {}, {}
+        for suffix, array in arrays.items():
+            # Sets converted from files can patch the outputs of their previous conversion
+            patch = self.dirty_patch(job, suffix, array) if self.patch_blocks and 'files' in job else None
+            if patch is not None:
+                patches[suffix] = patch
+            else:
+                data[suffix] = self.encode_dds(array)
+        job['data'] = data
+        if self.patch_blocks and 'files' in job:
+            job['patches'] = patches
+            # Kept until the write stage stores them as the references of the next patch
+            job['arrays'] = arrays
+        if progress:
+            encoded = sum(len(d) for d in data.values()) + sum(len(p['payload']) for p in patches.values())
+            progress.record('encode', job['width'] * job['height'], encoded,
+                            time.perf_counter() - start, item=job['base_name'])
+
+        # Verify against the packed sources
+        if self.verify:
+            channel_names = {'_c.dds': self.COLOR_CHANNELS, '_n.dds': self.NMR_CHANNELS}
+            metrics = {
+                suffix[:-4]: round_trip_metrics(data[suffix], arrays[suffix], channel_names[suffix],
+                                                self.verify_sample)
+                for suffix in data
+            }
+            for suffix, patch in patches.items():
+                if len(patch['blocks']):
+                    # Only the re-encoded blocks changed
+                    reference = image_to_blocks(self.gather_blocks(arrays[suffix], patch['blocks']))
+                    decoded = decode_blocks(patch['payload'], self.dds_format)[:len(patch['blocks'])]
+                    metrics[suffix[:-4]] = channel_metrics(decoded, reference[:len(patch['blocks'])],
+                                                           channel_names[suffix])
+            self.last_metrics[job['base_name']] = metrics
+
+    def reference_variant(self, width, height):
+        """ Plane cache variant of the packed array an output was encoded from """
+        encoder = self.choose_encoder(width, height)
+        return f"reference|{self.dds_format}|{encoder.name}"
+
+    def dirty_patch(self, job, suffix, array):
+        """
+        Compares a packed array with the one the existing DDS file was encoded from
+        and re-encodes only the 4x4 blocks that differ.
+
+        Returns the patch for the write stage, or None when the output has to be
+        encoded in full: no reference in the plane cache, a DDS file that was
+        changed since, other dimensions or too large a changed area.
+        """
+        height, width = array.shape[:2]
+        if not self.plane_cache or self.archive_writer is not None or height % 4 or width % 4 \
+                or DDS_FORMATS[self.dds_format][0] is None:
+            return None
+        output_path = self.output_path(job['base_name'], suffix)
+        try:
+            stat = os.stat(output_path)
+        except OSError:
+            return None
+        header_size = len(dds_header(width, height, self.dds_format))
+        if stat.st_size != header_size + dds_level_size(width, height, self.dds_format):
+            return None
+        signature = (stat.st_size, stat.st_mtime_ns)
+        variant = self.reference_variant(width, height)
+        reference = self.plane_cache.get(output_path, variant, signature)
+        if reference is None or reference.shape != array.shape:
+            return None
+
+        changed = (reference != array).any(axis=2)
+        blocks = np.flatnonzero(changed.reshape(height // 4, 4, width // 4, 4).any(axis=(1, 3)))
+        if len(blocks) > self.PATCH_MAX_FRACTION * (height // 4) * (width // 4):
+            return None
+        payload = b''
+        if len(blocks):
+            encoder = self.choose_encoder(width, height)
+            image = self.gather_blocks(array, blocks)
+            workers, tile_height = self.parallel_settings()
+            initializer = self.throttle.enter_thread if self.throttle is not None else None
+            payload = encode_tiled(encoder, image, self.dds_format, workers, tile_height, initializer)
+            payload = payload[:len(blocks) * DDS_FORMATS[self.dds_format][1]]
+        return {'blocks': blocks, 'payload': payload, 'offset': header_size, 'signature': signature,
+                'variant': variant}
+
+    def gather_blocks(self, array, blocks):
+        """ Copies the given 4x4 blocks of an image into a compact image, in block order, padded with zeros """
+        height, width, channels = array.shape
+        cols = min(len(blocks), self.PATCH_COLUMNS)
+        rows = -(-len(blocks) // cols)
+        view = array.reshape(height // 4, 4, width // 4, 4, channels)
+        gathered = np.zeros((rows * cols, 4, 4, channels), dtype=array.dtype)
+        gathered[:len(blocks)] = view[blocks // (width // 4), :, blocks % (width // 4)]
+        return gathered.reshape(rows, cols, 4, 4, channels).swapaxes(1, 2).reshape(rows * 4, cols * 4, channels)
+
+    def write_set(self, job, progress=None):
+        start = time.perf_counter()
+        data = job.pop('data')
+        patches = job.pop('patches', {})
+        job['hashes'] = {}
+        for suffix, patch in patches.items():
+            job['hashes'][self.output_name(job['base_name'], suffix)] = self.patch_dds(
+                self.output_path(job['base_name'], suffix), patch)
+        if self.variant_folder and data and self.archive_writer is None:
+            os.makedirs(os.path.join(self.output_folder, self.variant_folder), exist_ok=True)
+        for suffix, dds_data in data.items():
+            if self.archive_writer is not None:
+                with self.archive_lock:
+                    self.archive_writer.writestr(self.output_name(job['base_name'], suffix), dds_data)
+            else:
+                self.write_dds(self.output_path(job['base_name'], suffix), dds_data)
+            job['hashes'][self.output_name(job['base_name'], suffix)] = {'sha1': hashlib.sha1(dds_data).hexdigest(),
+                                                                         'size': len(dds_data)}
+        arrays = job.pop('arrays', None)
+        if arrays is not None and self.archive_writer is None:
+            for suffix, array in arrays.items():
+                self.store_reference(job['base_name'], suffix, array, patches.get(suffix))
+        if progress:
+            written = sum(len(d) for d in data.values()) + sum(len(p['payload']) for p in patches.values())
+            progress.record('write', job['width'] * job['height'], written,
+                            time.perf_counter() - start, item=job['base_name'])
+
+        fingerprints = {suffix: fingerprint for suffix, fingerprint in job['fingerprints'].items() if fingerprint}
+        if fingerprints and self.archive_writer is None:
+            # Workers sharing the output folder update the manifest one at a time
+            with FileLock(os.path.join(self.output_folder, f"{OutputManifest.FILE_NAME}.lock")):
+                manifest = OutputManifest(self.output_folder)
+                for suffix, fingerprint in fingerprints.items():
+                    manifest.record(self.output_path(job['base_name'], suffix), fingerprint)
+                manifest.save()
+
+    def pack_basecolor(self, base_color_array):
+        try:
+            # Apply the selected alpha fill color
+            alpha_value = 255 if self.alpha_fill == 'white' else 0
+            return np.dstack([base_color_array, np.full(base_color_array.shape[:2], alpha_value, dtype=np.uint8)])
+        except Exception as e:
+            raise Exception(f"Error creating base color DDS: {str(e)}")
+
+    def pack_normal_metallic_roughness(self, roughness, normal, metallic):
+        try:
+            return np.dstack([roughness, normal[:, :, 1], metallic, normal[:, :, 0]])
+        except Exception as e:
+            raise Exception(f"Error creating normal/metallic/roughness DDS: {str(e)}")
+
+    def choose_encoder(self, width, height):
+        """
+        Encoder backend for a texture of the output format. Low-impact runs leave
+        out numba: its thread pool keeps the priority of the thread that first
+        started it, so lowering the priority of the stage threads would not reach it.
+        """
+        encoder = self.encoder_selector.choose(self.dds_format, width, height)
+        if self.throttle is not None and encoder.name == 'numba':
+            return ENCODERS['numpy']
+        return encoder
+
+    def encode_dds(self, array):
+        """ Encodes an RGBA array into DDS file bytes with the selected encoder backend """
+        height, width = array.shape[:2]
+        encoder = self.choose_encoder(width, height)
+        workers, tile_height = self.parallel_settings()
+        initializer = self.throttle.enter_thread if self.throttle is not None else None
+        return dds_header(width, height, self.dds_format) + encode_tiled(
+            encoder, array, self.dds_format, workers, tile_height, initializer)
+
+    def resolve_encoders(self, base_names):
+        """
+        Runs the encoder and worker autotunes the given sets need on the calling
+        thread, before the pipeline stages start, so benchmarks never run on them.
+        """
+        self.tuner.get(self.encoder_selector)
+        sizes = set()
+        for base_name in base_names:
+            try:
+                sizes.add(self.target_size(base_name))
+            except Exception:
+                # Unreadable sets report their error when they are converted
+                continue
+        for converter in self.variant_converters() or [self]:
+            for width, height in sizes:
+                if converter.resample_target not in self.RESOLUTION_TARGETS:
+                    width, height = converter.resample_target
+                converter.encoder_selector.choose(converter.dds_format, width, height)
+
+    def parallel_settings(self):
+        """
+        Returns (workers, tile_height) from the autotuner, honouring a pinned
+        worker count and the core cap of low-impact mode.
+        """
+        workers, tile_height = self.tuner.get(self.encoder_selector)
+        workers = self.workers or workers
+        if self.throttle is not None:
+            workers = self.throttle.limit_workers(workers)
+        return workers, tile_height
+
+    def output_name(self, base_name, suffix):
+        """ File name of an output relative to the output folder (or archive), e.g. 'ground/tank_2k_c.dds' """
+        name = f"{base_name}{self.name_suffix}{suffix}"
+        return f"{self.variant_folder}/{name}" if self.variant_folder else name
+
+    def output_path(self, base_name, suffix):
+        return os.path.join(self.output_folder, *self.output_name(base_name, suffix).split('/'))
+
+    def output_names(self, base_name, outputs=None):
+        """
+        Output names of a set, for the given outputs a conversion reported or all of them.
+        With variants, conversions report output names rather than suffixes.
+        """
+        if self.variants:
+            if outputs is not None:
+                return list(outputs)
+            return [converter.output_name(base_name, suffix)
+                    for converter in self.variant_converters() for suffix in self.OUTPUTS]
+        return [self.output_name(base_name, suffix) for suffix in (self.OUTPUTS if outputs is None else outputs)]
+
+    def write_dds(self, filename, data):
+        with open(filename, 'wb') as f:
+            f.write(data)
+
+    def patch_dds(self, filename, patch):
+        """ Overwrites the changed blocks of a DDS file through a memory map; returns its hash entry """
+        block_bytes = DDS_FORMATS[self.dds_format][1]
+        blocks, payload = patch['blocks'], memoryview(patch['payload'])
+        with open(filename, 'r+b') as f, mmap.mmap(f.fileno(), 0) as mapped:
+            # Runs of consecutive blocks are copied in one slice
+            starts = np.flatnonzero(np.diff(blocks, prepend=-2) != 1)
+            ends = np.append(starts[1:], len(blocks))
+            for first, last in zip(starts.tolist(), ends.tolist()):
+                offset = patch['offset'] + int(blocks[first]) * block_bytes
+                mapped[offset:offset + (last - first) * block_bytes] = payload[first * block_bytes:last * block_bytes]
+            mapped.flush()
+            return {'sha1': hashlib.sha1(mapped).hexdigest(), 'size': len(mapped)}
+
+    def store_reference(self, base_name, suffix, array, patch=None):
+        """
+        Keeps the packed array an output was encoded from in the plane cache,
+        under the signature of the written file, for the next dirty_patch.
+        A patched output updates its reference in place.
+        """
+        if not self.plane_cache or array.nbytes > self.plane_cache.max_bytes:
+            return
+        output_path = self.output_path(base_name, suffix)
+        stat = os.stat(output_path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        height, width, channels = array.shape
+        if patch is not None:
+            reference = self.plane_cache.get(output_path, patch['variant'], patch['signature'], writable=True)
+            if reference is not None:
+                view = reference.reshape(height // 4, 4, width // 4, 4, channels)
+                if len(patch['blocks']):
+                    rows, cols = patch['blocks'] // (width // 4), patch['blocks'] % (width // 4)
+                    view[rows, :, cols] = array.reshape(height // 4, 4, width // 4, 4, channels)[rows, :, cols]
+                    reference.flush()
+                # Unmapped before the rename, which Windows refuses on mapped files
+                del reference, view
+                if self.plane_cache.rename(output_path, patch['variant'], patch['signature'], signature):
+                    return
+        self.plane_cache.put(output_path, array, self.reference_variant(width, height), signature)
+
+    def delete_png_files(self, base_name):
+        """ Deletes the PNG files after conversion if auto-delete is enabled; archives are left untouched """
+        if self.source() is not None:
+            return
+        try:
+            for file in self.set_files(base_name):
+                file_path = os.path.join(self.folder, file)
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+        except Exception as e:
+            raise Exception(f"Error deleting PNG files: {str(e)}")
+
+
+class ConversionPipeline:
+    """
+    Runs texture sets through the decode, transform, encode and write stages,
+    one thread per stage, connected by bounded queues.
+
+    While one set is encoded the next one is already being read and decoded and
+    the previous one written, so disk I/O and CPU work overlap. The bounded
+    queues cap how many decoded sets are held in memory at once.
+    """
+
+    def __init__(self, converter, progress=None, queue_size=1, journal=None):
+        self.converter = converter
+        self.progress = progress
+        self.journal = journal
+        self.queues = {stage: queue.Queue(queue_size) for stage in ConversionProgress.STAGES[1:]}
+        self.results = queue.Queue()
+        self.pending = 0
+        self.cancelled = threading.Event()
+
+    def queue_depths(self):
+        """ Sets waiting in front of each stage """
+        depths = {'decode': self.pending}
+        depths.update({stage: stage_queue.qsize() for stage, stage_queue in self.queues.items()})
+        return depths
+
+    def publish_depths(self):
+        if self.progress is not None:
+            self.progress.queue_depths = self.queue_depths()
+
+    def run(self, base_names, idle=None):
+        """
+        Converts the given sets and yields (base_name, rebuilt outputs, error) for
+        each one as it finishes, in order. idle() is called while waiting, which
+        lets the GUI keep processing events.
+        """
+        base_names = list(base_names)
+        self.pending = len(base_names)
+        stages = ConversionProgress.STAGES
+        if self.progress is not None:
+            self.progress.pipelined = True
+        self.converter.resolve_encoders(base_names)
+        threads = [threading.Thread(target=self.read_sets, args=(base_names,), daemon=True)]
+        for index, stage in enumerate(stages[1:], 1):
+            output = self.queues[stages[index + 1]] if index + 1 < len(stages) else self.results
+            threads.append(threading.Thread(target=self.run_stage, args=(stage, self.queues[stage], output),
+                                            daemon=True))
+        for thread in threads:
+            thread.start()
+
+        try:
+            for _ in base_names:
+                while True:
+                    try:
+                        job = self.results.get(timeout=0.05)
+                        break
+                    except queue.Empty:
+                        if idle:
+                            idle()
+                self.publish_depths()
+                yield self.finish(job)
+            if self.journal is not None:
+                self.journal.finish()
+        finally:
+            # Stages drop the remaining sets if the caller stops early
+            self.cancelled.set()
+
+    def enter_throttle(self):
+        """ Stage threads of a low-impact run give way to the rest of the system """
+        if self.converter.throttle is not None:
+            self.converter.throttle.enter_thread()
+
+    def read_sets(self, base_names):
+        """ First stage: works out the stale outputs of each set and decodes the maps they need """
+        self.enter_throttle()
+        for base_name in base_names:
+            if self.converter.throttle is not None:
+                # Sets start only while the machine is not busy with something else
+                self.converter.throttle.wait(self.cancelled)
+            if self.cancelled.is_set():
+                break
+            job = {'base_name': base_name, 'outputs': ()}
+            try:
+                if self.journal is not None:
+                    sources_exist = self.converter.is_complete_set(base_name)
+                    if self.journal.is_done(base_name, sources_exist) \
+                            and not (sources_exist and self.converter.sources_changed(base_name)):
+                        # Converted before the interruption: only the final step is left
+                        job['resumed'] = True
+                        self.pending -= 1
+                        self.queues['transform'].put(job)
+                        continue
+                    self.journal.started(base_name)
+                job = self.converter.prepare_set(base_name)
+                if job['outputs']:
+                    self.converter.run_stage('decode', job, self.progress)
+            except Exception as e:
+                job['error'] = str(e)
+            self.pending -= 1
+            self.queues['transform'].put(job)
+            self.publish_depths()
+        self.queues['transform'].put(None)
+
+    def run_stage(self, stage, input_queue, output_queue):
+        self.enter_throttle()
+        while True:
+            job = input_queue.get()
+            self.publish_depths()
+            if job is None:
+                output_queue.put(None)
+                return
+            if 'error' not in job and not self.cancelled.is_set():
+                try:
+                    if job['outputs']:
+                        self.converter.run_stage(stage, job, self.progress)
+                    if stage == 'write':
+                        if self.journal is not None and not job.get('resumed'):
+                            # Journaled before auto delete removes the sources
+                            self.journal.completed(job['base_name'], job.get('hashes', {}))
+                        self.converter.finish_set(job)
+                except Exception as e:
+                    job['error'] = str(e)
+                    # Free the arrays of a failed set right away
+                    for key in ('maps', 'arrays', 'data'):
+                        job.pop(key, None)
+            output_queue.put(job)
+            self.publish_depths()
+
+    def finish(self, job):
+        """ Updates the item counters from the calling thread """
+        base_name, error = job['base_name'], job.get('error')
+        if error and self.journal is not None:
+            self.journal.failed(base_name, error)
+        if self.progress is not None:
+            if error:
+                self.progress.skip_item(base_name)
+            elif job['outputs']:
+                self.progress.finish_item(base_name)
+            else:
+                self.progress.up_to_date_item(base_name)
+        return base_name, list(job['outputs']), error
+
+
+MIPMAP_FORMATS = ('BGRA8', 'BC1', 'BC3', 'BC4', 'BC5')
+MIPMAP_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tga', '.dds')
+
+
+class ImageReadError(Exception):
+    """ Raised when a source image cannot be opened or decoded """
+
+    def __init__(self, path, reason):
+        super().__init__(f"Unable to read image file: {path}\n{reason}")
+        self.path = path
+        self.reason = reason
+
+
+class OutputWriteError(Exception):
+    """ Raised when an output file cannot be written """
+
+    def __init__(self, path, reason):
+        super().__init__(f"Error writing output file: {path}\n{reason}")
+        self.path = path
+        self.reason = reason
+
+
+class MipmapBuilder:
+    """ Builds a single DDS with a full mip chain from a list of level images """
+
+    STAGES = ('decode', 'resize', 'encode', 'write')
+
+    def __init__(self, auto_mip=True, fmt='BGRA8', encoder_selector=None, tuner=None, workers=None):
+        self.auto_mip = auto_mip
+        self.fmt = fmt
+        self.encoder_selector = encoder_selector or EncoderSelector()
+        self.tuner = tuner or PerformanceTuner()
+        self.workers = workers
+
+    def probe(self, path):
+        """ Reads the size of a level image from its header without decoding it """
+        try:
+            with Image.open(path) as img:
+                return img.size
+        except Exception as e:
+            raise ImageReadError(path, str(e))
+
+    def load_level(self, path, size):
+        """
+        Decodes one level image and box-resizes it to size x size. Returns the
+        image and the (stage, pixels, bytes, seconds) records of the work done;
+        it runs on the decode pool, so the caller records them on its own thread.
+
+        Nothing is decoded at more resolution than needed: JPEGs are decoded at a
+        reduced DCT scale (draft) and other large sources are first shrunk by an
+        integer factor (reduce) before the final resize.
+        """
+        start = time.perf_counter()
+        try:
+            img = Image.open(path)
+            img.draft(img.mode, (size, size))
+            if img.mode in HIGH_BIT_MODES:
+                # Pillow clips 16-bit samples when converting, so scale them down first
+                array = np.clip(np.array(img), 0, 65535).astype(np.uint16)
+                img = Image.fromarray(to_uint8(array), 'L')
+            elif img.mode not in ('L', 'LA', 'RGB', 'RGBA'):
+                img = img.convert("RGBA")
+            factor = min(img.width // size, img.height // size)
+            if factor >= 2:
+                img = img.reduce(factor)
+            img = img.convert("RGBA")
+        except Exception as e:
+            raise ImageReadError(path, str(e))
+        records = [('decode', size * size, os.path.getsize(path), time.perf_counter() - start)]
+
+        start = time.perf_counter()
+        if img.size != (size, size):
+            img = img.resize((size, size), Image.BOX)
+        records.append(('resize', size * size, size * size * 4, time.perf_counter() - start))
+        return img, records
+
+    def build(self, image_paths, base_size, output_path, progress=None):
+        """
+        Builds a single DDS file with mipmaps from a list of image paths.
+        
+        Args:
+            image_paths: List of paths to images to use as mipmap levels
+            base_size: Base size for the highest resolution mipmap
+            output_path: Path where the DDS file will be saved
+            progress: Optional ConversionProgress receiving per-level updates
+        """
+        if not image_paths:
+            raise ValueError("No images given to build the mipmaps from")
+        # Progress is weighted by the pixels of each level, so the large top levels
+        # dominate the bar just like they dominate the build time
+        level_sizes = [max(1, base_size // (2 ** i)) for i in range(len(image_paths))]
+        auto_sizes = []
+        if self.auto_mip:
+            last_size = level_sizes[-1]
+            while last_size > 1:
+                last_size = max(1, last_size // 2)
+                auto_sizes.append(last_size)
+        
+        if progress is None:
+            progress = ConversionProgress(stages=self.STAGES)
+        for size in level_sizes + auto_sizes:
+            progress.add_work(size * size)
+        
+        # Check every header first so a broken file fails before any decoding
+        for path in image_paths:
+            self.probe(path)
+
+        workers, tile_height = self.tuner.get(self.encoder_selector)
+        workers = self.workers or workers
+        header = dds_header(level_sizes[0], level_sizes[0], self.fmt, len(level_sizes) + len(auto_sizes))
+        temp_path = f"{output_path}.{os.getpid()}.tmp"
+        try:
+            output = open(temp_path, "wb")
+            output.write(header)
+        except Exception as e:
+            raise OutputWriteError(output_path, str(e))
+
+        try:
+            with output:
+                # Decode the level images concurrently (Pillow releases the GIL while decoding);
+                # each level is encoded and written as soon as it is ready, in order. Progress is
+                # only recorded on this thread, since its callback may update the GUI
+                decode_workers = min(len(image_paths), self.workers or os.cpu_count() or 1)
+                with ThreadPoolExecutor(max_workers=max(1, decode_workers)) as pool:
+                    for img, records in pool.map(lambda level: self.load_level(*level),
+                                                 zip(image_paths, level_sizes)):
+                        for record in records:
+                            progress.record(*record)
+                        self.write_level(output, output_path, img, progress, workers, tile_height)
+                        base = img
+
+                # Automatically complete mipmap
+                w, h = base.size
+                for _ in auto_sizes:
+                    start = time.perf_counter()
+                    w, h = max(1, w // 2), max(1, h // 2)
+                    base = base.resize((w, h), Image.BOX)
+                    # Derived levels need no decode
+                    progress.record('decode', w * h)
+                    progress.record('resize', w * h, w * h * 4, time.perf_counter() - start)
+                    self.write_level(output, output_path, base, progress, workers, tile_height)
+            os.replace(temp_path, output_path)
+        except Exception as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            if isinstance(e, (ImageReadError, OutputWriteError)):
+                raise
+            raise OutputWriteError(output_path, str(e))
+        return progress
+
+    def write_level(self, output, output_path, img, progress, workers, tile_height):
+        """ Encodes one mip level with the selected backend (large levels in parallel strips) and appends it """
+        start = time.perf_counter()
+        w, h = img.size
+        encoder = self.encoder_selector.choose(self.fmt, w, h)
+        data = encode_tiled(encoder, np.asarray(img), self.fmt, workers, tile_height)
+        expected_size = dds_level_size(w, h, self.fmt)
+        if len(data) != expected_size:
+            # Padding or cutting would hide a broken encoder behind a valid looking file
+            raise OutputWriteError(output_path, f"The {encoder.name} encoder returned {len(data)} bytes "
+                                                f"for the {w}x{h} {self.fmt} level instead of {expected_size}")
+        progress.record('encode', w * h, len(data), time.perf_counter() - start)
+
+        start = time.perf_counter()
+        try:
+            output.write(data)
+        except Exception as e:
+            raise OutputWriteError(output_path, str(e))
+        progress.record('write', w * h, len(data), time.perf_counter() - start)
+
+
+PNG_TRAILER = b'\x00\x00\x00\x00IEND\xaeB`\x82'
+
+
+MIPMAP_MANIFEST = 'mipmaps.json'
+
+
+def list_mipmap_images(folder):
+    """ Returns the image files of a folder in level order (sorted by name) """
+    return sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(MIPMAP_EXTENSIONS))
+
+
+def find_mipmap_jobs(root, output_folder=None, base_size=4096, auto_mip=True, fmt='BGRA8'):
+    """
+    Lists the mipmap builds of a batch folder.
+
+    A mipmaps.json manifest in the folder lists the builds explicitly, with paths
+    relative to the manifest:
+        [{"output": "decals/star.dds", "folder": "star", "base_size": 1024},
+         {"output": "atlas.dds", "images": ["atlas_0.png", "atlas_1.png"], "auto_mip": false, "format": "BC1"}]
+    Without a manifest every subfolder holding images becomes <output_folder>/<subfolder>.dds.
+    """
+    output_folder = output_folder or root
+    manifest_path = os.path.join(root, MIPMAP_MANIFEST)
+    jobs = []
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            raise Exception(f"Error reading {MIPMAP_MANIFEST}: {str(e)}")
+        for entry in entries:
+            if 'images' in entry:
+                images = [os.path.join(root, path) for path in entry['images']]
+            else:
+                images = list_mipmap_images(os.path.join(root, entry['folder']))
+            jobs.append({
+                'output': os.path.join(output_folder, entry['output']),
+                'images': images,
+                'base_size': int(entry.get('base_size', base_size)),
+                'auto_mip': bool(entry.get('auto_mip', auto_mip)),
+                'format': entry.get('format', fmt),
+            })
+        return jobs
+
+    for name in sorted(os.listdir(root)):
+        folder = os.path.join(root, name)
+        if os.path.isdir(folder):
+            images = list_mipmap_images(folder)
+            if images:
+                jobs.append({
+                    'output': os.path.join(output_folder, f"{name}.dds"),
+                    'images': images,
+                    'base_size': base_size,
+                    'auto_mip': auto_mip,
+                    'format': fmt,
+                })
+    return jobs
+
+
+class MipmapBatch:
+    """
+    Runs many mipmap builds on a thread pool and collects one status per output.
+
+    The builds share one encoder selector and performance tuner, autotuned on
+    the calling thread before the pool starts, so concurrent builds neither
+    repeat the benchmarks nor time them under each other's load.
+    """
+
+    def __init__(self, jobs, workers=None, encoder_selector=None, tuner=None):
+        self.jobs = jobs
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.encoder_selector = encoder_selector or EncoderSelector()
+        self.tuner = tuner or PerformanceTuner()
+
+    def builder(self, job):
+        """ MipmapBuilder for one job, using the shared encoder selector and tuner """
+        return MipmapBuilder(auto_mip=job['auto_mip'], fmt=job['format'],
+                             encoder_selector=self.encoder_selector, tuner=self.tuner)
+
+    def resolve_encoders(self):
+        """ Runs the worker autotune and the encoder autotune of every format and level size of the batch """
+        self.tuner.get(self.encoder_selector)
+        for job in self.jobs:
+            size = job['base_size']
+            while True:
+                self.encoder_selector.choose(job['format'], size, size)
+                if size <= 1:
+                    break
+                size //= 2
+
+    def run(self, build, idle=None):
+        """
+        Calls build(job) for every job and yields (job, error, seconds) as each
+        one finishes. idle() is called while waiting so the GUI stays responsive.
+        """
+        self.resolve_encoders()
+        results = queue.Queue()
+
+        def run_job(job):
+            start = time.perf_counter()
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(job['output'])), exist_ok=True)
+                build(job)
+                results.put((job, None, time.perf_counter() - start))
+            except Exception as e:
+                results.put((job, str(e), time.perf_counter() - start))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for job in self.jobs:
+                pool.submit(run_job, job)
+            for _ in self.jobs:
+                while True:
+                    try:
+                        result = results.get(timeout=0.05)
+                        break
+                    except queue.Empty:
+                        if idle:
+                            idle()
+                yield result
+
+
+class Histogram:
+    """ Cumulative-bucket histogram in the Prometheus layout """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'buckets': {str(bound): count for bound, count in zip(self.buckets, self.counts)},
+        }
+
+
+class WatchMetrics:
+    """
+    Counters and histograms for long watch-mode sessions.
+
+    Exported periodically as a Prometheus textfile (for node_exporter's textfile
+    collector) or as JSON when the path ends in .json. Files are replaced
+    atomically so a collector never reads a half-written export.
+    """
+
+    COUNTERS = {
+        'scans': 'Folder scans',
+        'scan_errors': 'Folder scans that failed',
+        'changes_detected': 'Texture sets seen with new or modified maps',
+        'sets_converted': 'Texture sets converted after a change',
+        'failures': 'Texture set conversions that failed after a change',
+        'bytes_written': 'DDS bytes written after a change',
+    }
+    HISTOGRAMS = {
+        'conversion_latency_seconds': ('Seconds from the last map change to the DDS files being written',
+                                       (1, 2, 5, 10, 15, 30, 60, 120, 300, 600)),
+        'scan_duration_seconds': ('Seconds spent scanning the folder',
+                                  (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)),
+    }
+    GAUGES = {
+        'watched_sets': 'Texture sets in the watched folder',
+        'pending_sets': 'Texture sets waiting for their maps to settle',
+    }
+
+    def __init__(self, path=None, interval=60.0):
+        self.path = path
+        self.interval = interval
+        self.counters = {name: 0 for name in self.COUNTERS}
+        self.histograms = {name: Histogram(buckets) for name, (_, buckets) in self.HISTOGRAMS.items()}
+        self.gauges = {name: 0 for name in self.GAUGES}
+        self.started = time.time()
+        self.last_export = None
+        self.lock = threading.Lock()
+
+    def get_path(self):
+        return self.path or os.path.join(get_settings_dir(), 'watch_metrics.prom')
+
+    def inc(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    def observe(self, name, value):
+        with self.lock:
+            self.histograms[name].observe(value)
+
+    def set_gauge(self, name, value):
+        with self.lock:
+            self.gauges[name] = value
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                'started': self.started,
+                'updated': time.time(),
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges),
+                'histograms': {name: histogram.to_dict() for name, histogram in self.histograms.items()},
+            }
+
+    def prometheus_text(self):
+        """ Prometheus text exposition format """
+        lines = []
+        with self.lock:
+            for name, help_text in self.COUNTERS.items():
+                lines += [f"# HELP skintool_watch_{name}_total {help_text}",
+                          f"# TYPE skintool_watch_{name}_total counter",
+                          f"skintool_watch_{name}_total {self.counters[name]}"]
+            for name, help_text in self.GAUGES.items():
+                lines += [f"# HELP skintool_watch_{name} {help_text}",
+                          f"# TYPE skintool_watch_{name} gauge",
+                          f"skintool_watch_{name} {self.gauges[name]}"]
+            for name, (help_text, _) in self.HISTOGRAMS.items():
+                histogram = self.histograms[name]
+                lines += [f"# HELP skintool_watch_{name} {help_text}",
+                          f"# TYPE skintool_watch_{name} histogram"]
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(f'skintool_watch_{name}_bucket{{le="{bound}"}} {count}')
+                lines += [f'skintool_watch_{name}_bucket{{le="+Inf"}} {histogram.count}',
+                          f"skintool_watch_{name}_sum {histogram.sum:.6f}",
+                          f"skintool_watch_{name}_count {histogram.count}"]
+            lines += ["# HELP skintool_watch_start_time_seconds Start of the watch session",
+                      "# TYPE skintool_watch_start_time_seconds gauge",
+                      f"skintool_watch_start_time_seconds {self.started:.0f}"]
+        return '\n'.join(lines) + '\n'
+
+    def export(self):
+        path = self.get_path()
+        if path.lower().endswith('.json'):
+            content = json.dumps(self.to_dict(), indent=2)
+        else:
+            content = self.prometheus_text()
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error writing watch metrics: {str(e)}")
+        self.last_export = time.monotonic()
+
+    def maybe_export(self, now=None):
+        """ Exports when the interval has passed since the last export """
+        now = time.monotonic() if now is None else now
+        if self.last_export is None or now - self.last_export >= self.interval:
+            self.export()
+
+
+class SetWatcher:
+    """
+    Per-set write-completion detection for watch mode.
+
+    Substance writes the maps of a set one after another over several seconds.
+    A set only becomes ready once all four maps exist, end with a complete PNG
+    trailer and have kept the same size/mtime for the quiet period, and it is
+    only reported again after one of its maps changes.
+    """
+
+    def __init__(self, converter, quiet_period=2.0, metrics=None):
+        self.converter = converter
+        self.quiet_period = quiet_period
+        self.metrics = metrics
+        self.pending = {}     # base_name -> (signature, time first seen)
+        self.converted = {}   # base_name -> signature at the last conversion
+        self.reported = set()  # sets returned by poll() and not converted yet
+
+    def reset(self):
+        self.pending = {}
+        self.converted = {}
+        self.reported = set()
+
+    def set_signature(self, base_name):
+        """ Returns the (size, mtime) of every map of a set, or None if the set is incomplete """
+        signature = []
+        for file_name in self.converter.set_files(base_name):
+            try:
+                signature.append(self.converter.source_stat(file_name))
+            except (OSError, KeyError):
+                return None
+        return tuple(signature)
+
+    def is_complete(self, base_name):
+        """ Checks the PNG trailer of every map to catch files that are still being written """
+        if self.converter.source() is not None:
+            # Archive members are complete once the archive could be opened
+            return True
+        for file_name in self.converter.set_files(base_name):
+            try:
+                with open(os.path.join(self.converter.folder, file_name), 'rb') as f:
+                    f.seek(-len(PNG_TRAILER), os.SEEK_END)
+                    if f.read() != PNG_TRAILER:
+                        return False
+            except OSError:
+                return False
+        return True
+
+    def poll(self, now=None):
+        """ Returns the base names whose maps changed and have settled since the last poll """
+        now = time.monotonic() if now is None else now
+        scan_start = time.perf_counter()
+        png_files = [f for f in self.converter.source_names() if f.endswith('.png')]
+        base_names = set(f.rsplit('_', 1)[0] for f in png_files)
+
+        ready = []
+        for base_name in sorted(base_names):
+            signature = self.set_signature(base_name)
+            if signature is None or signature == self.converted.get(base_name):
+                self.pending.pop(base_name, None)
+                continue
+
+            previous = self.pending.get(base_name)
+            if previous is None or previous[0] != signature:
+                # New or still changing: restart the quiet period
+                if previous is None and self.metrics:
+                    self.metrics.inc('changes_detected')
+                self.pending[base_name] = (signature, now)
+            elif now - previous[1] >= self.quiet_period and self.is_complete(base_name):
+                ready.append(base_name)
+
+        # Forget sets whose files disappeared
+        for base_name in list(self.pending):
+            if base_name not in base_names:
+                del self.pending[base_name]
+
+        self.reported.update(ready)
+        if self.metrics:
+            self.metrics.inc('scans')
+            self.metrics.observe('scan_duration_seconds', time.perf_counter() - scan_start)
+            self.metrics.set_gauge('watched_sets', len(base_names))
+            self.metrics.set_gauge('pending_sets', len(self.pending))
+        return ready
+
+    def mark_converted(self, base_name, signature, bytes_written=0):
+        self.converted[base_name] = signature
+        self.pending.pop(base_name, None)
+        if base_name in self.reported:
+            self.reported.discard(base_name)
+            if self.metrics:
+                # Latency is measured from the newest map modification to now
+                self.metrics.inc('sets_converted')
+                self.metrics.inc('bytes_written', bytes_written)
+                if signature:
+                    # Archive members carry a CRC instead of an mtime: the archive's mtime counts
+                    archive = self.converter.source()
+                    newest_change = (archive.signature[1] if archive else max(mtime for _, mtime in signature)) / 1e9
+                    self.metrics.observe('conversion_latency_seconds', max(0.0, time.time() - newest_change))
+
+    def mark_failed(self, base_name):
+        if base_name in self.reported:
+            self.reported.discard(base_name)
+            if self.metrics:
+                self.metrics.inc('failures')
+
+
+class SharedWorkQueue:
+    """
+    Work queue kept in a shared folder, so several SkinTool instances (on one
+    machine or on several) convert the texture sets of the folder together.
+
+        .skintool_queue/jobs/<set>.json     queued set and its conversion settings
+        .skintool_queue/claims/<set>.lock   lease of the worker converting it
+        .skintool_queue/done/<set>.json     result written back by the worker
+
+    A set is claimed by creating its lock file with O_EXCL, which only one
+    worker can win. The lock holds a lease the worker renews while converting;
+    a lease that ran out belongs to a crashed worker, so the next worker breaks
+    it and converts the set again. A worker that loses its lease cancels the
+    set without writing anything. Leases are timed by the share's clock (file
+    modification times), since the machines' clocks may disagree. Paths are
+    stored relative to the shared folder, which may be mounted at a different
+    place on every machine.
+    """
+
+    DIR_NAME = '.skintool_queue'
+
+    def __init__(self, folder, lease=60.0, worker_id=None):
+        self.folder = folder
+        self.root = os.path.join(folder, self.DIR_NAME)
+        self.lease = lease
+        self.worker_id = worker_id or f"{platform.node()}-{os.getpid()}"
+        self.throttle = None  # Throttle of a low-impact worker
+        self.clock_offset = None  # Share clock minus this machine's clock
+        self.clock_checked = 0.0
+        for kind in ('jobs', 'claims', 'done'):
+            os.makedirs(os.path.join(self.root, kind), exist_ok=True)
+
+    def path(self, kind, base_name):
+        extension = '.lock' if kind == 'claims' else '.json'
+        return os.path.join(self.root, kind, f"{base_name}{extension}")
+
+    def read_json(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write_json(self, path, data):
+        temp_path = f"{path}.{self.worker_id}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, path)
+
+    def enqueue(self, base_names, params):
+        """ Queues sets with the conversion parameters, dropping earlier results """
+        params = dict(params)
+        output = params.get('output')
+        if output and os.path.isabs(output):
+            try:
+                if os.path.commonpath([os.path.abspath(self.folder), output]) == os.path.abspath(self.folder):
+                    params['output'] = os.path.relpath(output, self.folder)
+            except ValueError:
+                pass  # Other drive on Windows
+        for base_name in base_names:
+            try:
+                os.remove(self.path('done', base_name))
+            except OSError:
+                pass
+            self.write_json(self.path('jobs', base_name), {
+                'base_name': base_name,
+                'params': params,
+                'queued': time.time(),
+                'queued_by': self.worker_id,
+            })
+        return len(base_names)
+
+    def pending(self):
+        """ Queued sets that were not converted yet, claimed or not """
+        return sorted(f[:-5] for f in os.listdir(os.path.join(self.root, 'jobs')) if f.endswith('.json'))
+
+    def results(self):
+        return {f[:-5]: self.read_json(os.path.join(self.root, 'done', f))
+                for f in os.listdir(os.path.join(self.root, 'done')) if f.endswith('.json')}
+
+    def lease_record(self, token):
+        return {'worker': self.worker_id, 'token': token, 'lease': self.lease}
+
+    def share_time(self):
+        """ Current time on the share's clock, measured as the modification time of a file written now """
+        now = time.time()
+        if self.clock_offset is None or now - self.clock_checked > self.lease:
+            clock_path = os.path.join(self.root, f".clock.{self.worker_id}")
+            with open(clock_path, 'w', encoding='utf-8') as f:
+                f.write(self.worker_id)
+            try:
+                self.clock_offset = os.path.getmtime(clock_path) - now
+            finally:
+                os.remove(clock_path)
+            self.clock_checked = now
+        return now + self.clock_offset
+
+    def expired_lease(self, lock_path):
+        """
+        Returns the lease of a lock that ran out ({} for a lock still being written),
+        or None while it is live. The lock is rewritten on every renewal, so its age
+        on the share's clock is the time since the holder last renewed it.
+        """
+        lease = self.read_json(lock_path) or {}
+        try:
+            age = self.share_time() - os.path.getmtime(lock_path)
+        except OSError:
+            return None
+        return lease if age > lease.get('lease', self.lease) else None
+
+    def claim(self, base_name):
+        """ Returns a claim token, or None if another worker holds a live lease on the set """
+        lock_path = self.path('claims', base_name)
+        token = f"{self.worker_id}-{time.time_ns()}"
+        for attempt in range(2):
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                expired = None if attempt else self.expired_lease(lock_path)
+                if expired is None:
+                    return None
+                # The holder crashed: only one worker wins renaming the lock away
+                stale_path = f"{lock_path}.{token}.stale"
+                try:
+                    os.rename(lock_path, stale_path)
+                except OSError:
+                    return None
+                if (self.read_json(stale_path) or {}).get('token') != expired.get('token'):
+                    # Another worker broke the lease and claimed the set in the meantime:
+                    # its live lock was moved instead, so put it back and give up
+                    self.restore_lock(stale_path, lock_path)
+                    return None
+                try:
+                    os.remove(stale_path)
+                except OSError:
+                    pass
+                continue
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.lease_record(token), f)
+            if not os.path.exists(self.path('jobs', base_name)):
+                # Finished by another worker since the jobs were listed
+                self.release(base_name, token)
+                return None
+            return token
+        return None
+
+    def restore_lock(self, stale_path, lock_path):
+        """ Puts back a lock that was moved by mistake, unless the set was claimed again since """
+        try:
+            with open(stale_path, 'rb') as f:
+                content = f.read()
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+        except OSError:
+            pass  # Its holder finds the lease gone when renewing and cancels the set
+        try:
+            os.remove(stale_path)
+        except OSError:
+            pass
+
+    def renew(self, base_name, token):
+        """ Extends the lease while the set is converting; False if it was lost """
+        lock_path = self.path('claims', base_name)
+        lease = self.read_json(lock_path)
+        if not lease or lease.get('token') != token:
+            return False
+        self.write_json(lock_path, self.lease_record(token))
+        return True
+
+    def release(self, base_name, token):
+        lock_path = self.path('claims', base_name)
+        lease = self.read_json(lock_path)
+        if lease and lease.get('token') == token:
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+
+    def complete(self, base_name, token, result):
+        """ Writes the result back, then removes the job and its claim """
+        self.write_json(self.path('done', base_name), result)
+        try:
+            os.remove(self.path('jobs', base_name))
+        except OSError:
+            pass
+        self.release(base_name, token)
+
+    def run_job(self, base_name, token):
+        """
+        Converts a claimed set, renewing its lease from a background thread.
+
+        If the lease is lost, another worker owns the set: the conversion is
+        cancelled before its next stage and no output or result is written.
+        """
+        stop = threading.Event()
+        lost = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(self.lease / 3):
+                try:
+                    if not self.renew(base_name, token):
+                        print(f"Lost the lease on {base_name}, cancelling it")
+                        lost.set()
+                        return
+                except OSError as e:
+                    print(f"Error renewing lease on {base_name}: {str(e)}")
+
+        thread = threading.Thread(target=heartbeat, daemon=True)
+        thread.start()
+        start = time.perf_counter()
+        rebuilt, error = [], None
+        try:
+            job = self.read_json(self.path('jobs', base_name))
+            if job is None:
+                raise Exception(f"Error reading queued job {base_name}")
+            params = dict(job['params'], folder=self.folder)
+            if params.get('output'):
+                params['output'] = os.path.join(self.folder, params['output'])
+                os.makedirs(params['output'], exist_ok=True)
+            converter = SkinConverter.from_params(params)
+            converter.throttle = self.throttle
+            rebuilt = converter.convert_set(base_name, cancelled=lost)
+        except Exception as e:
+            error = str(e)
+        finally:
+            stop.set()
+            thread.join()
+        if lost.is_set():
+            # The worker that took over the set writes its result
+            return {'base_name': base_name, 'worker': self.worker_id, 'rebuilt': [],
+                    'error': f"Lost the lease on {base_name}", 'seconds': round(time.perf_counter() - start, 3)}
+        result = {
+            'base_name': base_name,
+            'worker': self.worker_id,
+            'rebuilt': rebuilt,
+            'error': error,
+            'seconds': round(time.perf_counter() - start, 3),
+            'finished': time.time(),
+        }
+        self.complete(base_name, token, result)
+        return result
+
+    def work(self, idle_wait=None):
+        """
+        Claims and converts queued sets until the queue is empty, yielding each result.
+
+        While the remaining sets are claimed by other workers it keeps polling, so
+        the sets of a worker that crashes are picked up once its leases run out.
+        """
+        idle_wait = idle_wait or min(self.lease / 4, 2.0)
+        while True:
+            base_names = self.pending()
+            if not base_names:
+                return
+            claimed = False
+            for base_name in base_names:
+                token = self.claim(base_name)
+                if token:
+                    claimed = True
+                    yield self.run_job(base_name, token)
+            if not claimed:
+                time.sleep(idle_wait)
+
+
+DAEMON_PORT = 47300
+
+
+class ConversionDaemon:
+    """
+    Resident conversion service for scripted jobs.
+
+    Keeps the interpreter, NumPy and PIL loaded and accepts jobs over a
+    localhost HTTP API, so an export hook or shell script only pays for the
+    request itself. Jobs run one at a time on a background worker.
+
+        POST /convert-set     {"folder", "base_name", "output", "alpha_fill", "delete_pngs", "encoder", "wait"}
+        POST /convert-folder  {"folder" (or a .zip), "output", "output_zip", "alpha_fill", "delete_pngs", "encoder", "wait"}
+        POST /build-mip       {"images" or "folder", "output", "base_size", "auto_mip", "format", "wait"}
+        POST /build-mip-batch {"folder", "output", "base_size", "auto_mip", "format", "workers", "wait"}
+        GET  /status          daemon state and queue length
+        GET  /jobs, /jobs/ID  job state, result and progress snapshot
+        POST /shutdown        stops the daemon
+
+    POST bodies must be sent as application/json. Requests carrying an Origin
+    header or a Host other than this machine are refused, so web pages open in
+    a browser cannot reach the API.
+    """
+
+    ENDPOINTS = {'/convert-set': 'convert_set', '/convert-folder': 'convert_folder', '/build-mip': 'build_mip',
+                 '/build-mip-batch': 'build_mip_batch'}
+    LOCAL_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+    def __init__(self, host='127.0.0.1', port=DAEMON_PORT, verbose=False):
+        self.verbose = verbose
+        self.jobs = {}
+        self.job_events = {}
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.next_id = 1
+        self.started = time.time()
+        self.server = ThreadingHTTPServer((host, port), DaemonRequestHandler)
+        self.server.conversion_daemon = self
+        self.worker = threading.Thread(target=self.work, daemon=True)
+
+    def serve_forever(self):
+        self.worker.start()
+        host, port = self.server.server_address[:2]
+        print(f"SkinTool daemon listening on http://{host}:{port}", flush=True)
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.server.server_close()
+
+    def shutdown(self):
+        # serve_forever() must be stopped from another thread
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+    def submit(self, job_type, params):
+        """ Queues a job and returns its public record """
+        with self.lock:
+            job_id = str(self.next_id)
+            self.next_id += 1
+            job = {
+                'id': job_id,
+                'type': job_type,
+                'state': 'queued',
+                'params': params,
+                'submitted': time.time(),
+                'started': None,
+                'finished': None,
+                'result': None,
+                'error': None,
+                'progress': None,
+            }
+            self.jobs[job_id] = job
+            self.job_events[job_id] = threading.Event()
+        self.queue.put(job_id)
+        return job
+
+    def wait(self, job_id, timeout=None):
+        self.job_events[job_id].wait(timeout)
+        return self.jobs[job_id]
+
+    def status(self):
+        with self.lock:
+            states = {}
+            for job in self.jobs.values():
+                states[job['state']] = states.get(job['state'], 0) + 1
+        return {
+            'pid': os.getpid(),
+            'uptime': round(time.time() - self.started, 1),
+            'queued': self.queue.qsize(),
+            'jobs': states,
+        }
+
+    def work(self):
+        while True:
+            job_id = self.queue.get()
+            job = self.jobs[job_id]
+            job['state'] = 'running'
+            job['started'] = time.time()
+            try:
+                job['result'] = self.run_job(job)
+                job['state'] = 'done'
+            except Exception as e:
+                job['error'] = str(e)
+                job['state'] = 'failed'
+            job['finished'] = time.time()
+            self.job_events[job_id].set()
+            if self.verbose:
+                print(f"job {job_id} {job['type']}: {job['state']} in "
+                      f"{job['finished'] - job['started']:.2f}s", flush=True)
+
+    def run_job(self, job):
+        params = job['params']
+
+        def update(progress):
+            job['progress'] = progress.snapshot()
+
+        if job['type'] in ('convert_set', 'convert_folder'):
+            converter = SkinConverter.from_params(params)
+            progress = ConversionProgress(callback=update)
+            if job['type'] == 'convert_set':
+                base_names = [params['base_name']]
+            else:
+                base_names = converter.find_texture_sets()
+            results = converter.convert_all(base_names, progress=progress)
+            failed = {base_name: error for base_name, error in results if error}
+            if job['type'] == 'convert_set' and failed:
+                raise Exception(failed[params['base_name']])
+            return {
+                'converted': [base_name for base_name, error in results if not error],
+                'failed': failed,
+                'outputs': [os.path.join(converter.output_archive or converter.output_folder, name)
+                            for base_name, error in results if not error
+                            for name in converter.output_names(base_name)],
+                'stats': progress.snapshot(),
+                'metrics': converter.last_metrics,
+            }
+
+        if job['type'] == 'build_mip':
+            images = params.get('images') or list_mipmap_images(params['folder'])
+            if not images:
+                raise Exception('No images found for mipmap build')
+            progress = ConversionProgress(stages=MipmapBuilder.STAGES, callback=update)
+            MipmapBuilder(auto_mip=params.get('auto_mip', True), fmt=params.get('format', 'BGRA8')).build(
+                images, int(params.get('base_size', 4096)), params['output'], progress)
+            return {'output': params['output'], 'levels': len(images), 'stats': progress.snapshot()}
+
+        if job['type'] == 'build_mip_batch':
+            mip_jobs = find_mipmap_jobs(params['folder'], params.get('output'),
+                                        int(params.get('base_size', 4096)), params.get('auto_mip', True),
+                                        params.get('format', 'BGRA8'))
+            progress = ConversionProgress(stages=MipmapBuilder.STAGES, callback=update)
+            outputs = {}
+            batch = MipmapBatch(mip_jobs, params.get('workers'))
+            for mip_job, error, seconds in batch.run(
+                    lambda mip_job: batch.builder(mip_job).build(
+                        mip_job['images'], mip_job['base_size'], mip_job['output'], progress)):
+                outputs[mip_job['output']] = {'error': error, 'seconds': round(seconds, 3)}
+            failed = sum(1 for result in outputs.values() if result['error'])
+            return {'outputs': outputs, 'built': len(outputs) - failed, 'failed': failed,
+                    'stats': progress.snapshot()}
+
+        raise Exception(f"Unknown job type: {job['type']}")
+
+
+class DaemonRequestHandler(BaseHTTPRequestHandler):
+    """ HTTP front end of ConversionDaemon """
+
+    def send_json(self, code, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def is_local_request(self):
+        """ False for browser requests (Origin header) and for names other than localhost (DNS rebinding) """
+        if self.headers.get('Origin') is not None:
+            return False
+        host = (self.headers.get('Host') or '').strip().lower()
+        if host.startswith('['):
+            host = host[1:].split(']', 1)[0]
+        elif host.count(':') == 1:
+            host = host.split(':', 1)[0]
+        return host in self.server.conversion_daemon.LOCAL_HOSTS
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length).decode('utf-8'))
+
+    def do_GET(self):
+        daemon = self.server.conversion_daemon
+        if not self.is_local_request():
+            self.send_json(403, {'error': 'Only local clients may use the daemon'})
+        elif self.path == '/status':
+            self.send_json(200, daemon.status())
+        elif self.path == '/jobs':
+            self.send_json(200, list(daemon.jobs.values()))
+        elif self.path.startswith('/jobs/') and self.path[6:] in daemon.jobs:
+            self.send_json(200, daemon.jobs[self.path[6:]])
+        else:
+            self.send_json(404, {'error': f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        daemon = self.server.conversion_daemon
+        if not self.is_local_request():
+            self.send_json(403, {'error': 'Only local clients may use the daemon'})
+            return
+        # Browsers can only send other content types without a CORS preflight, which is never answered
+        content_type = (self.headers.get('Content-Type') or '').split(';', 1)[0].strip().lower()
+        if content_type != 'application/json':
+            self.send_json(415, {'error': 'The request body must be sent as application/json'})
+            return
+        if self.path == '/shutdown':
+            self.send_json(200, {'state': 'stopping'})
+            daemon.shutdown()
+            return
+        if self.path not in daemon.ENDPOINTS:
+            self.send_json(404, {'error': f"Unknown path: {self.path}"})
+            return
+        try:
+            params = self.read_json()
+        except ValueError as e:
+            self.send_json(400, {'error': f"Invalid JSON: {str(e)}"})
+            return
+        if not isinstance(params, dict):
+            self.send_json(400, {'error': 'The request body must be a JSON object'})
+            return
+
+        wait = params.pop('wait', False)
+        job = daemon.submit(daemon.ENDPOINTS[self.path], params)
+        if wait:
+            job = daemon.wait(job['id'])
+            self.send_json(200 if job['state'] == 'done' else 500, job)
+        else:
+            self.send_json(202, job)
+
+    def log_message(self, format, *args):
+        if self.server.conversion_daemon.verbose:
+            super().log_message(format, *args)
+
+
+THUMBNAIL_SIZE = 64
+
+
+def load_thumbnail(path, size=THUMBNAIL_SIZE):
+    """ Returns ((width, height), RGBA bytes, (thumb width, thumb height)) of an image """
+    if path.lower().endswith('.dds'):
+        try:
+            img = Image.fromarray(np.ascontiguousarray(decode_dds(path)), 'RGBA')
+        except Exception:
+            img = Image.open(path)
+    else:
+        img = Image.open(path)
+    with img:
+        full_size = img.size
+        # thumbnail() decodes JPEGs at a reduced scale and shrinks in integer steps first
+        img.thumbnail((size, size), Image.BILINEAR, reducing_gap=2.0)
+        thumb = img.convert('RGBA')
+    return full_size, thumb.tobytes(), thumb.size
+
+
+class MipmapThumbnailModel(QAbstractListModel):
+    """
+    Rows of the mipmap gallery: one level image each, with its thumbnail, the
+    mip size it becomes and warnings about its dimensions.
+
+    Thumbnails are decoded on a background pool and only for rows the view
+    paints, so folders with hundreds of images open instantly. A GUI timer
+    picks up finished thumbnails and drops requests for rows that were
+    scrolled out of view before a worker got to them.
+    """
+
+    def __init__(self, labels, workers=4):
+        super().__init__()
+        self.labels = labels
+        self.paths = []
+        self.base_size = 4096
+        self.thumbnails = {}   # path -> QPixmap
+        self.sizes = {}        # path -> (width, height), None when unreadable
+        self.requested = []    # rows waiting for a worker, most recent last
+        self.loading = set()   # paths being decoded
+        self.results = queue.Queue()
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.is_visible = lambda row: True
+        self.timer = QTimer(self)
+        self.timer.setInterval(30)
+        self.timer.timeout.connect(self.poll)
+
+    def set_images(self, paths, base_size):
+        self.beginResetModel()
+        self.paths = list(paths)
+        self.base_size = base_size
+        self.requested = []
+        self.endResetModel()
+
+    def set_base_size(self, base_size):
+        self.base_size = base_size
+        self.refresh()
+
+    def set_labels(self, labels):
+        self.labels = labels
+        self.refresh()
+
+    def refresh(self):
+        if self.paths:
+            self.dataChanged.emit(self.index(0), self.index(len(self.paths) - 1))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.paths)
+
+    def target_size(self, row):
+        return max(1, self.base_size // (2 ** row))
+
+    def warnings(self, row):
+        """ Dimension problems of a level image, once its header has been read """
+        size = self.sizes.get(self.paths[row], False)
+        if size is False:
+            return []
+        if size is None:
+            return [self.labels['thumb_unreadable']]
+        width, height = size
+        warnings = []
+        if width != height:
+            warnings.append(self.labels['thumb_not_square'].format(width, height))
+        if width & (width - 1) or height & (height - 1):
+            warnings.append(self.labels['thumb_not_pow2'])
+        if max(width, height) < self.target_size(row):
+            warnings.append(self.labels['thumb_upscaled'].format(self.target_size(row)))
+        return warnings
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        path = self.paths[row]
+        if role == Qt.DisplayRole:
+            target = self.target_size(row)
+            text = f"{os.path.basename(path)}\n{self.labels['mipmap_level'].format(row, target, target)}"
+            if self.sizes.get(path):
+                text += " ({0}x{1})".format(*self.sizes[path])
+            warnings = self.warnings(row)
+            if warnings:
+                text += f"\n⚠ {', '.join(warnings)}"
+            return text
+        if role == Qt.DecorationRole:
+            pixmap = self.thumbnails.get(path)
+            if pixmap is None and path not in self.sizes:
+                self.request(row)
+            return pixmap
+        if role == Qt.ToolTipRole:
+            return path
+        return None
+
+    def request(self, row):
+        if self.paths[row] not in self.loading and row not in self.requested:
+            self.requested.append(row)
+            if not self.timer.isActive():
+                self.timer.start()
+
+    def poll(self):
+        """ Installs finished thumbnails and hands the visible requested rows to the pool """
+        rows = {path: row for row, path in enumerate(self.paths)}
+        while True:
+            try:
+                path, size, data, thumb_size = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.loading.discard(path)
+            self.sizes[path] = size
+            if data is not None:
+                width, height = thumb_size
+                self.thumbnails[path] = QPixmap.fromImage(
+                    QImage(data, width, height, width * 4, QImage.Format_RGBA8888).copy())
+            if path in rows:
+                index = self.index(rows[path])
+                self.dataChanged.emit(index, index)
+
+        # Latest requests first: they are the rows the user scrolled to last
+        while self.requested and len(self.loading) < self.workers * 2:
+            row = self.requested.pop()
+            if row >= len(self.paths) or not self.is_visible(row):
+                continue
+            path = self.paths[row]
+            if path in self.sizes or path in self.loading:
+                continue
+            self.loading.add(path)
+            self.pool.submit(self.load, path)
+
+        if not self.requested and not self.loading:
+            self.timer.stop()
+
+    def load(self, path):
+        try:
+            self.results.put((path,) + load_thumbnail(path))
+        except Exception:
+            self.results.put((path, None, None, None))
+
+
 class App(QWidget):
-    def __init__(self):
+    def __init__(self, metrics_path=None, metrics_interval=60.0, throttle=None):
         super().__init__()
 
         # Default settings
@@ -33,17 +4141,30 @@ class App(QWidget):
         self.language = 'en'
         self.folder_scan_enabled = True  # Folder scan enabled by default
         self.dds_format = 'DXT5'  # Default DDS format (DXT5 only as requested)
+        self.encoder_backend = 'auto'  # Fastest backend measured on this machine
+        self.verify_output = False  # Decode outputs again and report PSNR / max error
+        self.patch_blocks = False  # Re-encode only the painted blocks of existing DDS files
+        self.dither = False  # Ordered dithering for 16-bit maps
+        self.resample_target = 'largest'  # Resolution mismatched maps are resampled to
+        self.low_impact = throttle is not None  # Watch-mode conversions give way to the game
+        self.throttle = throttle or Throttle()
         
         # For tracking file changes
         self.processed_files = set()
-        self.last_modification_times = {}
         self.waiting_for_changes = False
-        
+
+        # Conversion engine shared with the command line
+        self.converter = SkinConverter()
+        self.watch_metrics = WatchMetrics(metrics_path, metrics_interval)
+        self.set_watcher = SetWatcher(self.converter, metrics=self.watch_metrics)
+        self.last_progress = None
+
         # For DDS mipmap generation
         self.mipmap_input_folder = None
         self.mipmap_output_path = None
         self.mipmap_images = []
         self.auto_mip = True
+        self.mipmap_format = 'BGRA8'
         self.base_size = 4096
 
         # Translations (offline support)
@@ -90,7 +4211,34 @@ class App(QWidget):
                 'mipmap_select_folder_first': 'Please select a source folder first.',
                 'mipmap_success': 'DDS with mipmaps generated successfully!',
                 'image_read_error': 'Unable to read image file: ',
-                'write_error': 'Error writing output file: '
+                'write_error': 'Error writing output file: ',
+                'eta': 'ETA',
+                'encoder': 'Encoder Backend',
+                'encoder_auto': 'Auto (fastest)',
+                'verify_output': 'Verify output quality (decode and measure error)',
+                'quality': 'Output quality (PSNR / max error):',
+                'dither': 'Dither 16-bit maps',
+                'up_to_date': 'texture sets were already up to date.',
+                'resolution': 'Map Resolution:',
+                'resolution_largest': 'Largest map',
+                'resolution_smallest': 'Smallest map',
+                'queues': 'Waiting per stage:',
+                'mipmap_batch': 'Build Batch Folder',
+                'batch_no_jobs': 'No subfolders with images or mipmaps.json found in this folder.',
+                'batch_queued': 'queued',
+                'batch_done': 'done',
+                'batch_failed': 'failed:',
+                'batch_summary': '{0} DDS files built, {1} failed in {2}',
+                'batch_resumed': 'sets already converted by an interrupted batch',
+                'mipmap_level': 'Level {0}: {1}x{2}',
+                'thumb_not_square': 'not square ({0}x{1})',
+                'thumb_not_pow2': 'size is not a power of two',
+                'thumb_upscaled': 'smaller than {0} px, will be upscaled',
+                'thumb_unreadable': 'unreadable image',
+                'select_archive': 'Open Zip Archive',
+                'mipmap_format': 'DDS Format:',
+                'low_impact': 'Low-impact watch mode (low priority, fewer cores)',
+                'patch_blocks': 'Re-encode only painted areas (patch existing DDS)'
             },
             'es': {
                 'select_folder': 'Seleccionar Carpeta (Fuente)',
@@ -134,7 +4282,34 @@ class App(QWidget):
                 'mipmap_select_folder_first': 'Por favor seleccione una carpeta de origen primero.',
                 'mipmap_success': '¡DDS con mipmaps generado exitosamente!',
                 'image_read_error': 'No se puede leer el archivo de imagen: ',
-                'write_error': 'Error al escribir el archivo de salida: '
+                'write_error': 'Error al escribir el archivo de salida: ',
+                'eta': 'Tiempo restante',
+                'encoder': 'Codificador',
+                'encoder_auto': 'Automático (el más rápido)',
+                'verify_output': 'Verificar calidad de salida (decodificar y medir error)',
+                'quality': 'Calidad de salida (PSNR / error máx.):',
+                'dither': 'Tramado de mapas de 16 bits',
+                'up_to_date': 'conjuntos de texturas ya estaban actualizados.',
+                'resolution': 'Resolución de mapas:',
+                'resolution_largest': 'Mapa más grande',
+                'resolution_smallest': 'Mapa más pequeño',
+                'queues': 'En espera por etapa:',
+                'mipmap_batch': 'Generar carpeta por lotes',
+                'batch_no_jobs': 'No se encontraron subcarpetas con imágenes ni mipmaps.json en esta carpeta.',
+                'batch_queued': 'en cola',
+                'batch_done': 'listo',
+                'batch_failed': 'error:',
+                'batch_summary': '{0} archivos DDS generados, {1} fallidos en {2}',
+                'batch_resumed': 'conjuntos ya convertidos por un lote interrumpido',
+                'mipmap_level': 'Nivel {0}: {1}x{2}',
+                'thumb_not_square': 'no es cuadrada ({0}x{1})',
+                'thumb_not_pow2': 'el tamaño no es potencia de dos',
+                'thumb_upscaled': 'menor de {0} px, se ampliará',
+                'thumb_unreadable': 'imagen ilegible',
+                'select_archive': 'Abrir archivo Zip',
+                'mipmap_format': 'Formato DDS:',
+                'low_impact': 'Modo de bajo impacto al vigilar (baja prioridad, menos núcleos)',
+                'patch_blocks': 'Recodificar solo las zonas pintadas (parchear DDS existentes)'
             },
             'fr': {
                 'select_folder': 'Sélectionner un Dossier (Source)',
@@ -178,7 +4353,34 @@ class App(QWidget):
                 'mipmap_select_folder_first': 'Veuillez d\'abord sélectionner un dossier source.',
                 'mipmap_success': 'DDS avec mipmaps généré avec succès !',
                 'image_read_error': 'Impossible de lire le fichier image: ',
-                'write_error': 'Erreur lors de l\'écriture du fichier de sortie: '
+                'write_error': 'Erreur lors de l\'écriture du fichier de sortie: ',
+                'eta': 'Temps restant',
+                'encoder': 'Encodeur',
+                'encoder_auto': 'Auto (le plus rapide)',
+                'verify_output': 'Vérifier la qualité de sortie (décoder et mesurer l\'erreur)',
+                'quality': 'Qualité de sortie (PSNR / erreur max.) :',
+                'dither': 'Tramage des textures 16 bits',
+                'up_to_date': 'ensembles de textures étaient déjà à jour.',
+                'resolution': 'Résolution des textures :',
+                'resolution_largest': 'Plus grande texture',
+                'resolution_smallest': 'Plus petite texture',
+                'queues': 'En attente par étape :',
+                'mipmap_batch': 'Générer un dossier par lots',
+                'batch_no_jobs': 'Aucun sous-dossier avec des images ni mipmaps.json trouvé dans ce dossier.',
+                'batch_queued': 'en attente',
+                'batch_done': 'terminé',
+                'batch_failed': 'échec :',
+                'batch_summary': '{0} fichiers DDS générés, {1} échecs en {2}',
+                'batch_resumed': 'ensembles déjà convertis par un lot interrompu',
+                'mipmap_level': 'Niveau {0} : {1}x{2}',
+                'thumb_not_square': 'non carrée ({0}x{1})',
+                'thumb_not_pow2': 'taille non puissance de deux',
+                'thumb_upscaled': 'plus petite que {0} px, sera agrandie',
+                'thumb_unreadable': 'image illisible',
+                'select_archive': 'Ouvrir une archive Zip',
+                'mipmap_format': 'Format DDS :',
+                'low_impact': 'Mode discret en surveillance (priorité basse, moins de cœurs)',
+                'patch_blocks': 'Réencoder seulement les zones peintes (corriger les DDS existants)'
             },
             'zh': {
                 'select_folder': '选择文件夹 (源)',
@@ -222,7 +4424,34 @@ class App(QWidget):
                 'mipmap_select_folder_first': '请先选择源文件夹。',
                 'mipmap_success': '已成功生成带有 mipmaps 的 DDS！',
                 'image_read_error': '无法读取图像文件: ',
-                'write_error': '写入输出文件时出错: '
+                'write_error': '写入输出文件时出错: ',
+                'eta': '剩余时间',
+                'encoder': '编码器',
+                'encoder_auto': '自动 (最快)',
+                'verify_output': '验证输出质量（解码并测量误差）',
+                'quality': '输出质量（PSNR / 最大误差）：',
+                'dither': '16 位贴图抖动',
+                'up_to_date': '个纹理集已是最新。',
+                'resolution': '贴图分辨率：',
+                'resolution_largest': '最大贴图',
+                'resolution_smallest': '最小贴图',
+                'queues': '各阶段等待：',
+                'mipmap_batch': '批量生成文件夹',
+                'batch_no_jobs': '此文件夹中未找到包含图像的子文件夹或 mipmaps.json。',
+                'batch_queued': '排队中',
+                'batch_done': '完成',
+                'batch_failed': '失败：',
+                'batch_summary': '已生成 {0} 个 DDS 文件，{1} 个失败，用时 {2}',
+                'batch_resumed': '个纹理集已由中断的批处理转换',
+                'mipmap_level': '级别 {0}：{1}x{2}',
+                'thumb_not_square': '非正方形（{0}x{1}）',
+                'thumb_not_pow2': '尺寸不是 2 的幂',
+                'thumb_upscaled': '小于 {0} 像素，将被放大',
+                'thumb_unreadable': '无法读取的图像',
+                'select_archive': '打开 Zip 压缩包',
+                'mipmap_format': 'DDS 格式：',
+                'low_impact': '监视模式低影响运行 (低优先级, 更少核心)',
+                'patch_blocks': '仅重新编码绘制区域 (修补现有 DDS)'
             },
             'de': {
                 'select_folder': 'Ordner Auswählen (Quelle)',
@@ -266,7 +4495,34 @@ class App(QWidget):
                 'mipmap_select_folder_first': 'Bitte wählen Sie zuerst einen Quellordner aus.',
                 'mipmap_success': 'DDS mit Mipmaps erfolgreich generiert!',
                 'image_read_error': 'Bilddatei kann nicht gelesen werden: ',
-                'write_error': 'Fehler beim Schreiben der Ausgabedatei: '
+                'write_error': 'Fehler beim Schreiben der Ausgabedatei: ',
+                'eta': 'Restzeit',
+                'encoder': 'Encoder',
+                'encoder_auto': 'Automatisch (schnellster)',
+                'verify_output': 'Ausgabequalität prüfen (dekodieren und Fehler messen)',
+                'quality': 'Ausgabequalität (PSNR / max. Fehler):',
+                'dither': '16-Bit-Maps dithern',
+                'up_to_date': 'Textursets waren bereits aktuell.',
+                'resolution': 'Map-Auflösung:',
+                'resolution_largest': 'Größte Map',
+                'resolution_smallest': 'Kleinste Map',
+                'queues': 'Wartend pro Stufe:',
+                'mipmap_batch': 'Stapelordner erstellen',
+                'batch_no_jobs': 'Keine Unterordner mit Bildern oder mipmaps.json in diesem Ordner gefunden.',
+                'batch_queued': 'wartend',
+                'batch_done': 'fertig',
+                'batch_failed': 'fehlgeschlagen:',
+                'batch_summary': '{0} DDS-Dateien erstellt, {1} fehlgeschlagen in {2}',
+                'batch_resumed': 'Sets bereits von einem unterbrochenen Stapel konvertiert',
+                'mipmap_level': 'Stufe {0}: {1}x{2}',
+                'thumb_not_square': 'nicht quadratisch ({0}x{1})',
+                'thumb_not_pow2': 'Größe ist keine Zweierpotenz',
+                'thumb_upscaled': 'kleiner als {0} px, wird hochskaliert',
+                'thumb_unreadable': 'Bild nicht lesbar',
+                'select_archive': 'Zip-Archiv öffnen',
+                'mipmap_format': 'DDS-Format:',
+                'low_impact': 'Schonender Überwachungsmodus (niedrige Priorität, weniger Kerne)',
+                'patch_blocks': 'Nur bemalte Bereiche neu kodieren (vorhandene DDS patchen)'
             },
             
                    'ru': {
@@ -304,7 +4560,34 @@ class App(QWidget):
                 'mipmap_output': 'Файл для Mipmap: ',
                 'mipmap_base_size': 'Базовый размер (Mip 0):',
                 'mipmap_auto': 'Автозавершение цепочки Mipmap',
-                'mipmap_generate': 'Создать DDS с Mipmap'
+                'mipmap_generate': 'Создать DDS с Mipmap',
+                'eta': 'Осталось',
+                'encoder': 'Кодировщик',
+                'encoder_auto': 'Авто (самый быстрый)',
+                'verify_output': 'Проверять качество (декодировать и измерять ошибку)',
+                'quality': 'Качество (PSNR / макс. ошибка):',
+                'dither': 'Дизеринг 16-битных карт',
+                'up_to_date': 'наборов текстур уже актуальны.',
+                'resolution': 'Разрешение карт:',
+                'resolution_largest': 'Наибольшая карта',
+                'resolution_smallest': 'Наименьшая карта',
+                'queues': 'Ожидают по этапам:',
+                'mipmap_batch': 'Пакетная папка',
+                'batch_no_jobs': 'В этой папке нет подпапок с изображениями или mipmaps.json.',
+                'batch_queued': 'в очереди',
+                'batch_done': 'готово',
+                'batch_failed': 'ошибка:',
+                'batch_summary': 'Создано DDS: {0}, ошибок: {1}, за {2}',
+                'batch_resumed': 'наборов уже конвертировано прерванным пакетом',
+                'mipmap_level': 'Уровень {0}: {1}x{2}',
+                'thumb_not_square': 'не квадратное ({0}x{1})',
+                'thumb_not_pow2': 'размер не степень двойки',
+                'thumb_upscaled': 'меньше {0} px, будет увеличено',
+                'thumb_unreadable': 'изображение не читается',
+                'select_archive': 'Открыть Zip-архив',
+                'mipmap_format': 'Формат DDS:',
+                'low_impact': 'Щадящий режим наблюдения (низкий приоритет, меньше ядер)',
+                'patch_blocks': 'Перекодировать только изменённые области (патчить DDS)'
             }
         }
 
@@ -427,6 +4710,11 @@ class App(QWidget):
         
         self.folder_label = QLabel(f"{self.translations[self.language]['source_folder']} {self.translations[self.language]['none']}")
         source_layout.addWidget(self.folder_label, 1)
+        
+        # Zip archives are read in place, without extracting them
+        self.archive_button = QPushButton(self.translations[self.language]['select_archive'])
+        self.archive_button.clicked.connect(self.select_archive)
+        source_layout.addWidget(self.archive_button)
         folders_layout.addLayout(source_layout)
         
         # Output folder selection
@@ -460,6 +4748,21 @@ class App(QWidget):
         alpha_layout.addWidget(self.alpha_fill_combo)
         options_layout.addLayout(alpha_layout)
         
+        # Resolution maps of different sizes are resampled to
+        resolution_layout = QHBoxLayout()
+        resolution_label = QLabel(self.translations[self.language]['resolution'])
+        resolution_label.setMinimumWidth(150)
+        resolution_layout.addWidget(resolution_label)
+        
+        self.resolution_combo = QComboBox()
+        self.resolution_combo.addItem(self.translations[self.language]['resolution_largest'], 'largest')
+        self.resolution_combo.addItem(self.translations[self.language]['resolution_smallest'], 'smallest')
+        for size in (1024, 2048, 4096, 8192):
+            self.resolution_combo.addItem(f"{size} x {size}", (size, size))
+        self.resolution_combo.currentIndexChanged.connect(self.change_resolution)
+        resolution_layout.addWidget(self.resolution_combo)
+        options_layout.addLayout(resolution_layout)
+        
         # DDS Format
         format_layout = QHBoxLayout()
         format_label = QLabel(self.translations[self.language]['format'])
@@ -471,18 +4774,57 @@ class App(QWidget):
         format_layout.addWidget(self.format_combo)
         options_layout.addLayout(format_layout)
         
+        # Encoder backend (Auto benchmarks the available backends once per machine)
+        encoder_layout = QHBoxLayout()
+        encoder_label = QLabel(self.translations[self.language]['encoder'])
+        encoder_label.setMinimumWidth(150)
+        encoder_layout.addWidget(encoder_label)
+        
+        self.encoder_combo = QComboBox()
+        self.encoder_combo.addItem(self.translations[self.language]['encoder_auto'], 'auto')
+        for name, encoder in ENCODERS.items():
+            if encoder.supports(self.converter.dds_format):
+                self.encoder_combo.addItem(name, name)
+        self.encoder_combo.currentIndexChanged.connect(self.change_encoder)
+        encoder_layout.addWidget(self.encoder_combo)
+        options_layout.addLayout(encoder_layout)
+        
         # Auto-delete option
         self.delete_checkbox = QCheckBox(self.translations[self.language]['delete_pngs'])
         self.delete_checkbox.setChecked(self.auto_delete)
         self.delete_checkbox.stateChanged.connect(self.toggle_delete)
         options_layout.addWidget(self.delete_checkbox)
         
+        # 16-bit maps
+        self.dither_checkbox = QCheckBox(self.translations[self.language]['dither'])
+        self.dither_checkbox.setChecked(self.dither)
+        self.dither_checkbox.stateChanged.connect(self.toggle_dither)
+        options_layout.addWidget(self.dither_checkbox)
+        
+        # Round-trip quality check
+        self.verify_checkbox = QCheckBox(self.translations[self.language]['verify_output'])
+        self.verify_checkbox.setChecked(self.verify_output)
+        self.verify_checkbox.stateChanged.connect(self.toggle_verify)
+        options_layout.addWidget(self.verify_checkbox)
+        
+        # Dirty-region re-encode
+        self.patch_checkbox = QCheckBox(self.translations[self.language]['patch_blocks'])
+        self.patch_checkbox.setChecked(self.patch_blocks)
+        self.patch_checkbox.stateChanged.connect(self.toggle_patch_blocks)
+        options_layout.addWidget(self.patch_checkbox)
+        
         # Folder scan option
         self.folder_scan_checkbox = QCheckBox(self.translations[self.language]['folder_scan'])
         self.folder_scan_checkbox.setChecked(self.folder_scan_enabled)
         self.folder_scan_checkbox.stateChanged.connect(self.toggle_folder_scan)
         options_layout.addWidget(self.folder_scan_checkbox)
         
+        # Low-impact watch mode
+        self.low_impact_checkbox = QCheckBox(self.translations[self.language]['low_impact'])
+        self.low_impact_checkbox.setChecked(self.low_impact)
+        self.low_impact_checkbox.stateChanged.connect(self.toggle_low_impact)
+        options_layout.addWidget(self.low_impact_checkbox)
+        
         options_group.setLayout(options_layout)
         skin_layout.addWidget(options_group)
         
@@ -501,11 +4843,22 @@ class App(QWidget):
         self.progress_bar.setAlignment(Qt.AlignCenter)
         progress_layout.addWidget(self.progress_bar)
         
+        # Sets waiting in front of each pipeline stage, showing the bottleneck
+        self.queue_label = QLabel("")
+        self.queue_label.setVisible(False)
+        progress_layout.addWidget(self.queue_label)
+        
         # Add status label for waiting for file changes
         self.status_label = QLabel("")
         self.status_label.setAlignment(Qt.AlignCenter)
         progress_layout.addWidget(self.status_label)
         
+        # Decoded preview of the last converted _n.dds (one grayscale tile per channel)
+        self.output_preview_label = QLabel()
+        self.output_preview_label.setAlignment(Qt.AlignCenter)
+        self.output_preview_label.setVisible(False)
+        progress_layout.addWidget(self.output_preview_label)
+        
         progress_group.setLayout(progress_layout)
         skin_layout.addWidget(progress_group)
         
@@ -517,7 +4870,7 @@ class App(QWidget):
         convert_layout.addSpacerItem(QSpacerItem(40, 20, QSizePolicy.Expanding, QSizePolicy.Minimum))
         
         self.convert_button = QPushButton(self.translations[self.language]['convert'])
-        self.convert_button.clicked.connect(self.convert_files)
+        self.convert_button.clicked.connect(lambda: self.convert_files())
         self.convert_button.setMinimumSize(200, 50)
         self.convert_button.setFont(QFont("Segoe UI", 12, QFont.Bold))
         convert_layout.addWidget(self.convert_button)
@@ -560,6 +4913,15 @@ class App(QWidget):
         output_layout.addWidget(self.mipmap_output_label, 1)
         folders_layout.addLayout(output_layout)
         
+        # Batch folder: one DDS per subfolder, or the builds listed in mipmaps.json
+        batch_layout = QHBoxLayout()
+        self.mipmap_batch_button = QPushButton(self.translations[self.language]['mipmap_batch'])
+        self.mipmap_batch_button.clicked.connect(self.generate_mipmap_batch)
+        self.mipmap_batch_button.setFixedWidth(button_width)
+        batch_layout.addWidget(self.mipmap_batch_button)
+        batch_layout.addStretch(1)
+        folders_layout.addLayout(batch_layout)
+        
         folders_group.setLayout(folders_layout)
         mipmap_layout.addWidget(folders_group)
         
@@ -581,6 +4943,20 @@ class App(QWidget):
         size_layout.addWidget(self.base_size_combo)
         options_layout.addLayout(size_layout)
         
+        # Pixel format: BC formats are 4-8x smaller than uncompressed BGRA
+        format_layout = QHBoxLayout()
+        self.mipmap_format_label = QLabel(self.translations[self.language]['mipmap_format'])
+        self.mipmap_format_label.setMinimumWidth(150)
+        format_layout.addWidget(self.mipmap_format_label)
+        
+        self.mipmap_format_combo = QComboBox()
+        for fmt in MIPMAP_FORMATS:
+            fourcc = DDS_FORMATS[fmt][0]
+            self.mipmap_format_combo.addItem(f"{fmt} ({fourcc.decode()})" if fourcc else fmt, fmt)
+        self.mipmap_format_combo.currentIndexChanged.connect(self.change_mipmap_format)
+        format_layout.addWidget(self.mipmap_format_combo)
+        options_layout.addLayout(format_layout)
+        
         # Auto-complete mipmap option
         self.auto_mip_checkbox = QCheckBox(self.translations[self.language]['mipmap_auto'])
         self.auto_mip_checkbox.setChecked(self.auto_mip)
@@ -606,6 +4982,25 @@ class App(QWidget):
         self.mipmap_status_label.setAlignment(Qt.AlignCenter)
         mipmap_progress_layout.addWidget(self.mipmap_status_label)
         
+        # Gallery of the loaded level images, thumbnails load in the background
+        self.mipmap_thumbnails = MipmapThumbnailModel(self.translations[self.language])
+        self.mipmap_gallery = QListView()
+        self.mipmap_gallery.setModel(self.mipmap_thumbnails)
+        self.mipmap_gallery.setIconSize(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        self.mipmap_gallery.setUniformItemSizes(True)
+        self.mipmap_gallery.setMinimumHeight(220)
+        self.mipmap_gallery.setVisible(False)
+        self.mipmap_gallery.clicked.connect(
+            lambda index: self.show_preview(self.mipmap_thumbnails.paths[index.row()]))
+        self.mipmap_thumbnails.is_visible = lambda row: self.mipmap_gallery.visualRect(
+            self.mipmap_thumbnails.index(row)).intersects(self.mipmap_gallery.viewport().rect())
+        mipmap_progress_layout.addWidget(self.mipmap_gallery)
+        
+        # Per-output status of batch builds
+        self.batch_list = QListWidget()
+        self.batch_list.setVisible(False)
+        mipmap_progress_layout.addWidget(self.batch_list)
+        
         # Preview area
         self.preview_label = QLabel()
         self.preview_label.setAlignment(Qt.AlignCenter)
@@ -892,17 +5287,21 @@ class App(QWidget):
         # Update window title - Change 2: Updated app title
         self.setWindowTitle(self.translations[lang]['app_title'])
         
+        self.mipmap_thumbnails.set_labels(self.translations[lang])
+        
         # Update tab titles
         self.tab_widget.setTabText(0, self.translations[lang]['skin_tab'])
         self.tab_widget.setTabText(1, self.translations[lang]['mipmap_tab'])
         
         # Update skin tab elements
         self.folder_button.setText(self.translations[lang]['select_folder'])
+        self.archive_button.setText(self.translations[lang]['select_archive'])
         self.output_folder_button.setText(self.translations[lang]['select_output'])
         self.convert_button.setText(self.translations[lang]['convert'])
         self.mode_checkbox.setText(self.translations[lang]['dark_mode'])
         self.delete_checkbox.setText(self.translations[lang]['delete_pngs'])
         self.folder_scan_checkbox.setText(self.translations[lang]['folder_scan'])
+        self.low_impact_checkbox.setText(self.translations[lang]['low_impact'])
         self.folder_label.setText(f"{self.translations[lang]['source_folder']} {self.folder or self.translations[lang]['none']}")
         self.output_folder_label.setText(f"{self.translations[lang]['output_folder']} {self.output_folder or self.translations[lang]['none']}")
         self.progress_label.setText(self.translations[lang]['progress'])
@@ -913,7 +5312,9 @@ class App(QWidget):
         self.mipmap_folder_label.setText(f"{self.translations[lang]['mipmap_source']} {self.mipmap_input_folder or self.translations[lang]['none']}")
         self.mipmap_output_label.setText(f"{self.translations[lang]['mipmap_output']} {self.mipmap_output_path or self.translations[lang]['none']}")
         self.auto_mip_checkbox.setText(self.translations[lang]['mipmap_auto'])
+        self.mipmap_format_label.setText(self.translations[lang]['mipmap_format'])
         self.generate_button.setText(self.translations[lang]['mipmap_generate'])
+        self.mipmap_batch_button.setText(self.translations[lang]['mipmap_batch'])
         
         # Update status label if it's currently showing waiting message
         if self.status_label.text():
@@ -930,6 +5331,13 @@ class App(QWidget):
                  box.title() == self.translations['de']['conversion']:
                 box.setTitle(self.translations[lang]['conversion'])
         
+        self.encoder_combo.setItemText(0, self.translations[lang]['encoder_auto'])
+        self.resolution_combo.setItemText(0, self.translations[lang]['resolution_largest'])
+        self.resolution_combo.setItemText(1, self.translations[lang]['resolution_smallest'])
+        self.dither_checkbox.setText(self.translations[lang]['dither'])
+        self.verify_checkbox.setText(self.translations[lang]['verify_output'])
+        self.patch_checkbox.setText(self.translations[lang]['patch_blocks'])
+        
         # Update Alpha Fill Color dropdown
         self.alpha_fill_combo.clear()
         self.alpha_fill_combo.addItems([self.translations[lang]['white'], self.translations[lang]['black']])
@@ -952,6 +5360,12 @@ class App(QWidget):
                  label.text() == self.translations['fr']['format'] or label.text() == self.translations['zh']['format'] or \
                  label.text() == self.translations['de']['format']:
                 label.setText(self.translations[lang]['format'])
+            elif label.text() in [self.translations[code]['resolution'] for code in self.translations]:
+                label.setText(self.translations[lang]['resolution'])
+            elif label.text() == self.translations['en']['encoder'] or label.text() == self.translations['es']['encoder'] or \
+                 label.text() == self.translations['fr']['encoder'] or label.text() == self.translations['zh']['encoder'] or \
+                 label.text() == self.translations['de']['encoder'] or label.text() == self.translations['ru']['encoder']:
+                label.setText(self.translations[lang]['encoder'])
             elif label.text() == self.translations['en']['mipmap_base_size'] or label.text() == self.translations['es']['mipmap_base_size'] or \
                  label.text() == self.translations['fr']['mipmap_base_size'] or label.text() == self.translations['zh']['mipmap_base_size'] or \
                  label.text() == self.translations['de']['mipmap_base_size']:
@@ -967,12 +5381,24 @@ class App(QWidget):
         """ Change alpha fill color (White for Air Vehicles, Black for Ground Vehicles) """
         self.alpha_fill = 'white' if index == 0 else 'black'
 
+    def change_resolution(self, index):
+        """ Resample mismatched maps to the largest, smallest or a fixed resolution """
+        self.resample_target = self.resolution_combo.itemData(index) or 'largest'
+
+    def change_encoder(self, index):
+        """ Pin an encoder backend or let the autotuner choose """
+        self.encoder_backend = self.encoder_combo.itemData(index) or 'auto'
+
     def change_base_size(self, size_text):
         """ Change base size for mipmap generation """
         try:
             self.base_size = int(size_text)
         except ValueError:
             self.base_size = 4096
+        self.mipmap_thumbnails.set_base_size(self.base_size)
+
+    def change_mipmap_format(self, index):
+        self.mipmap_format = self.mipmap_format_combo.itemData(index)
 
     def toggle_auto_mip(self, state):
         """ Toggle auto-complete mipmap chain """
@@ -991,6 +5417,18 @@ class App(QWidget):
             # Initialize file tracking when folder is selected
             self.update_file_tracking()
 
+    def select_archive(self):
+        """ Uses the texture sets inside a zip archive as the source """
+        archive = QFileDialog.getOpenFileName(self, self.translations[self.language]['select_archive'],
+                                              "", "Zip Archives (*.zip)")[0]
+        if archive:
+            self.folder = archive
+            self.folder_label.setText(f"{self.translations[self.language]['source_folder']} {archive}")
+            if not self.output_folder:
+                self.output_folder = os.path.dirname(archive)
+                self.output_folder_label.setText(f"{self.translations[self.language]['output_folder']} {self.output_folder}")
+            self.update_file_tracking()
+
     def select_output_folder(self):
         folder = QFileDialog.getExistingDirectory(self, self.translations[self.language]['select_output'])
         if folder:
@@ -1005,14 +5443,13 @@ class App(QWidget):
             self.mipmap_folder_label.setText(f"{self.translations[self.language]['mipmap_source']} {folder}")
             
             # Load image files
-            self.mipmap_images = sorted([
-                os.path.join(folder, f) for f in os.listdir(folder)
-                if f.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.tga', '.dds'))
-            ])
+            self.mipmap_images = list_mipmap_images(folder)
             
+            self.mipmap_thumbnails.set_images(self.mipmap_images, self.base_size)
+            self.mipmap_gallery.setVisible(bool(self.mipmap_images))
+            self.preview_label.clear()
             if self.mipmap_images:
                 self.mipmap_status_label.setText(self.translations[self.language]['mipmap_loaded'].format(len(self.mipmap_images)))
-                self.show_preview(self.mipmap_images[0])
             else:
                 self.mipmap_status_label.setText(self.translations[self.language]['mipmap_no_images'])
 
@@ -1026,11 +5463,34 @@ class App(QWidget):
             self.mipmap_output_path = output_path
             self.mipmap_output_label.setText(f"{self.translations[self.language]['mipmap_output']} {output_path}")
 
-    def show_preview(self, image_path):
-        """ Show a preview of the selected image """
+    def show_preview(self, image_path, label=None):
+        """
+        Show a preview of the selected image.
+
+        DDS files are decoded with the built-in BC1/BC3 decoder, so the preview shows
+        exactly what the encoder wrote. Packed _n.dds files are shown as a 2x2 grid of
+        grayscale channels: roughness, normal G / metallic, normal R.
+        """
+        label = label or self.preview_label
         try:
-            img = Image.open(image_path).convert("RGBA")
-            img.thumbnail((256, 256))
+            if image_path.lower().endswith('.dds'):
+                try:
+                    img = Image.fromarray(np.ascontiguousarray(decode_dds(image_path)), 'RGBA')
+                except Exception:
+                    img = Image.open(image_path).convert("RGBA")
+            else:
+                img = Image.open(image_path).convert("RGBA")
+            
+            if image_path.lower().endswith('_n.dds'):
+                tile = img.copy()
+                tile.thumbnail((128, 128))
+                width, height = tile.size
+                grid = Image.new("RGBA", (width * 2, height * 2))
+                for index, channel in enumerate(tile.split()):
+                    grid.paste(channel.convert("RGBA"), ((index % 2) * width, (index // 2) * height))
+                img = grid
+            else:
+                img.thumbnail((256, 256))
             img_array = np.array(img)
             height, width, channels = img_array.shape
             
@@ -1039,122 +5499,160 @@ class App(QWidget):
             qImg = QPixmap.fromImage(
                 QImage(img_array.data, width, height, bytesPerLine, QImage.Format_RGBA8888)
             )
-            self.preview_label.setPixmap(qImg)
+            label.setPixmap(qImg)
         except Exception as e:
             print(f"Error showing preview: {str(e)}")
 
     # Change 3: Update file tracking for detecting changes
     def update_file_tracking(self):
-        """Update the tracking of files in the source folder"""
+        """Restart per-set change tracking for the source folder"""
         if not self.folder:
             return
             
-        try:
-            # Track all PNG files and their modification times
-            self.last_modification_times = {}
-            for file in os.listdir(self.folder):
-                if file.endswith('.png'):
-                    file_path = os.path.join(self.folder, file)
-                    self.last_modification_times[file] = os.path.getmtime(file_path)
-        except Exception as e:
-            print(f"Error updating file tracking: {str(e)}")
+        self.get_converter()
+        self.set_watcher.reset()
 
     def check_for_file_changes(self):
-        """Check if any files have been added, modified, or deleted"""
+        """Return the texture sets whose files were added or modified and have finished writing"""
         if not self.folder:
-            return False
+            return []
             
         try:
-            # Get current PNG files and their modification times
-            current_files = {}
-            for file in os.listdir(self.folder):
-                if file.endswith('.png'):
-                    file_path = os.path.join(self.folder, file)
-                    current_files[file] = os.path.getmtime(file_path)
-            
-            # Check for new or modified files
-            for file, mtime in current_files.items():
-                if file not in self.last_modification_times or mtime > self.last_modification_times[file]:
-                    self.last_modification_times = current_files
-                    return True
-            
-            # Check for deleted files
-            if len(current_files) != len(self.last_modification_times):
-                self.last_modification_times = current_files
-                return True
-                
-            return False
+            self.get_converter()
+            return self.set_watcher.poll()
         except Exception as e:
             print(f"Error checking for file changes: {str(e)}")
-            return False
+            self.watch_metrics.inc('scan_errors')
+            return []
 
     # Change 3: Update convert_files to pause after successful conversion until changes detected
-    def convert_files(self):
+    def convert_files(self, base_names=None, verify_sample=1.0, throttle=None):
+        """
+        Converts the given texture sets, or every complete set in the source folder.
+
+        verify_sample is the fraction of blocks decoded again when output verification is on.
+        With a throttle the conversion runs in low-impact mode.
+        """
         if not self.folder or not self.output_folder:
             QMessageBox.warning(self, self.translations[self.language]['error_title'], 
                                self.translations[self.language]['folder_error'])
             return
 
         try:
-            # Find all PNG files in the folder
-            png_files = [f for f in os.listdir(self.folder) if f.endswith('.png')]
-            
-            # Group files by base name
-            base_names = set(f.rsplit('_', 1)[0] for f in png_files)
+            converter = self.get_converter()
+            converter.verify_sample = verify_sample
+            converter.throttle = throttle
+            # A variants.json in the source folder builds every profile from one decode
+            converter.variants = find_variants(self.folder)
+            converter.last_metrics = {}
+            # Watch-mode runs stay silent when every output was already up to date
+            show_summary = base_names is None
+            if base_names is None:
+                base_names = converter.find_texture_sets()
+            # An interrupted batch is picked up again where it stopped
+            journal = BatchJournal(converter.output_folder)
+            base_names = journal.begin(base_names, converter.batch_settings())
             
             # Track if any files were processed
             files_processed = False
             
+            # Progress is weighted by pixels so 8K sets count for more than 1K sets.
+            # The stages run on worker threads, so the display is refreshed from here.
+            progress = ConversionProgress()
+            for base_name in base_names:
+                progress.add_work(converter.set_pixels(base_name), item=base_name)
+            self.last_progress = progress
+            
             # Set up progress bar
             self.progress_label.setVisible(True)
             self.progress_bar.setVisible(True)
+            self.queue_label.setVisible(True)
             self.progress_bar.setMinimum(0)
-            self.progress_bar.setMaximum(len(base_names))
+            self.progress_bar.setMaximum(1000)
             self.progress_bar.setValue(0)
             
-            # Process each set of textures
-            for i, base_name in enumerate(base_names):
-                roughness_file = f"{base_name}_Roughness.png"
-                normal_file = f"{base_name}_Normal.png"
-                metallic_file = f"{base_name}_Metallic.png"
-                base_color_file = f"{base_name}_BaseColor.png"
-
-                # Check if all required files exist
-                required_files = [base_color_file, metallic_file, normal_file, roughness_file]
-                if all(os.path.exists(os.path.join(self.folder, f)) for f in required_files):
-                    try:
-                        self.generate_dds(base_name, base_color_file, metallic_file, normal_file, roughness_file)
-                        files_processed = True
-                        
-                        if self.auto_delete:
-                            self.delete_png_files(base_name)
-                    except Exception as e:
-                        QMessageBox.warning(self, self.translations[self.language]['error_title'], 
-                                          f"{self.translations[self.language]['file_error']} {base_name}\n{str(e)}")
+            # Taken before converting so edits made meanwhile trigger another run
+            signatures = {base_name: self.set_watcher.set_signature(base_name) for base_name in base_names}
+            
+            # Sets flow through the decode/transform/encode/write pipeline
+            pipeline = ConversionPipeline(converter, progress, journal=journal)
+            for base_name, rebuilt, error in pipeline.run(base_names, idle=lambda: self.update_progress_display(progress)):
+                if error:
+                    self.set_watcher.mark_failed(base_name)
+                    QMessageBox.warning(self, self.translations[self.language]['error_title'], 
+                                      f"{self.translations[self.language]['file_error']} {base_name}\n{error}")
+                else:
+                    if rebuilt:
+                        show_summary = True
+                    bytes_written = sum(os.path.getsize(os.path.join(converter.output_folder, name))
+                                        for name in converter.output_names(base_name, rebuilt))
+                    self.set_watcher.mark_converted(base_name, signatures[base_name], bytes_written)
+                    files_processed = True
                 
-                # Update progress bar
-                self.progress_bar.setValue(i + 1)
-                QApplication.processEvents()  # Keep UI responsive
+                self.update_progress_display(progress)  # Keep UI responsive
             
             # Hide progress bar when done
             self.progress_bar.setVisible(False)
             self.progress_label.setVisible(False)
+            self.queue_label.setVisible(False)
+            self.progress_label.setText(self.translations[self.language]['progress'])
             
             # Show completion message
             if files_processed:
-                QMessageBox.information(self, self.translations[self.language]['conversion_complete'], 
-                                       f"{len(base_names)} texture sets processed.")
+                last_output = os.path.join(converter.output_folder, converter.output_names(base_names[-1])[-1])
+                if os.path.exists(last_output):
+                    self.show_preview(last_output, self.output_preview_label)
+                    self.output_preview_label.setVisible(True)
+                
+                message = (f"{progress.items_done} texture sets processed.\n"
+                           f"{progress.total_pixels / 1e6:.1f} MP in {format_duration(progress.elapsed())} "
+                           f"({progress.throughput_mps():.1f} MP/s)")
+                if progress.items_up_to_date:
+                    message += f"\n{progress.items_up_to_date} {self.translations[self.language]['up_to_date']}"
+                if journal.resumed:
+                    message += f"\n{len(journal.done)} {self.translations[self.language]['batch_resumed']}"
+                if converter.last_metrics:
+                    message += f"\n\n{self.translations[self.language]['quality']}"
+                    for base_name, metrics in converter.last_metrics.items():
+                        message += f"\n{base_name}\n{format_metrics(metrics)}"
+                if show_summary:
+                    QMessageBox.information(self, self.translations[self.language]['conversion_complete'], message)
                 
-                # Change 3: Set waiting state and update file tracking
+                # Change 3: Set waiting state
                 self.waiting_for_changes = True
                 self.status_label.setText(self.translations[self.language]['waiting'])
                 self.status_label.setVisible(True)
-                self.update_file_tracking()
                 
         except Exception as e:
             QMessageBox.critical(self, self.translations[self.language]['error_title'], str(e))
             self.progress_label.setVisible(False)
             self.progress_bar.setVisible(False)
+            self.queue_label.setVisible(False)
+        finally:
+            # Interactive conversions always run at full speed
+            self.converter.throttle = None
+
+    def get_converter(self):
+        """ Copies the current GUI settings into the conversion engine """
+        self.converter.folder = self.folder
+        self.converter.output_folder = self.output_folder
+        self.converter.alpha_fill = self.alpha_fill
+        self.converter.auto_delete = self.auto_delete
+        self.converter.encoder_selector.backend = self.encoder_backend
+        self.converter.dither = self.dither
+        self.converter.resample_target = self.resample_target
+        self.converter.verify = self.verify_output
+        self.converter.patch_blocks = self.patch_blocks
+        return self.converter
+
+    def update_progress_display(self, progress):
+        """ Refreshes the progress bar with pixel-weighted progress, throughput and ETA """
+        self.progress_bar.setValue(int(progress.fraction() * 1000))
+        self.progress_label.setText(f"{self.translations[self.language]['progress']} "
+                                    f"{progress.format_status(self.translations[self.language]['eta'])}")
+        if progress.queue_depths:
+            self.queue_label.setText(f"{self.translations[self.language]['queues']} {progress.format_queues()}")
+        QApplication.processEvents()
 
     def generate_mipmap_dds(self):
         """ Generate DDS file with mipmaps """
@@ -1188,7 +5686,78 @@ class App(QWidget):
             # Hide progress bar
             self.mipmap_progress_bar.setVisible(False)
 
-    def build_single_dds(self, image_paths, base_size, output_path):
+    def generate_mipmap_batch(self):
+        """ Builds one DDS per subfolder (or per mipmaps.json entry) of a folder on a worker pool """
+        root = QFileDialog.getExistingDirectory(self, self.translations[self.language]['mipmap_batch'])
+        if not root:
+            return
+        
+        try:
+            jobs = find_mipmap_jobs(root, base_size=self.base_size, auto_mip=self.auto_mip, fmt=self.mipmap_format)
+            if not jobs:
+                QMessageBox.warning(self, self.translations[self.language]['error_title'], 
+                                   self.translations[self.language]['batch_no_jobs'])
+                return
+            
+            # One row per output, updated as the builds finish
+            self.batch_list.clear()
+            rows = {}
+            for job in jobs:
+                rows[job['output']] = QListWidgetItem(
+                    f"{os.path.basename(job['output'])} - {self.translations[self.language]['batch_queued']}")
+                self.batch_list.addItem(rows[job['output']])
+            self.batch_list.setVisible(True)
+            self.mipmap_progress_bar.setVisible(True)
+            self.mipmap_progress_bar.setValue(0)
+            
+            # The builds run on worker threads; Qt is only updated from this loop
+            progress = ConversionProgress(stages=MipmapBuilder.STAGES)
+            self.last_progress = progress
+            
+            def refresh():
+                self.mipmap_status_label.setText(progress.format_status(self.translations[self.language]['eta']))
+                QApplication.processEvents()
+            
+            failed = 0
+            batch = MipmapBatch(jobs)
+            for index, (job, error, seconds) in enumerate(batch.run(
+                    lambda job: self.build_single_dds(job['images'], job['base_size'], job['output'],
+                                                      progress, job['auto_mip'], job['format'], batch),
+                    idle=refresh), 1):
+                name = os.path.basename(job['output'])
+                if error:
+                    failed += 1
+                    rows[job['output']].setText(f"{name} - {self.translations[self.language]['batch_failed']} "
+                                                f"{error.splitlines()[0]}")
+                    rows[job['output']].setToolTip(error)
+                else:
+                    rows[job['output']].setText(f"{name} - {self.translations[self.language]['batch_done']} "
+                                                f"({seconds:.1f}s)")
+                self.mipmap_progress_bar.setValue(int(index * 100 / len(jobs)))
+                refresh()
+            
+            summary = self.translations[self.language]['batch_summary'].format(
+                len(jobs) - failed, failed, format_duration(progress.elapsed()))
+            self.mipmap_status_label.setText(summary)
+            if failed:
+                QMessageBox.warning(self, self.translations[self.language]['error_title'], summary)
+            else:
+                QMessageBox.information(self, self.translations[self.language]['conversion_complete'], summary)
+        except Exception as e:
+            QMessageBox.critical(self, self.translations[self.language]['error_title'], str(e))
+        finally:
+            self.mipmap_progress_bar.setVisible(False)
+
+    def update_mipmap_progress(self, progress):
+        """ Refreshes the mipmap progress bar with pixel-weighted progress, throughput and ETA """
+        if threading.current_thread() is not threading.main_thread():
+            return  # Qt widgets may only be touched from the GUI thread
+        self.mipmap_progress_bar.setValue(int(progress.fraction() * 100))
+        self.mipmap_status_label.setText(progress.format_status(self.translations[self.language]['eta']))
+        QApplication.processEvents()
+
+    def build_single_dds(self, image_paths, base_size, output_path, progress=None, auto_mip=None, fmt=None,
+                         batch=None):
         """
         Builds a single DDS file with mipmaps from a list of image paths.
         
@@ -1196,137 +5765,24 @@ class App(QWidget):
             image_paths: List of paths to images to use as mipmap levels
             base_size: Base size for the highest resolution mipmap
             output_path: Path where the DDS file will be saved
+            progress: Shared progress for batch builds (they run off the GUI thread)
+            auto_mip: Overrides the auto-complete option
+            fmt: Overrides the selected DDS format
+            batch: MipmapBatch whose encoder selector and tuner the build shares
         """
-        mipmap_images = []
-        
-        # Progress calculation
-        total_steps = len(image_paths)
-        if self.auto_mip:
-            # Estimate additional steps for auto-complete
-            last_img_path = image_paths[-1]
-            try:
-                last_size = max(Image.open(last_img_path).size)
-                while last_size > 1:
-                    last_size = max(1, last_size // 2)
-                    total_steps += 1
-            except Exception:
-                pass
-        
-        current_step = 0
-        
-        # Process input images
-        for i, path in enumerate(image_paths):
-            try:
-                img = Image.open(path).convert("RGBA")
-            except Exception as e:
-                error_msg = f"{self.translations[self.language]['image_read_error']} {path}\n{str(e)}"
-                QMessageBox.warning(self, self.translations[self.language]['error_title'], error_msg)
-                return
-
-            size = max(1, base_size // (2 ** i))
-            img = img.resize((size, size), Image.BOX)
-            r, g, b, a = img.split()
-            bgra = Image.merge("RGBA", (b, g, r, a))
-            mipmap_images.append(bgra)
-            
-            # Update progress
-            current_step += 1
-            self.mipmap_progress_bar.setValue(int(current_step / total_steps * 100))
-            QApplication.processEvents()
-
-        # Automatically complete mipmap
-        if self.auto_mip:
-            base = mipmap_images[-1]
-            w, h = base.size
-            while w > 1 or h > 1:
-                w, h = max(1, w // 2), max(1, h // 2)
-                mip = base.resize((w, h), Image.BOX)
-                mipmap_images.append(mip)
-                base = mip
-                
-                # Update progress
-                current_step += 1
-                self.mipmap_progress_bar.setValue(int(current_step / total_steps * 100))
-                QApplication.processEvents()
-
-        width, height = mipmap_images[0].size
-        mip_count = len(mipmap_images)
-        pitch = width * 4
-        mip_data = b''.join([img.tobytes() for img in mipmap_images])
-
-        ddspf = struct.pack("<I I I I I I I I",
-                        32, 0x41, 0, 32,
-                        0x00FF0000, 0x0000FF00,
-                        0x000000FF, 0xFF000000)
-
-        header = struct.pack("<I I I I I I I 11I 32s I I I I I",
-                         124,
-                         0x2100F,
-                         height, width, pitch, 0, mip_count,
-                         *([0] * 11),
-                         ddspf,
-                         0x401008, 0, 0, 0, 0)
-
-        try:
-            with open(output_path, "wb") as f:
-                f.write(b'DDS ')
-                f.write(header)
-                f.write(mip_data)
-
-                actual_size = len(mip_data)
-                expected_size = sum([
-                    max(1, width // (2**i)) * max(1, height // (2**i)) * 4
-                    for i in range(mip_count)
-                ])
-                if actual_size < expected_size:
-                    padding = expected_size - actual_size
-                    f.write(b'\x00' * padding)
-        except Exception as e:
-            error_msg = f"{self.translations[self.language]['write_error']} {output_path}\n{str(e)}"
-            raise Exception(error_msg)
-
-    def process_roughness(self, roughness_image_path, level=0.65):
-        try:
-            roughness = Image.open(os.path.join(self.folder, roughness_image_path))
-            r_np = np.array(roughness, dtype=np.uint8)
-            r_np = 255 - r_np
-            r_np = np.power(r_np.astype(np.float32) / 255.0, 1 / level) * 255.0
-            return np.clip(r_np, 0, 255).astype(np.uint8)
-        except Exception as e:
-            raise Exception(f"Error processing roughness map: {str(e)}")
-
-    def generate_dds(self, base_name, base_color_file, metallic_file, normal_file, roughness_file):
-        try:
-            base_color = np.array(Image.open(os.path.join(self.folder, base_color_file)))
-            metallic = np.array(Image.open(os.path.join(self.folder, metallic_file)))
-            normal = np.array(Image.open(os.path.join(self.folder, normal_file)))
-            roughness = self.process_roughness(roughness_file)
-
-            self.create_basecolor_dds(base_name, base_color)
-            self.create_normal_metallic_roughness_dds(base_name, roughness, normal, metallic)
-        except Exception as e:
-            raise Exception(f"Error generating DDS files: {str(e)}")
-
-    def create_basecolor_dds(self, base_name, base_color_array):
-        try:
-            # Apply the selected alpha fill color
-            alpha_value = 255 if self.alpha_fill == 'white' else 0
-            base_color_with_alpha = np.dstack([base_color_array, np.full(base_color_array.shape[:2], alpha_value, dtype=np.uint8)])
-
-            filename = os.path.join(self.output_folder, f"{base_name}_c.dds")
-            # Set DXT5 format (as requested)
-            imageio.imwrite(filename, base_color_with_alpha, format='DDS', compress=True, dxgi_format='BC3_UNORM')
-        except Exception as e:
-            raise Exception(f"Error creating base color DDS: {str(e)}")
-
-    def create_normal_metallic_roughness_dds(self, base_name, roughness, normal, metallic):
+        if progress is None:
+            progress = ConversionProgress(stages=MipmapBuilder.STAGES, callback=self.update_mipmap_progress)
+            self.last_progress = progress
+        if auto_mip is None:
+            auto_mip = self.auto_mip
         try:
-            dds_array = np.dstack([roughness, normal[:, :, 1], metallic, normal[:, :, 0]])
-            filename = os.path.join(self.output_folder, f"{base_name}_n.dds")
-            # Set DXT5 format (as requested)
-            imageio.imwrite(filename, dds_array, format='DDS', compress=True, dxgi_format='BC3_UNORM')
-        except Exception as e:
-            raise Exception(f"Error creating normal/metallic/roughness DDS: {str(e)}")
+            MipmapBuilder(auto_mip=auto_mip, fmt=fmt or self.mipmap_format,
+                          encoder_selector=batch and batch.encoder_selector, tuner=batch and batch.tuner).build(
+                image_paths, base_size, output_path, progress)
+        except ImageReadError as e:
+            raise Exception(f"{self.translations[self.language]['image_read_error']} {e.path}\n{e.reason}")
+        except OutputWriteError as e:
+            raise Exception(f"{self.translations[self.language]['write_error']} {e.path}\n{e.reason}")
 
     def toggle_mode(self, state):
         self.dark_mode = state == Qt.Checked
@@ -1335,6 +5791,15 @@ class App(QWidget):
     def toggle_delete(self, state):
         self.auto_delete = state == Qt.Checked
 
+    def toggle_dither(self, state):
+        self.dither = state == Qt.Checked
+
+    def toggle_verify(self, state):
+        self.verify_output = state == Qt.Checked
+
+    def toggle_patch_blocks(self, state):
+        self.patch_blocks = state == Qt.Checked
+
     def toggle_folder_scan(self, state):
         self.folder_scan_enabled = state == Qt.Checked
         if self.folder_scan_enabled:
@@ -1342,42 +5807,247 @@ class App(QWidget):
         else:
             self.timer.stop()  # Stop scanning
 
+    def toggle_low_impact(self, state):
+        self.low_impact = state == Qt.Checked
+
     # Change 3: Update auto_scan_for_png to check for changes before converting
     def auto_scan_for_png(self):
-        """ Automatically scans for new PNG files in the folder every 5 seconds """
+        """ Scans the folder every 5 seconds and converts the sets that finished changing """
         if not self.folder:
             return
             
         try:
-            # If we're waiting for changes, check if any files have changed
-            if self.waiting_for_changes:
-                if self.check_for_file_changes():
-                    # Files have changed, we can process again
-                    self.waiting_for_changes = False
-                    self.status_label.setVisible(False)
-                    self.convert_files()
-            else:
-                # Normal scanning mode - check if there are PNG files to convert
-                png_files = [f for f in os.listdir(self.folder) if f.endswith('.png')]
-                if png_files:
-                    self.convert_files()
+            # Only sets whose four maps changed and settled are converted,
+            # instead of re-running the whole folder on every change
+            ready = self.check_for_file_changes()
+            if ready:
+                self.waiting_for_changes = False
+                self.status_label.setVisible(False)
+                # Watch mode only spot-checks a tenth of the blocks to stay cheap
+                self.convert_files(ready, verify_sample=0.1,
+                                   throttle=self.throttle if self.low_impact else None)
         except Exception as e:
             # Silent error handling for background scanning
             print(f"Error during auto scan: {str(e)}")
+            self.watch_metrics.inc('scan_errors')
+        self.watch_metrics.maybe_export()
+
+
+def cli_throttle(args):
+    """ Returns the Throttle of --low-impact (implied by --max-cores and --pause-load), or None """
+    if not (args.low_impact or args.max_cores or args.pause_load):
+        return None
+    return Throttle(args.max_cores, args.pause_load)
+
+
+def run_cli_convert(args):
+    """ Converts a folder without the GUI, logging progress for batch jobs """
+    converter = SkinConverter(args.convert, args.output, alpha_fill=args.alpha_fill,
+                              auto_delete=args.delete_pngs, encoder=args.encoder)
+    converter.workers = args.workers
+    converter.throttle = cli_throttle(args)
+    if converter.throttle is not None:
+        converter.throttle.enter_process()
+    converter.dither = args.dither
+    converter.incremental = not args.force
+    converter.patch_blocks = args.patch_blocks
+    converter.resample_target = args.resolution
+    converter.upscale_filter = args.upscale
+    converter.output_archive = args.output_zip
+    converter.variants = load_variants(args.variants) if args.variants else find_variants(args.convert)
+    if args.plane_cache is not None:
+        converter.plane_cache = PlaneCache(max_bytes=args.plane_cache * 1024 ** 2) if args.plane_cache > 0 else False
+    if args.verify is not None:
+        converter.verify = True
+        converter.verify_sample = args.verify
+
+    finished = [0]
+
+    def log_progress(progress):
+        if args.progress_json:
+            print(json.dumps(progress.snapshot()), flush=True)
+        elif progress.items_done + progress.items_failed != finished[0]:
+            finished[0] = progress.items_done + progress.items_failed
+            print(f"[{finished[0]}/{progress.total_items}] {progress.fraction() * 100:5.1f}% "
+                  f"{progress.format_status()} - queues {progress.format_queues()}", flush=True)
+
+    progress = ConversionProgress(callback=log_progress)
+    results = converter.convert_all(progress=progress)
+    if converter.last_journal and converter.last_journal.resumed:
+        print(f"Resumed an interrupted batch: {len(converter.last_journal.done)} sets were already converted")
+    for base_name, error in results:
+        if error:
+            print(f"FAILED {base_name}: {error}", file=sys.stderr)
+
+    summary = progress.snapshot()
+    if args.progress_json:
+        if converter.verify:
+            summary['metrics'] = converter.last_metrics
+        print(json.dumps(dict(summary, event='summary')), flush=True)
+    else:
+        for base_name, metrics in converter.last_metrics.items():
+            print(f"{base_name}\n{format_metrics(metrics)}")
+        print(f"{summary['items_done']}/{summary['total_items']} texture sets converted "
+              f"({summary['items_up_to_date']} up to date), "
+              f"{summary['total_pixels'] / 1e6:.1f} MP in {format_duration(summary['elapsed'])} "
+              f"({summary['throughput_mps']:.1f} MP/s)")
+    return 1 if summary['items_failed'] else 0
+
+
+def run_cli_build_mips(args):
+    """ Builds every mipmap DDS of a batch folder without the GUI """
+    jobs = find_mipmap_jobs(args.build_mips, args.output, args.base_size, fmt=args.mip_format)
+    if not jobs:
+        print(f"No mipmap builds found in {args.build_mips}", file=sys.stderr)
+        return 1
+
+    progress = ConversionProgress(stages=MipmapBuilder.STAGES)
+    failed = 0
+    batch = MipmapBatch(jobs, args.workers)
+    for index, (job, error, seconds) in enumerate(batch.run(
+            lambda job: batch.builder(job).build(job['images'], job['base_size'], job['output'], progress)), 1):
+        if error:
+            failed += 1
+            print(f"[{index}/{len(jobs)}] FAILED {job['output']}: {error}", file=sys.stderr, flush=True)
+        else:
+            print(f"[{index}/{len(jobs)}] {job['output']} ({len(job['images'])} images, {seconds:.2f}s)", flush=True)
+    print(f"{len(jobs) - failed}/{len(jobs)} mipmap DDS files built in {format_duration(progress.elapsed())} "
+          f"({progress.throughput_mps():.1f} MP/s)")
+    return 1 if failed else 0
+
+
+def run_cli_enqueue(args):
+    """ Queues the texture sets of a shared folder for --worker instances """
+    converter = SkinConverter(args.enqueue)
+    base_names = converter.find_texture_sets()
+    resolution = args.resolution if isinstance(args.resolution, str) else '{}x{}'.format(*args.resolution)
+    params = {
+        'output': os.path.abspath(args.output) if args.output else None,
+        'alpha_fill': args.alpha_fill,
+        'delete_pngs': args.delete_pngs,
+        'encoder': args.encoder,
+        'dither': args.dither,
+        'force': args.force,
+        'patch_blocks': args.patch_blocks,
+        'resolution': resolution,
+        'upscale': args.upscale,
+        'variants': load_variants(args.variants) if args.variants else find_variants(args.enqueue),
+    }
+    work_queue = SharedWorkQueue(args.enqueue, lease=args.lease)
+    print(f"Queued {work_queue.enqueue(base_names, params)} texture sets in {work_queue.root}")
+    return 0
+
+
+def run_cli_worker(args):
+    """ Converts queued sets of a shared folder until none are left """
+    work_queue = SharedWorkQueue(args.worker, lease=args.lease)
+    work_queue.throttle = cli_throttle(args)
+    if work_queue.throttle is not None:
+        # The lease heartbeat is only a file touch, so the whole process can run at low priority
+        work_queue.throttle.enter_process()
+    print(f"Worker {work_queue.worker_id} on {work_queue.root}", flush=True)
+    converted = failed = 0
+    for result in work_queue.work():
+        if result['error']:
+            failed += 1
+            print(f"FAILED {result['base_name']}: {result['error']}", file=sys.stderr, flush=True)
+        else:
+            converted += 1
+            print(f"{result['base_name']} ({', '.join(result['rebuilt']) or 'up to date'}, "
+                  f"{result['seconds']:.2f}s)", flush=True)
+    print(f"Queue empty: {converted} texture sets converted, {failed} failed by this worker")
+    return 1 if failed else 0
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='SkinTool by FRICODEC')
+    parser.add_argument('--convert', metavar='FOLDER',
+                        help='convert the texture sets in FOLDER (or in a .zip archive) without opening the GUI')
+    parser.add_argument('--output-zip', metavar='ZIP', help='write the DDS files of --convert into a zip archive')
+    parser.add_argument('--build-mips', metavar='FOLDER',
+                        help='build one mipmapped DDS per subfolder of FOLDER (or per entry of its mipmaps.json)')
+    parser.add_argument('--base-size', type=int, default=4096, help='base size of --build-mips outputs (default: 4096)')
+    parser.add_argument('--mip-format', choices=MIPMAP_FORMATS, default='BGRA8',
+                        help='pixel format of --build-mips outputs: uncompressed BGRA8, BC1/BC3 for color, '
+                             'BC4 for one channel, BC5 for two (default: BGRA8)')
+    parser.add_argument('--output', metavar='FOLDER', help='output folder for DDS files (default: source folder)')
+    parser.add_argument('--alpha-fill', choices=['white', 'black'], default='white',
+                        help='alpha fill of _c.dds: white (air) or black (ground)')
+    parser.add_argument('--delete-pngs', action='store_true', help='delete PNGs after conversion')
+    parser.add_argument('--resolution', type=parse_resolution, default='largest', metavar='TARGET',
+                        help='resample maps of different sizes to the largest, smallest, N or WxH (default: largest)')
+    parser.add_argument('--variants', metavar='JSON',
+                        help='variant profiles (alpha fill, resolution, format, output subfolder and suffix) '
+                             'built from one decode of each set (default: variants.json in the source folder)')
+    parser.add_argument('--upscale', choices=['bilinear', 'nearest'], default='bilinear',
+                        help='filter used when a map is enlarged (default: bilinear)')
+    parser.add_argument('--force', action='store_true',
+                        help='rebuild every output, even those whose maps and settings did not change')
+    parser.add_argument('--patch-blocks', action='store_true',
+                        help='re-encode only the 4x4 blocks that changed since the last conversion '
+                             'and patch them into the existing DDS files')
+    parser.add_argument('--progress-json', action='store_true',
+                        help='log a JSON progress snapshot after every stage')
+    parser.add_argument('--encoder', choices=['auto'] + list(ENCODERS), default='auto',
+                        help='DDS encoder backend (default: fastest measured on this machine)')
+    parser.add_argument('--autotune', action='store_true',
+                        help='benchmark encoder backends, worker count and tile height on this machine')
+    parser.add_argument('--workers', type=int, help='worker threads (default: autotuned per machine)')
+    parser.add_argument('--plane-cache', type=int, metavar='MB',
+                        help='disk budget of the decoded map cache (default: 2048, 0 disables it)')
+    parser.add_argument('--dither', action='store_true',
+                        help='ordered dithering when reducing 16-bit maps to 8 bits')
+    parser.add_argument('--verify', type=float, nargs='?', const=1.0, metavar='FRACTION',
+                        help='decode the outputs again and report per-channel PSNR / max error '
+                             '(optionally on a FRACTION of the blocks)')
+    parser.add_argument('--metrics-file', metavar='PATH',
+                        help='watch-mode metrics export, Prometheus textfile or JSON if PATH ends in .json '
+                             '(default: watch_metrics.prom in the settings folder)')
+    parser.add_argument('--metrics-interval', type=float, default=60.0, metavar='SECONDS',
+                        help='seconds between watch-mode metrics exports (default: 60)')
+    parser.add_argument('--enqueue', metavar='FOLDER',
+                        help='queue the texture sets of a shared FOLDER for --worker instances')
+    parser.add_argument('--worker', metavar='FOLDER',
+                        help='convert the sets queued in a shared FOLDER until the queue is empty')
+    parser.add_argument('--lease', type=float, default=60.0, metavar='SECONDS',
+                        help='seconds a worker holds a set without renewing its claim (default: 60)')
+    parser.add_argument('--low-impact', action='store_true',
+                        help='run --convert, --worker or watch mode at the lowest CPU and I/O priority '
+                             'on at most half the cores')
+    parser.add_argument('--max-cores', type=int, metavar='N', help='cores used in low-impact mode (default: half)')
+    parser.add_argument('--pause-load', type=float, metavar='LOAD',
+                        help='in low-impact mode, wait before each set while the load average per core is above LOAD')
+    parser.add_argument('--daemon', action='store_true',
+                        help='run as a resident conversion service on localhost')
+    parser.add_argument('--port', type=int, default=DAEMON_PORT, help=f"daemon port (default: {DAEMON_PORT})")
+    parser.add_argument('--verbose', action='store_true', help='log daemon requests and jobs')
+    # Unknown arguments are passed on to Qt
+    return parser.parse_known_args(argv)
 
-    def delete_png_files(self, base_name):
-        """ Deletes the PNG files after conversion if auto-delete is enabled """
-        try:
-            png_files = [f"{base_name}_BaseColor.png", f"{base_name}_Metallic.png", 
-                        f"{base_name}_Normal.png", f"{base_name}_Roughness.png"]
-            for file in png_files:
-                file_path = os.path.join(self.folder, file)
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-        except Exception as e:
-            raise Exception(f"Error deleting PNG files: {str(e)}")
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    ex = App()
+    args, qt_args = parse_args(sys.argv[1:])
+    if args.autotune:
+        selector = EncoderSelector()
+        cache = selector.autotune_all()
+        for key, name in sorted(cache['choices'].items()):
+            print(f"{key}: {name} {cache['timings'][key]}")
+        settings = PerformanceTuner().autotune(selector)
+        print(f"workers: {settings['workers']}, tile height: {settings['tile_height']} ({settings['encoder']})")
+        if not args.convert:
+            sys.exit(0)
+    if args.convert:
+        sys.exit(run_cli_convert(args))
+    if args.build_mips:
+        sys.exit(run_cli_build_mips(args))
+    if args.enqueue:
+        sys.exit(run_cli_enqueue(args))
+    if args.worker:
+        sys.exit(run_cli_worker(args))
+    if args.daemon:
+        ConversionDaemon(port=args.port, verbose=args.verbose).serve_forever()
+        sys.exit(0)
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    ex = App(metrics_path=args.metrics_file, metrics_interval=args.metrics_interval, throttle=cli_throttle(args))
     sys.exit(app.exec_())
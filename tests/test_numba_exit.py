@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from PIL import Image
+
+SKINTOOL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'skintool.py')
+
+
+@pytest.mark.parametrize('encoder', ['numba', 'auto'])
+def test_pipelined_numba_conversion_exits(tmp_path, encoder):
+    """ A conversion whose stages ran numba kernels on worker threads must not hang at exit """
+    pytest.importorskip('numba')
+    source = tmp_path / 'src'
+    source.mkdir()
+    (tmp_path / 'out').mkdir()
+    rng = np.random.default_rng(0)
+    Image.fromarray(rng.integers(0, 255, (64, 64, 3), dtype=np.uint8)).save(source / 'tank_BaseColor.png')
+    Image.fromarray(rng.integers(0, 255, (64, 64, 3), dtype=np.uint8)).save(source / 'tank_Normal.png')
+    for map_type in ('Metallic', 'Roughness'):
+        Image.fromarray(rng.integers(0, 255, (64, 64), dtype=np.uint8)).save(source / f"tank_{map_type}.png")
+    # A fresh settings folder makes the first run autotune inside the conversion
+    env = dict(os.environ, XDG_CONFIG_HOME=str(tmp_path / 'config'), APPDATA=str(tmp_path / 'config'))
+    result = subprocess.run([sys.executable, SKINTOOL, '--convert', str(source), '--output', str(tmp_path / 'out'),
+                             '--encoder', encoder], env=env, capture_output=True, timeout=300)
+    assert result.returncode == 0, result.stderr.decode(errors='replace')
+    assert (tmp_path / 'out' / 'tank_c.dds').exists()